@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Optional enrichment of listing articles with their full body text.
+
+Listing pages only carry a headline and a one-line teaser, while most stock
+mentions are in the article body. ArticleBodyFetcher fetches bodies on its
+own session, thread pools and rate limiter, so listing fetches never queue
+behind it. Each host gets its own pool of `per_host` threads. That bounds
+the concurrency per site, and a slow site can't occupy threads another
+site's bodies are waiting for. Each response is read up to `max_bytes`,
+and the paragraph text is extracted.
+
+Results are cached by URL and by a hash of the extracted text. A URL that
+was enriched before isn't fetched again, and a syndicated body already seen
+under another URL isn't scored again.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from bs4 import BeautifulSoup, SoupStrainer
+from requests.adapters import HTTPAdapter
+
+from listing_parser import DEFAULT_PARSER
+from metrics import NULL_METRICS, Metrics
+from rate_limiter import HostRateLimiter
+from seen_urls import url_key
+
+logger = logging.getLogger(__name__)
+
+# Paragraphs shorter than this are captions, bylines or navigation
+MIN_PARAGRAPH_CHARS = 40
+MAX_BODY_CHARS = 20_000
+
+# (symbols found in the body, mean sentiment score per paragraph)
+BodyResult = Tuple[Tuple[str, ...], float]
+
+
+def extract_body_text(content: bytes, parser: str = DEFAULT_PARSER) -> List[str]:
+    """The paragraphs of an article page that look like body text"""
+    soup = BeautifulSoup(content, parser, parse_only=SoupStrainer('p'))
+    paragraphs = []
+    total = 0
+    for element in soup.find_all('p'):
+        text = ' '.join(element.get_text(' ', strip=True).split())
+        if len(text) < MIN_PARAGRAPH_CHARS:
+            continue
+        paragraphs.append(text)
+        total += len(text)
+        if total >= MAX_BODY_CHARS:
+            break
+    return paragraphs
+
+
+class BodyCache:
+    """URL -> body hash and body hash -> analysis result, in a SQLite file"""
+
+    def __init__(self, path: str):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS body_results (
+                body_hash BLOB PRIMARY KEY,
+                symbols TEXT NOT NULL,
+                score REAL NOT NULL
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS body_urls (
+                key INTEGER PRIMARY KEY,
+                body_hash BLOB NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+        """)
+        self.conn.commit()
+
+    @staticmethod
+    def _result(row) -> Optional[BodyResult]:
+        if row is None:
+            return None
+        return tuple(row[0].split()), row[1]
+
+    def for_url(self, url: str) -> Optional[BodyResult]:
+        with self.lock:
+            return self._result(self.conn.execute("""
+                SELECT r.symbols, r.score FROM body_urls u JOIN body_results r USING (body_hash)
+                WHERE u.key = ?
+            """, (url_key(url),)).fetchone())
+
+    def for_hash(self, body_hash: bytes) -> Optional[BodyResult]:
+        with self.lock:
+            return self._result(self.conn.execute(
+                "SELECT symbols, score FROM body_results WHERE body_hash = ?", (body_hash,)).fetchone())
+
+    def store(self, url: str, body_hash: bytes, result: BodyResult):
+        with self.lock:
+            self.conn.execute("INSERT OR IGNORE INTO body_results (body_hash, symbols, score) VALUES (?, ?, ?)",
+                              (body_hash, ' '.join(result[0]), result[1]))
+            self.conn.execute("INSERT OR REPLACE INTO body_urls (key, body_hash, fetched_at) VALUES (?, ?, ?)",
+                              (url_key(url), body_hash, time.time()))
+            self.conn.commit()
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+class ArticleBodyFetcher:
+    """Fetches and analyses article bodies with bounded per-host concurrency"""
+
+    def __init__(self, symbol_matcher, sentiment_scorer, cache: Optional[BodyCache] = None,
+                 per_host: int = 2, max_bytes: int = 512 * 1024,
+                 requests_per_second: float = 1.0, burst: float = 2.0, timeout: float = 10,
+                 parser: str = DEFAULT_PARSER, headers: Optional[Dict[str, str]] = None,
+                 metrics: Metrics = NULL_METRICS):
+        self.symbol_matcher = symbol_matcher
+        self.sentiment_scorer = sentiment_scorer
+        self.cache = cache
+        self.per_host = per_host
+        self.max_bytes = max_bytes
+        self.timeout = timeout
+        self.parser = parser
+        self.metrics = metrics
+        self.rate_limiter = HostRateLimiter(rate=requests_per_second, capacity=burst)
+        self.executors: Dict[str, ThreadPoolExecutor] = {}
+        self.lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=per_host)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+    def _executor(self, url: str) -> ThreadPoolExecutor:
+        host = urlsplit(url).netloc.lower()
+        with self.lock:
+            executor = self.executors.get(host)
+            if executor is None:
+                executor = self.executors[host] = ThreadPoolExecutor(
+                    max_workers=self.per_host, thread_name_prefix=f'body-{host}')
+        return executor
+
+    def _download(self, url: str) -> bytes:
+        """The first `max_bytes` of the page at `url`"""
+        self.rate_limiter.acquire(url)
+        with self.metrics.timer('body_fetch_seconds'):
+            with self.session.get(url, timeout=self.timeout, stream=True) as response:
+                response.raise_for_status()
+                chunks, size = [], 0
+                for chunk in response.iter_content(16 * 1024):
+                    chunks.append(chunk)
+                    size += len(chunk)
+                    if size >= self.max_bytes:
+                        break
+        self.metrics.inc('body_bytes_total', size)
+        return b''.join(chunks)[:self.max_bytes]
+
+    def analyze(self, paragraphs: List[str]) -> BodyResult:
+        """Symbols mentioned in the body and its mean per-paragraph sentiment score"""
+        if not paragraphs:
+            return (), 0.0
+        symbols = tuple(self.symbol_matcher.find('\n'.join(paragraphs)))
+        scores = self.sentiment_scorer.analyze_batch(paragraphs)
+        return symbols, float(sum(scores)) / len(paragraphs)
+
+    def fetch(self, url: str) -> BodyResult:
+        """Analysis of the body at `url`, from the cache when the URL or the body is known"""
+        if self.cache is not None:
+            cached = self.cache.for_url(url)
+            if cached is not None:
+                self.metrics.inc('body_cache_hits_total', kind='url')
+                return cached
+
+        paragraphs = extract_body_text(self._download(url), self.parser)
+        body_hash = hashlib.blake2b('\n'.join(paragraphs).encode('utf-8'), digest_size=16).digest()
+        result = self.cache.for_hash(body_hash) if self.cache is not None else None
+        if result is not None:
+            self.metrics.inc('body_cache_hits_total', kind='body')
+        else:
+            result = self.analyze(paragraphs)
+        if self.cache is not None:
+            self.cache.store(url, body_hash, result)
+        return result
+
+    def fetch_many(self, urls: List[str], budget: Optional[float] = None) -> Dict[str, BodyResult]:
+        """Bodies of `urls` that could be fetched within `budget` seconds.
+
+        Fetches still queued at the deadline are cancelled. The ones already
+        running finish in the background and fill the cache for next time.
+        """
+        futures = {self._executor(url).submit(self.fetch, url): url for url in dict.fromkeys(urls)}
+        done, pending = wait(futures, timeout=budget)
+        for future in pending:
+            future.cancel()
+        if pending:
+            self.metrics.inc('bodies_timed_out_total', len(pending))
+            logger.info(f"{len(pending)} article bodies not fetched within {budget:g}s")
+
+        results = {}
+        for future in done:
+            url = futures[future]
+            try:
+                results[url] = future.result()
+            except Exception as e:
+                self.metrics.inc('body_errors_total')
+                logger.warning(f"Error fetching article body {url}: {e}")
+        return results
+
+    def close(self):
+        # Queued fetches were cancelled at their deadline; wait for running ones before closing the cache
+        with self.lock:
+            executors, self.executors = list(self.executors.values()), {}
+        for executor in executors:
+            executor.shutdown(wait=True)
+        self.session.close()
+        if self.cache is not None:
+            self.cache.close()
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Local inverted index from stock symbols (and headline terms) to articles.
+
+Answers "latest news for INFY and TCS" without PostgreSQL or a scan of
+scraped_news.json. Articles are keyed by the same 64-bit URL hash as the
+seen-URL index. Postings live in a WITHOUT ROWID table clustered on
+(symbol, published_at, article), so each symbol's posting list is stored
+sorted by time. A top-k query merges the symbols' posting lists newest
+first and stops after k articles, however long the lists are. A query for
+articles mentioning all of several symbols walks only the shortest list.
+Headline terms go into an FTS5 table when SQLite has FTS5.
+"""
+
+import heapq
+import sqlite3
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from seen_urls import LOOKUP_CHUNK, url_key
+
+
+class ArticleIndex:
+    """Symbol -> articles posting lists in a SQLite file, updated incrementally"""
+
+    def __init__(self, path: str):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY,
+                published_at REAL NOT NULL,
+                source TEXT NOT NULL,
+                sentiment TEXT NOT NULL,
+                impact_score REAL NOT NULL,
+                symbols TEXT NOT NULL,
+                headline TEXT NOT NULL,
+                url TEXT NOT NULL,
+                news_id INTEGER
+            )
+        """)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS postings (
+                symbol TEXT NOT NULL,
+                published_at REAL NOT NULL,
+                article_id INTEGER NOT NULL,
+                PRIMARY KEY (symbol, published_at, article_id)
+            ) WITHOUT ROWID
+        """)
+        # Posting list lengths, to pick the shortest list for match_all queries
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS symbols (
+                symbol TEXT PRIMARY KEY,
+                articles INTEGER NOT NULL
+            ) WITHOUT ROWID
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_articles_published_at ON articles(published_at)")
+        try:
+            self.conn.execute("""
+                CREATE VIRTUAL TABLE IF NOT EXISTS headline_terms
+                USING fts5(headline, content='articles', content_rowid='id')
+            """)
+            self.full_text = True
+        except sqlite3.OperationalError:  # SQLite built without FTS5
+            self.full_text = False
+        self.conn.commit()
+
+    def _existing(self, keys: List[int]) -> set:
+        existing = set()
+        for start in range(0, len(keys), LOOKUP_CHUNK):
+            chunk = keys[start:start + LOOKUP_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            existing.update(key for (key,) in self.conn.execute(
+                f"SELECT id FROM articles WHERE id IN ({placeholders})", chunk))
+        return existing
+
+    def add(self, articles: Iterable) -> int:
+        """Index articles not indexed yet. Returns how many were new"""
+        by_key = {url_key(article.url): article for article in articles}
+        with self.lock:
+            existing = self._existing(list(by_key))
+            new = [(key, article) for key, article in by_key.items() if key not in existing]
+            rows = [(key, article.published_at.timestamp(), article.source, article.sentiment,
+                     article.impact_score, ' '.join(article.relevant_stocks), article.headline, article.url)
+                    for key, article in new]
+            with self.conn:
+                self.conn.executemany("""
+                    INSERT INTO articles (id, published_at, source, sentiment, impact_score, symbols, headline, url)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, rows)
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO postings (symbol, published_at, article_id) VALUES (?, ?, ?)",
+                    [(stock, row[1], row[0]) for row, (_, article) in zip(rows, new)
+                     for stock in article.relevant_stocks])
+                self.conn.executemany("""
+                    INSERT INTO symbols (symbol, articles) VALUES (?, ?)
+                    ON CONFLICT (symbol) DO UPDATE SET articles = articles + excluded.articles
+                """, Counter(stock for _, article in new for stock in article.relevant_stocks).items())
+                if self.full_text:
+                    self.conn.executemany("INSERT INTO headline_terms (rowid, headline) VALUES (?, ?)",
+                                          [(row[0], row[6]) for row in rows])
+        return len(new)
+
+    def set_news_ids(self, inserted: Iterable[tuple]):
+        """Record the PostgreSQL id of (news_id, article) pairs"""
+        with self.lock, self.conn:
+            self.conn.executemany("UPDATE articles SET news_id = ? WHERE id = ?",
+                                  [(news_id, url_key(article.url)) for news_id, article in inserted])
+
+    def _postings(self, symbol: str, low: float, high: float) -> Iterator[tuple]:
+        """(published_at, article_id) of one symbol, newest first, read lazily from the clustered index"""
+        return self.conn.execute("""
+            SELECT published_at, article_id FROM postings
+            WHERE symbol = ? AND published_at BETWEEN ? AND ?
+            ORDER BY published_at DESC, article_id DESC
+        """, (symbol, low, high))
+
+    def _candidates(self, symbols: List[str], text: Optional[str], low: float, high: float) -> Iterator[int]:
+        """Article ids newest first, for the symbols (merged posting lists) or else the text search"""
+        if symbols:
+            previous = None
+            merged = heapq.merge(*(self._postings(symbol, low, high) for symbol in symbols), reverse=True)
+            for _, article_id in merged:
+                if article_id != previous:
+                    yield article_id
+                previous = article_id
+            return
+        for (article_id,) in self.conn.execute("""
+            SELECT a.id FROM headline_terms JOIN articles a ON a.id = headline_terms.rowid
+            WHERE headline_terms MATCH ? AND a.published_at BETWEEN ? AND ?
+            ORDER BY a.published_at DESC
+        """, (text, low, high)):
+            yield article_id
+
+    def query(self, symbols: Sequence[str] = (), text: Optional[str] = None, since: Optional[datetime] = None,
+              until: Optional[datetime] = None, limit: int = 20, match_all: bool = False) -> List[Dict]:
+        """Most recent articles mentioning `symbols` (any of them, or all with match_all)
+        and/or matching the FTS5 query `text`, published within [since, until].
+
+        Only as many postings are read as it takes to find `limit` articles.
+        """
+        if not symbols and not text:
+            raise ValueError("query needs at least one symbol or a text search")
+        if text and not self.full_text:
+            raise ValueError("headline search needs SQLite with FTS5")
+
+        symbols = list(dict.fromkeys(symbol.upper() for symbol in symbols))
+        low = since.timestamp() if since else float('-inf')
+        high = until.timestamp() if until else float('inf')
+        results = []
+        with self.lock:
+            text_matches = None
+            if symbols and text:
+                text_matches = {rowid for (rowid,) in self.conn.execute(
+                    "SELECT rowid FROM headline_terms WHERE headline_terms MATCH ?", (text,))}
+
+            # With match_all every result is in the shortest posting list
+            walked = symbols
+            if match_all:
+                placeholders = ','.join('?' * len(symbols))
+                lengths = dict(self.conn.execute(
+                    f"SELECT symbol, articles FROM symbols WHERE symbol IN ({placeholders})", symbols))
+                walked = [min(symbols, key=lambda symbol: lengths.get(symbol, 0))]
+            for article_id in self._candidates(walked, text, low, high):
+                if text_matches is not None and article_id not in text_matches:
+                    continue
+                row = self.conn.execute("""
+                    SELECT id, published_at, source, sentiment, impact_score, symbols, headline, url, news_id
+                    FROM articles WHERE id = ?
+                """, (article_id,)).fetchone()
+                if match_all and not set(symbols).issubset(row[5].split()):
+                    continue
+                results.append(row)
+                if len(results) >= limit:
+                    break
+
+        return [{
+            'id': row[0],
+            'published_at': datetime.fromtimestamp(row[1]).isoformat(),
+            'source': row[2],
+            'sentiment': row[3],
+            'impact_score': row[4],
+            'relevant_stocks': row[5].split(),
+            'headline': row[6],
+            'url': row[7],
+            'news_id': row[8],
+        } for row in results]
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
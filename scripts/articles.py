@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Compact in-memory article records.
+
+The daemon and reprocessing runs hold hundreds of thousands of articles in
+dedup windows and rankings, so the per-article overhead matters more than
+the headline text itself. NewsArticle is slotted, stores sources, sentiment
+labels and stock symbols as interned strings (one copy per distinct value)
+and keeps the symbols in a tuple. ArticleBatch goes further for bulk work:
+one typed array per numeric column, with sources, sentiments and symbols
+coded against small lookup tables.
+"""
+
+import heapq
+import sys
+from array import array
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Sequence
+
+SENTIMENTS = ('positive', 'negative', 'neutral')
+
+# published_at is stored in ArticleBatch as microseconds since this (naive) epoch
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def _intern(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+class NewsArticle:
+    """A scraped, scored article"""
+
+    __slots__ = ('headline', 'summary', 'source', 'url', 'published_at', 'sentiment',
+                 'relevant_stocks', 'impact_score', 'cluster_sources')
+
+    def __init__(self, headline: str, summary: str, source: str, url: str, published_at: datetime,
+                 sentiment: str, relevant_stocks: Sequence[str], impact_score: float,
+                 cluster_sources: Sequence[str] = ()):
+        self.headline = headline
+        self.summary = summary
+        self.source = _intern(source)
+        self.url = url
+        self.published_at = published_at
+        self.sentiment = _intern(sentiment)
+        self.relevant_stocks = tuple(map(_intern, relevant_stocks))
+        self.impact_score = impact_score
+        # Sources that carried the same story, filled in by near-duplicate detection
+        self.cluster_sources = cluster_sources
+
+    def _fields(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f'{name}={getattr(self, name)!r}' for name in self.__slots__)
+        return f'{self.__class__.__name__}({fields})'
+
+
+class _Codes:
+    """Value <-> small integer code table"""
+
+    __slots__ = ('values', 'codes')
+
+    def __init__(self, values: Iterable[str] = ()):
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+        for value in values:
+            self.code(value)
+
+    def code(self, value: str) -> int:
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(_intern(value))
+        return code
+
+
+class ArticleBatch:
+    """Column-oriented store for many articles.
+
+    Numeric columns are typed arrays; source, sentiment and symbol columns
+    hold codes into lookup tables. Symbols and cluster sources are stored
+    as flat code arrays with offsets (one variable-length run per article).
+    Indexing materialises a NewsArticle.
+    """
+
+    def __init__(self, articles: Iterable[NewsArticle] = ()):
+        self.headlines: List[str] = []
+        self.summaries: List[str] = []
+        self.urls: List[str] = []
+        self.sources = _Codes()
+        self.sentiments = _Codes(SENTIMENTS)
+        self.symbols = _Codes()
+        self.source_codes = array('H')
+        self.sentiment_codes = array('B')
+        self.published_at = array('q')
+        self.impact_scores = array('d')
+        self.stock_codes = array('H')
+        self.stock_offsets = array('I', [0])
+        self.cluster_codes = array('H')
+        self.cluster_offsets = array('I', [0])
+        self.extend(articles)
+
+    def append(self, article: NewsArticle):
+        self.headlines.append(article.headline)
+        self.summaries.append(article.summary)
+        self.urls.append(article.url)
+        self.source_codes.append(self.sources.code(article.source))
+        self.sentiment_codes.append(self.sentiments.code(article.sentiment))
+        self.published_at.append((article.published_at - EPOCH) // MICROSECOND)
+        self.impact_scores.append(article.impact_score)
+        self.stock_codes.extend(self.symbols.code(stock) for stock in article.relevant_stocks)
+        self.stock_offsets.append(len(self.stock_codes))
+        self.cluster_codes.extend(self.sources.code(source) for source in article.cluster_sources)
+        self.cluster_offsets.append(len(self.cluster_codes))
+
+    def extend(self, articles: Iterable[NewsArticle]):
+        for article in articles:
+            self.append(article)
+
+    def __len__(self) -> int:
+        return len(self.headlines)
+
+    def stocks(self, index: int) -> tuple:
+        """Symbols of the article at `index`"""
+        values = self.symbols.values
+        return tuple(values[code] for code in
+                     self.stock_codes[self.stock_offsets[index]:self.stock_offsets[index + 1]])
+
+    def __getitem__(self, index: int) -> NewsArticle:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('article index out of range')
+        sources = self.sources.values
+        return NewsArticle(
+            headline=self.headlines[index],
+            summary=self.summaries[index],
+            source=sources[self.source_codes[index]],
+            url=self.urls[index],
+            published_at=EPOCH + self.published_at[index] * MICROSECOND,
+            sentiment=self.sentiments.values[self.sentiment_codes[index]],
+            relevant_stocks=self.stocks(index),
+            impact_score=self.impact_scores[index],
+            cluster_sources=tuple(sources[code] for code in
+                                  self.cluster_codes[self.cluster_offsets[index]:self.cluster_offsets[index + 1]])
+        )
+
+    def __iter__(self) -> Iterator[NewsArticle]:
+        return (self[index] for index in range(len(self)))
+
+    def sentiment_counts(self) -> Counter:
+        """Articles per sentiment label"""
+        values = self.sentiments.values
+        return Counter({values[code]: count for code, count in Counter(self.sentiment_codes).items()})
+
+    def stock_counts(self) -> Counter:
+        """Mentions per stock symbol"""
+        values = self.symbols.values
+        return Counter({values[code]: count for code, count in Counter(self.stock_codes).items()})
+
+    def top(self, n: int) -> List[NewsArticle]:
+        """The `n` highest-impact articles, most recent first among equals"""
+        scores, published_at = self.impact_scores, self.published_at
+        indexes = heapq.nlargest(n, range(len(self)), key=lambda i: (scores[i], published_at[i]))
+        return [self[index] for index in indexes]
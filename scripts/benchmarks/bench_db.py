@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Database write throughput of save_to_database against a local PostgreSQL,
+compared with the previous one-round-trip-per-row loop.
+
+Tables are created in a throwaway `scraper_bench` schema, which is dropped
+afterwards, so DATABASE_URL may point at a development database.
+
+    DATABASE_URL=postgresql://localhost/news python scripts/benchmarks/bench_db.py
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import psycopg2  # noqa: E402
+
+from fixtures import make_articles  # noqa: E402
+from news_scraper import IndianStockNewsScraper  # noqa: E402
+
+SCHEMA = 'scraper_bench'
+
+BENCH_DDL = f"""
+DROP SCHEMA IF EXISTS {SCHEMA} CASCADE;
+CREATE SCHEMA {SCHEMA};
+SET search_path TO {SCHEMA};
+CREATE TABLE news_articles (
+    id SERIAL PRIMARY KEY,
+    headline TEXT NOT NULL,
+    summary TEXT,
+    source VARCHAR(100) NOT NULL,
+    url TEXT,
+    published_at TIMESTAMP,
+    scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    sentiment VARCHAR(20) DEFAULT 'neutral',
+    impact_score DECIMAL(3, 2) DEFAULT 0.0
+);
+CREATE TABLE news_stock_relevance (
+    id SERIAL PRIMARY KEY,
+    news_id INTEGER REFERENCES news_articles(id) ON DELETE CASCADE,
+    stock_symbol VARCHAR(20) NOT NULL,
+    relevance_score DECIMAL(3, 2) DEFAULT 0.0
+);
+CREATE TABLE news_sentiment_rollups (
+    stock_symbol VARCHAR(20) NOT NULL,
+    source VARCHAR(100) NOT NULL,
+    bucket_start TIMESTAMP NOT NULL,
+    positive_count INTEGER NOT NULL DEFAULT 0,
+    negative_count INTEGER NOT NULL DEFAULT 0,
+    neutral_count INTEGER NOT NULL DEFAULT 0,
+    article_count INTEGER NOT NULL DEFAULT 0,
+    impact_sum DECIMAL(12, 2) NOT NULL DEFAULT 0.0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (stock_symbol, source, bucket_start)
+);
+CREATE TABLE scrape_jobs (
+    id SERIAL PRIMARY KEY,
+    source_key VARCHAR(50) NOT NULL,
+    url TEXT NOT NULL UNIQUE,
+    interval_seconds INTEGER NOT NULL DEFAULT 300,
+    next_run_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    leased_by TEXT,
+    leased_until TIMESTAMPTZ,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_run_at TIMESTAMPTZ,
+    last_error TEXT,
+    last_article_count INTEGER
+);
+CREATE UNIQUE INDEX idx_news_articles_url ON news_articles(url);
+CREATE INDEX idx_news_articles_published_at ON news_articles(published_at);
+CREATE INDEX idx_news_stock_relevance_news_id ON news_stock_relevance(news_id);
+CREATE INDEX idx_scrape_jobs_next_run_at ON scrape_jobs(next_run_at);
+CREATE UNIQUE INDEX idx_news_stock_relevance_news_stock ON news_stock_relevance(news_id, stock_symbol);
+"""
+
+
+def bench_url(database_url: str) -> str:
+    """Point every connection made from the URL at the benchmark schema"""
+    separator = '&' if '?' in database_url else '?'
+    return f"{database_url}{separator}options=-csearch_path%3D{SCHEMA}"
+
+
+def legacy_save(database_url: str, articles) -> int:
+    """The previous implementation: one INSERT round trip per article and per stock"""
+    conn = psycopg2.connect(database_url)
+    cur = conn.cursor()
+    saved = 0
+    for article in articles:
+        cur.execute("""
+            INSERT INTO news_articles (headline, summary, source, url, published_at, sentiment, impact_score)
+            VALUES (%s, %s, %s, %s, %s, %s, %s)
+            ON CONFLICT (url) DO NOTHING
+            RETURNING id
+        """, (article.headline, article.summary, article.source, article.url,
+              article.published_at, article.sentiment, article.impact_score))
+        result = cur.fetchone()
+        if result:
+            for stock in article.relevant_stocks:
+                cur.execute("""
+                    INSERT INTO news_stock_relevance (news_id, stock_symbol, relevance_score)
+                    VALUES (%s, %s, %s)
+                    ON CONFLICT DO NOTHING
+                """, (result[0], stock, 0.8))
+            saved += 1
+    conn.commit()
+    conn.close()
+    return saved
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='100,10000,100000', help='comma-separated batch sizes')
+    parser.add_argument('--legacy-max', type=int, default=10000,
+                        help='largest batch to also run through the per-row loop')
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    database_url = os.getenv('DATABASE_URL')
+    if not database_url:
+        sys.exit('DATABASE_URL is required')
+
+    conn = psycopg2.connect(database_url)
+    conn.cursor().execute(BENCH_DDL)
+    conn.commit()
+
+    url = bench_url(database_url)
+    cache_dir = tempfile.TemporaryDirectory()
+    scraper = IndianStockNewsScraper(database_url=url, http_cache=False, cache_dir=cache_dir.name,
+                                     index_articles=False)
+    try:
+        print(f"{'articles':>9} {'bulk rows/s':>12} {'per-row rows/s':>15}")
+        for size in (int(size) for size in args.sizes.split(',')):
+            started = time.perf_counter()
+            saved = scraper.save_to_database(make_articles(size, seed=size, run=f'bulk-{size}'))
+            bulk_rate = saved / (time.perf_counter() - started)
+
+            legacy_rate = ''
+            if size <= args.legacy_max:
+                started = time.perf_counter()
+                saved = legacy_save(url, make_articles(size, seed=size, run=f'legacy-{size}'))
+                legacy_rate = f"{saved / (time.perf_counter() - started):,.0f}"
+            print(f"{size:>9} {bulk_rate:>12,.0f} {legacy_rate:>15}")
+    finally:
+        scraper.close()
+        cache_dir.cleanup()
+        conn.cursor().execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.commit()
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection throughput while filling a 100k-article window,
+and the latency of deduplicating a listing-sized batch against the full window.
+Headline pairs with a known answer are checked first; the script exits with an
+error if any of them is merged or kept apart wrongly.
+
+    python scripts/benchmarks/bench_dedup.py --articles 100000
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fixtures import make_headlines  # noqa: E402
+from near_duplicates import NearDuplicateIndex  # noqa: E402
+from news_scraper import NewsArticle  # noqa: E402
+
+SOURCES = ['Moneycontrol', 'Economic Times', 'Business Standard']
+
+# (headline, stocks) pairs and whether they are the same story
+CASES = [
+    (("Infosys Q2 results: net profit rises 5% to Rs 6,212 crore, beats estimates", ['INFY']),
+     ("Infosys Q2 net profit rises 5% to Rs 6,212 crore; beats Street estimates", ['INFY']), True),
+    (("Sensex jumps 500 points, Nifty ends above 19,800 as banks lead gains", []),
+     ("Sensex jumps 500 points, Nifty ends above 19,800; banks lead gains", []), True),
+    # Same template, different companies
+    (("HDFC Bank shares surge after strong quarterly profit", ['HDFCBANK']),
+     ("ICICI Bank shares surge after strong quarterly profit", ['ICICIBANK']), False),
+    (("TCS stock falls as margins disappoint in session 12", ['TCS']),
+     ("Infosys stock falls as margins disappoint in session 12", ['INFY']), False),
+    (("Tata Motors rallies on record order book", []), ("Maruti Suzuki rallies on record order book", []), False),
+    # Non-Latin headlines
+    (("रिलायंस इंडस्ट्रीज के शेयर में 3% की तेजी", ['RELIANCE']),
+     ("रिलायंस इंडस्ट्रीज के शेयर में 3% की तेजी, सेंसेक्स चढ़ा", ['RELIANCE']), True),
+    (("रिलायंस के शेयर में तेजी", []), ("इंफोसिस के नतीजे कमजोर", []), False),
+    (("टीसीएस के शेयर में तेजी", ['TCS']), ("टीसीएस के नतीजे कमजोर, शेयर फिसले", ['TCS']), False),
+]
+
+
+WORDS = ('shares stock index profit revenue margin order board bank rally slide outlook guidance '
+         'merger deal stake results quarter record dividend bonus rating upgrade downgrade probe '
+         'exports tariff inflation rupee crude yields capex launch plant expansion debt funding').split()
+
+
+def make_articles(count: int, seed: int):
+    """Distinct headlines where roughly a third are lightly reworded syndicated copies"""
+    rng = random.Random(seed)
+    companies = make_headlines(count, seed=seed)
+    headlines = []
+    articles = []
+    for i in range(count):
+        if i and rng.random() < 0.33:
+            words = headlines[rng.randrange(max(0, i - 50), i)].split()
+            words[rng.randrange(len(words))] = rng.choice(['sharply', 'pts', 'today', 'amid'])
+            headline = ' '.join(words)
+        else:
+            company = ' '.join(companies[i].split()[:2])
+            headline = f"{company} {' '.join(rng.choice(WORDS) for _ in range(7))} {rng.randint(1, 99)}%"
+        headlines.append(headline)
+        articles.append(NewsArticle(headline, '', rng.choice(SOURCES), f'https://bench.example/{seed}/{i}',
+                                    datetime.now(), 'neutral', [], rng.random()))
+    return articles
+
+
+def check_cases() -> int:
+    """Deduplicate each pair of CASES on its own. How many pairs came out wrong"""
+    wrong = 0
+    for first, second, same in CASES:
+        articles = [NewsArticle(headline, '', source, f'https://bench.example/case/{i}', datetime.now(), 'neutral',
+                                stocks, 0.5)
+                    for i, ((headline, stocks), source) in enumerate(zip((first, second), SOURCES))]
+        if (len(NearDuplicateIndex().deduplicate(articles)) == 1) != same:
+            wrong += 1
+            print(f"{'kept apart' if same else 'merged'}: {first[0]!r} / {second[0]!r}")
+    return wrong
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--articles', type=int, default=100_000, help='articles pushed through the window')
+    parser.add_argument('--batch', type=int, default=1000, help='articles per deduplicate() call')
+    args = parser.parse_args()
+
+    wrong = check_cases()
+    print(f"known pairs: {len(CASES) - wrong}/{len(CASES)} right")
+    if wrong:
+        sys.exit(1)
+
+    index = NearDuplicateIndex(window_size=args.articles)
+    articles = make_articles(args.articles, seed=1)
+
+    started = time.perf_counter()
+    kept = 0
+    for start in range(0, len(articles), args.batch):
+        kept += len(index.deduplicate(articles[start:start + args.batch]))
+    elapsed = time.perf_counter() - started
+    print(f"filled window: {args.articles:,} articles in {elapsed:.2f}s "
+          f"({args.articles / elapsed:,.0f}/s), kept {kept:,}, window {len(index):,}")
+
+    batch = make_articles(100, seed=2)
+    started = time.perf_counter()
+    index.deduplicate(batch)
+    print(f"100-article batch against full window: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Cycle latency against a faulty stand-in, with and without adaptive host
+control. By default one source hangs on some requests, one answers some with
+503 or 429, and one is healthy. The fixed mode sends every request once with
+the full timeout, as the scraper did before.
+
+    python scripts/benchmarks/bench_faults.py --cycles 10
+    python scripts/benchmarks/bench_faults.py --fault business_standard=down
+"""
+
+import argparse
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from standin_server import Faults, StandinCluster  # noqa: E402
+from metrics import Metrics  # noqa: E402
+from near_duplicates import NearDuplicateIndex  # noqa: E402
+from news_scraper import SOURCES, IndianStockNewsScraper  # noqa: E402
+
+DEFAULT_FAULTS = ['moneycontrol=hang:0.3,hang_seconds:15', 'economic_times=error:0.3,throttle:0.1']
+
+
+class FixedControl:
+    """No deadlines, retries or circuit breaking: one attempt with the full timeout"""
+
+    def __init__(self, rate_limiter, timeout: float):
+        self.rate_limiter = rate_limiter
+        self.timeout = timeout
+
+    def call(self, url, send):
+        self.rate_limiter.acquire(url)
+        return send(self.timeout)
+
+
+def run(mode: str, sources: dict, args: argparse.Namespace):
+    metrics = Metrics()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        scraper = IndianStockNewsScraper(requests_per_second=args.rate, burst=3, sources=sources,
+                                         http_cache=False, cache_dir=cache_dir, index_articles=False,
+                                         metrics=metrics, timeout=args.timeout, circuit_cooldown=args.cooldown)
+        if mode == 'fixed':
+            scraper.host_control = FixedControl(scraper.rate_limiter, args.timeout)
+        cycles, articles = [], 0
+        try:
+            for _ in range(args.cycles):
+                scraper.dedup_index = NearDuplicateIndex()
+                started = time.perf_counter()
+                articles += len(scraper.scrape_all_sources())
+                cycles.append(time.perf_counter() - started)
+        finally:
+            scraper.close()
+
+    print(f"{mode:>9} {statistics.median(cycles):>8.2f} {max(cycles):>8.2f} {sum(cycles):>8.1f} "
+          f"{articles / args.cycles:>9.1f} {metrics.total('fetch_retries_total'):>8.0f} "
+          f"{metrics.total('fetch_skipped_total'):>8.0f} {metrics.total('fetch_errors_total'):>7.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cycles', type=int, default=8, help='scrape cycles per mode')
+    parser.add_argument('--latency', type=float, default=0.1, help='stand-in response latency in seconds')
+    parser.add_argument('--rate', type=float, default=5.0, help='requests per second allowed per host')
+    parser.add_argument('--timeout', type=float, default=10.0, help='request timeout in seconds')
+    parser.add_argument('--cooldown', type=float, default=30.0, help='circuit breaker cooldown in seconds')
+    parser.add_argument('--fault', action='append', metavar='SOURCE=SPEC',
+                        help=f"faults to inject (default: {' '.join(DEFAULT_FAULTS)})")
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.CRITICAL)
+
+    faults = {}
+    for item in args.fault or DEFAULT_FAULTS:
+        key, _, spec = item.partition('=')
+        if key not in SOURCES or not spec:
+            parser.error(f"invalid --fault {item!r}")
+        faults[key] = spec
+
+    print(f"{'mode':>9} {'p50 s':>8} {'max s':>8} {'total s':>8} {'articles':>9} {'retries':>8} "
+          f"{'skipped':>8} {'errors':>7}")
+    for mode in ('fixed', 'adaptive'):
+        # Same fault sequence for both modes
+        with StandinCluster(args.latency, {key: Faults.parse(spec) for key, spec in faults.items()}) as sources:
+            run(mode, sources, args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Cycle latency of sequential vs concurrent scraping against the local stand-in.
+
+    python scripts/benchmarks/bench_fetch.py --latency 0.3 --rate 2
+"""
+
+import argparse
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from standin_server import StandinCluster  # noqa: E402
+from news_scraper import IndianStockNewsScraper  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency', type=float, default=0.3, help='stand-in response latency in seconds')
+    parser.add_argument('--rate', type=float, default=2.0, help='requests per second allowed per host')
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    with StandinCluster(args.latency) as sources:
+        for concurrent in (False, True):
+            # A throwaway cache directory keeps stand-in articles out of the real local indexes
+            with tempfile.TemporaryDirectory() as cache_dir:
+                scraper = IndianStockNewsScraper(concurrent=concurrent, requests_per_second=args.rate,
+                                                 sources=sources, http_cache=False, cache_dir=cache_dir,
+                                                 index_articles=False)
+                try:
+                    started = time.perf_counter()
+                    articles = scraper.scrape_all_sources()
+                    elapsed = time.perf_counter() - started
+                finally:
+                    scraper.close()
+            mode = 'concurrent' if concurrent else 'sequential'
+            print(f"{mode:>10}: {elapsed:6.2f}s for {len(articles)} articles")
+
+
+if __name__ == '__main__':
+    main()
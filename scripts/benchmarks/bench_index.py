@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Build rate and query latency of the local article index at scale, against a
+scan of the articles the way a lookup in scraped_news.json has to work.
+Articles arrive in scrape-cycle sized batches, mention zero to three of
+`--symbols` symbols (a few popular ones much more often) and are spread
+over `--days` days.
+
+    python scripts/benchmarks/bench_index.py --articles 1000000
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from article_index import ArticleIndex  # noqa: E402
+from articles import NewsArticle  # noqa: E402
+from fixtures import make_headlines  # noqa: E402
+
+SOURCES = ['Moneycontrol', 'Economic Times', 'Business Standard']
+BATCH_SIZE = 1000
+
+
+def synthetic_articles(count: int, symbols: List[str], days: int, seed: int = 5) -> List[NewsArticle]:
+    rng = random.Random(seed)
+    headlines = make_headlines(min(count, 50_000), seed=seed)
+    # Zipf-like popularity: a handful of large caps are in most of the news
+    weights = [1 / (rank + 1) for rank in range(len(symbols))]
+    start = datetime.now() - timedelta(days=days)
+    step = timedelta(days=days) / count
+    articles = []
+    for i in range(count):
+        stocks = set(rng.choices(symbols, weights, k=rng.choice((0, 1, 1, 2, 3))))
+        articles.append(NewsArticle(
+            headline=headlines[i % len(headlines)],
+            summary='',
+            source=SOURCES[i % len(SOURCES)],
+            url=f"https://bench.example/index/{i}",
+            published_at=start + i * step,
+            sentiment=('positive', 'negative', 'neutral')[i % 3],
+            relevant_stocks=sorted(stocks),
+            impact_score=0.5 + (i % 5) / 10,
+        ))
+    return articles
+
+
+def latencies_ms(func: Callable, arguments: List, repeat: int = 1) -> List[float]:
+    timings = []
+    for _ in range(repeat):
+        for argument in arguments:
+            started = time.perf_counter()
+            func(argument)
+            timings.append((time.perf_counter() - started) * 1000)
+    return sorted(timings)
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def scan(articles: List[NewsArticle], symbols: List[str], limit: int) -> List[NewsArticle]:
+    """The latest `limit` articles mentioning any of `symbols`, by filtering and sorting everything"""
+    wanted = set(symbols)
+    matches = [article for article in articles if wanted.intersection(article.relevant_stocks)]
+    matches.sort(key=lambda article: article.published_at, reverse=True)
+    return matches[:limit]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--articles', type=int, default=200_000, help='number of articles to index')
+    parser.add_argument('--symbols', type=int, default=200, help='number of distinct stock symbols')
+    parser.add_argument('--days', type=int, default=365, help='days the articles are spread over')
+    parser.add_argument('--queries', type=int, default=200, help='queries per query kind')
+    parser.add_argument('--limit', type=int, default=20, help='articles per query')
+    args = parser.parse_args()
+
+    symbols = [f"SYM{i:03d}" for i in range(args.symbols)]
+    articles = synthetic_articles(args.articles, symbols, args.days)
+    rng = random.Random(11)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'article_index.sqlite3')
+        index = ArticleIndex(path)
+        started = time.perf_counter()
+        for start in range(0, len(articles), BATCH_SIZE):
+            index.add(articles[start:start + BATCH_SIZE])
+        elapsed = time.perf_counter() - started
+        size = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+        print(f"indexed {args.articles:,} articles ({args.symbols} symbols) in {elapsed:.1f}s: "
+              f"{args.articles / elapsed:,.0f} articles/s, {size / 1e6:.0f} MB on disk")
+
+        week_ago = datetime.now() - timedelta(days=7)
+        limit = args.limit
+        kinds = [
+            ('one symbol', lambda s: index.query([s[0]], limit=limit)),
+            ('rare symbol', lambda s: index.query([s[-1]], limit=limit)),
+            ('three symbols, any', lambda s: index.query(s[:3], limit=limit)),
+            ('two symbols, all', lambda s: index.query(s[:2], limit=limit, match_all=True)),
+            ('one symbol, last 7d', lambda s: index.query([s[0]], since=week_ago, limit=limit)),
+        ]
+        if index.full_text:
+            kinds.append(('headline text', lambda s: index.query(text='results', limit=limit)))
+            kinds.append(('symbol + headline text', lambda s: index.query([s[0]], text='results', limit=limit)))
+
+        queries = [sorted(rng.sample(symbols, 3), key=symbols.index) for _ in range(args.queries)]
+        print(f"{'query':<24} {'p50 ms':>8} {'p99 ms':>8}")
+        for name, run in kinds:
+            timings = latencies_ms(run, queries)
+            print(f"{name:<24} {percentile(timings, 0.5):>8.2f} {percentile(timings, 0.99):>8.2f}")
+
+        timings = latencies_ms(lambda s: scan(articles, s[:3], limit), queries[:10])
+        print(f"{'scan (three symbols)':<24} {percentile(timings, 0.5):>8.2f} {percentile(timings, 0.99):>8.2f}")
+        index.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Memory held per article: the previous @dataclass NewsArticle vs the slotted
+NewsArticle vs an ArticleBatch. Each article is built from freshly parsed
+strings, the way the scraper builds them, so the figures include the
+headline, summary and URL text every representation has to keep.
+
+    python scripts/benchmarks/bench_memory.py --articles 200000
+"""
+
+import argparse
+import gc
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from articles import ArticleBatch, NewsArticle  # noqa: E402
+from fixtures import make_headlines  # noqa: E402
+
+SOURCES = ['Moneycontrol', 'Economic Times', 'Business Standard']
+STOCKS = [['TCS', 'INFY'], ['RELIANCE'], [], ['HDFCBANK', 'ICICIBANK', 'SBIN']]
+
+
+@dataclass
+class LegacyNewsArticle:
+    """NewsArticle as it was before it was slotted"""
+    headline: str
+    summary: str
+    source: str
+    url: str
+    published_at: datetime
+    sentiment: str
+    relevant_stocks: List[str]
+    impact_score: float
+    cluster_sources: List[str] = field(default_factory=list)
+
+
+def raw_articles(headlines: List[str]):
+    """Fresh field values per article, as parsing and scoring produce them"""
+    now = datetime.now()
+    for i, headline in enumerate(headlines):
+        # Copies, so no representation benefits from strings shared with the fixture list
+        headline = ''.join(headline)
+        yield dict(
+            headline=headline,
+            summary=f"{headline}. Analysts weigh the outlook for the sector and broader market.",
+            source=''.join(SOURCES[i % len(SOURCES)]),
+            url=f"https://bench.example/memory/{i}",
+            published_at=now - timedelta(minutes=i),
+            sentiment=''.join(('positive', 'negative', 'neutral')[i % 3]),
+            relevant_stocks=[''.join(stock) for stock in STOCKS[i % len(STOCKS)]],
+            impact_score=0.5 + (i % 5) / 10,
+        )
+
+
+def retained(build, headlines: List[str]) -> int:
+    """Bytes still allocated once `build` has consumed the raw articles"""
+    gc.collect()
+    tracemalloc.start()
+    result = build(raw_articles(headlines))
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--articles', type=int, default=100_000, help='number of articles to hold')
+    args = parser.parse_args()
+
+    headlines = make_headlines(args.articles, seed=3)
+    text_only = retained(lambda raws: [raw[key] for raw in raws for key in ('headline', 'summary', 'url')],
+                         headlines)
+    layouts = [
+        ('@dataclass (before)', lambda raws: [LegacyNewsArticle(**raw) for raw in raws]),
+        ('slotted NewsArticle', lambda raws: [NewsArticle(**raw) for raw in raws]),
+        ('ArticleBatch', lambda raws: ArticleBatch(NewsArticle(**raw) for raw in raws)),
+    ]
+
+    print(f"{args.articles:,} articles; headline, summary and URL text alone: "
+          f"{text_only / args.articles:,.0f} bytes/article")
+    print(f"{'layout':<22} {'MB':>8} {'bytes/article':>14} {'overhead':>9} {'vs before':>10}")
+    before = None
+    for name, build in layouts:
+        total = retained(build, headlines)
+        overhead = (total - text_only) / args.articles
+        before = before or total
+        print(f"{name:<22} {total / 1e6:>8.1f} {total / args.articles:>14,.0f} {overhead:>9,.0f} "
+              f"{total / before - 1:>+10.0%}")
+
+
+if __name__ == '__main__':
+    main()
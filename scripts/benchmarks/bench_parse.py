@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Listing page parse throughput per HTML parser and number of worker
+processes, over the benchmark fixtures of every source.
+
+    python scripts/benchmarks/bench_parse.py --pages 200 --workers 1 2 4 8
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fixtures import load_listing  # noqa: E402
+from listing_parser import PARSERS, ListingParser  # noqa: E402
+from news_scraper import SOURCES  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=120, help='pages parsed per configuration')
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({0, 1, 2, os.cpu_count() or 1}),
+                        help='worker process counts to try (0 parses inline)')
+    args = parser.parse_args()
+
+    listings = [(key, SOURCES[key]['base_url'], load_listing(key)) for key in SOURCES]
+    pages = [listings[i % len(listings)] for i in range(args.pages)]
+    megabytes = sum(len(page[2]) for page in pages) / 1e6
+    print(f"{args.pages} pages, {megabytes:.1f} MB, {os.cpu_count()} CPUs")
+
+    print(f"{'parser':<12} {'workers':>7} {'pages/s':>9} {'MB/s':>7} {'vs inline':>10}")
+    for name in PARSERS:
+        try:
+            ListingParser(name).close()
+        except ValueError as e:
+            print(f"{name:<12} skipped: {e}")
+            continue
+        inline = None
+        for workers in args.workers:
+            listing_parser = ListingParser(name, workers=workers)
+            try:
+                # Start the pool outside the timed region
+                list(listing_parser.parse_many(pages[:max(workers, 1)]))
+                started = time.perf_counter()
+                items = sum(len(result) for result in listing_parser.parse_many(pages))
+                elapsed = time.perf_counter() - started
+            finally:
+                listing_parser.close()
+            rate = args.pages / elapsed
+            inline = inline or rate
+            print(f"{name:<12} {workers:>7} {rate:>9,.1f} {megabytes / elapsed:>7.1f} {rate / inline:>9.2f}x"
+                  f"  ({items} items)")
+
+
+if __name__ == '__main__':
+    main()
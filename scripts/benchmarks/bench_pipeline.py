@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Scrape cycle time against the local stand-in with the database write after
+the scrape (serial, as before) and with pages written by the background
+writer while later pages are still downloading (pipelined).
+
+With DATABASE_URL set the writes go to a throwaway `scraper_bench` schema
+(see bench_db.py); without it each write is simulated by sleeping
+--batch-ms plus --article-ms per article, e.g. to model a remote or busy
+database. --queue-size shows the effect of backpressure on a slow writer.
+Both modes also check that every article in the local symbol index was
+linked to its database id, and exit with an error if one wasn't.
+
+    python scripts/benchmarks/bench_pipeline.py --cycles 5 --batch-ms 150 --article-ms 3
+    DATABASE_URL=postgresql://localhost/news python scripts/benchmarks/bench_pipeline.py
+"""
+
+import argparse
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from metrics import Metrics  # noqa: E402
+from near_duplicates import NearDuplicateIndex  # noqa: E402
+from news_scraper import IndianStockNewsScraper  # noqa: E402
+from standin_server import StandinCluster  # noqa: E402
+
+
+class SimulatedDatabase:
+    """Stands in for _save_articles: sleeps like a database round trip and commit"""
+
+    def __init__(self, metrics: Metrics, batch_ms: float, article_ms: float):
+        self.metrics = metrics
+        self.batch_ms = batch_ms
+        self.article_ms = article_ms
+
+    def __call__(self, articles) -> list:
+        with self.metrics.timer('db_write_seconds'):
+            time.sleep((self.batch_ms + self.article_ms * len(articles)) / 1000)
+        self.metrics.inc('db_rows_total', len(articles))
+        return list(enumerate(articles))
+
+
+def run(mode: str, sources: dict, database_url: str, args: argparse.Namespace) -> int:
+    """Runs and prints one mode. Returns how many indexed articles have no database id"""
+    metrics = Metrics()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        scraper = IndianStockNewsScraper(database_url=database_url, requests_per_second=args.rate, burst=1,
+                                         sources=sources, http_cache=False, cache_dir=cache_dir,
+                                         metrics=metrics, db_queue_size=args.queue_size,
+                                         db_batch_size=args.batch_size, db_flush_interval=args.flush_interval)
+        if not os.getenv('DATABASE_URL'):
+            scraper._save_articles = SimulatedDatabase(metrics, args.batch_ms, args.article_ms)
+        cycles, articles = [], 0
+        try:
+            for _ in range(args.cycles):
+                scraper.dedup_index = NearDuplicateIndex()
+                # As at a daemon poll, the hosts' buckets have refilled since the last cycle
+                for bucket in scraper.rate_limiter.buckets.values():
+                    bucket.tokens = bucket.capacity
+                started = time.perf_counter()
+                if mode == 'serial':
+                    batch = scraper.scrape_all_sources()
+                    scraper.save_to_database(batch)
+                else:
+                    batch = scraper.scrape_and_save()
+                cycles.append(time.perf_counter() - started)
+                articles += len(batch)
+            unlinked = scraper.article_index.conn.execute(
+                "SELECT COUNT(*) FROM articles WHERE news_id IS NULL").fetchone()[0]
+        finally:
+            scraper.close()
+
+    # Time spent in each stage summed over its threads, per cycle
+    fetch = metrics.total_seconds('fetch_seconds') / args.cycles
+    parse = (metrics.total_seconds('parse_seconds') + metrics.total_seconds('score_seconds')) / args.cycles
+    write = metrics.total_seconds('db_write_seconds') / args.cycles
+    print(f"{mode:>9} {statistics.median(cycles):>8.2f} {max(cycles):>8.2f} {fetch:>8.2f} {parse:>8.2f} "
+          f"{write:>8.2f} {metrics.total('db_batches_total') / args.cycles:>8.1f} "
+          f"{metrics.total_seconds('db_backpressure_seconds'):>8.2f} {articles / args.cycles:>9.1f} {unlinked:>9}")
+    return unlinked
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--cycles', type=int, default=5, help='scrape cycles per mode')
+    parser.add_argument('--latency', type=float, default=0.2, help='stand-in response latency in seconds')
+    parser.add_argument('--rate', type=float, default=0.5,
+                        help='requests per second allowed per host (default: 0.5, as in the scraper)')
+    parser.add_argument('--batch-ms', type=float, default=150.0,
+                        help='simulated round trip and commit per written batch, in ms')
+    parser.add_argument('--article-ms', type=float, default=3.0, help='simulated write time per article, in ms')
+    parser.add_argument('--batch-size', type=int, default=1000, help='articles per database batch')
+    parser.add_argument('--flush-interval', type=float, default=0.5,
+                        help='seconds before the background writer commits a partial batch')
+    parser.add_argument('--queue-size', type=int, default=5000,
+                        help='articles queued for the background writer before scraping blocks')
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.CRITICAL)
+
+    database_url = os.getenv('DATABASE_URL')
+    conn = None
+    if database_url:
+        import psycopg2
+        from bench_db import BENCH_DDL, SCHEMA, bench_url
+        conn = psycopg2.connect(database_url)
+        conn.cursor().execute(BENCH_DDL)
+        conn.commit()
+        database_url = bench_url(database_url)
+    else:
+        print(f"simulated database: {args.batch_ms:g} ms per batch + {args.article_ms:g} ms per article")
+
+    try:
+        print(f"{'mode':>9} {'p50 s':>8} {'max s':>8} {'fetch s':>8} {'parse s':>8} {'write s':>8} "
+              f"{'batches':>8} {'blocked':>8} {'articles':>9} {'unlinked':>9}")
+        with StandinCluster(args.latency) as sources:
+            unlinked = 0
+            for mode in ('serial', 'pipelined'):
+                if conn is not None:
+                    # Each mode starts from empty tables, so all of its articles are new rows
+                    conn.cursor().execute(f"TRUNCATE {SCHEMA}.news_stock_relevance, {SCHEMA}.news_articles, "
+                                          f"{SCHEMA}.news_sentiment_rollups")
+                    conn.commit()
+                unlinked += run(mode, sources, database_url or 'postgresql://simulated', args)
+    finally:
+        if conn is not None:
+            conn.cursor().execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+            conn.commit()
+            conn.close()
+    if unlinked:
+        sys.exit(f"{unlinked} indexed articles were not linked to their database id")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Page archive write rate and size, and replay throughput (parse, extract,
+score, dedup) per number of parse workers, over a synthetic archive of
+listing captures. Also projects how long a replay of 90 days of captures
+takes, polling every listing URL every 5 minutes.
+
+    python scripts/benchmarks/bench_replay.py --pages 20000 --workers 0 4
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fixtures import render_listing  # noqa: E402
+from news_scraper import SOURCES, IndianStockNewsScraper  # noqa: E402
+from page_archive import PageArchive  # noqa: E402
+
+# Distinct page versions per source; captures cycle through them
+VERSIONS = 100
+POLL_SECONDS = 300
+
+
+def build_archive(directory: str, pages: int) -> float:
+    """Archive `pages` captures, POLL_SECONDS apart per URL. Returns seconds spent appending"""
+    urls = [(key, url) for key in SOURCES for url in SOURCES[key]['urls']]
+    versions = {key: [render_listing(key, seed=seed).encode('utf-8') for seed in range(VERSIONS)]
+                for key in SOURCES}
+    archive = PageArchive(directory)
+    start = time.time() - pages / len(urls) * POLL_SECONDS
+    elapsed = 0.0
+    try:
+        for i in range(pages):
+            key, url = urls[i % len(urls)]
+            content = versions[key][(i // len(urls)) % VERSIONS]
+            started = time.perf_counter()
+            archive.append(url, key, 200, {'Content-Type': 'text/html'}, content,
+                           fetched_at=start + i // len(urls) * POLL_SECONDS)
+            elapsed += time.perf_counter() - started
+    finally:
+        archive.close()
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=5000, help='captures in the synthetic archive')
+    parser.add_argument('--workers', type=int, nargs='+', default=sorted({0, os.cpu_count() or 1}),
+                        help='parse worker counts to try (0 parses inline)')
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    urls = sum(len(source['urls']) for source in SOURCES.values())
+    pages_per_day = urls * 24 * 3600 / POLL_SECONDS
+    with tempfile.TemporaryDirectory() as directory:
+        archive_dir = os.path.join(directory, 'archive')
+        elapsed = build_archive(archive_dir, args.pages)
+        archive = PageArchive(archive_dir)
+        raw = sum(len(page.content) for page in archive.pages())
+        size = archive.stats()['bytes']
+        print(f"archived {args.pages:,} pages at {args.pages / elapsed:,.0f} pages/s; "
+              f"{raw / args.pages / 1024:.1f} KB/page raw, {size / args.pages / 1024:.1f} KB/page archived "
+              f"({size / pages_per_day / 1e6 * 90:,.0f} MB per 90 days)")
+
+        started = time.perf_counter()
+        for _ in archive.pages():
+            pass
+        print(f"read and decompress: {args.pages / (time.perf_counter() - started):,.0f} pages/s")
+
+        print(f"{'workers':>7} {'pages/s':>9} {'articles':>9} {'90 days':>9}")
+        for workers in args.workers:
+            scraper = IndianStockNewsScraper(parse_workers=workers, http_cache=False, index_articles=False,
+                                             cache_dir=directory)
+            try:
+                started = time.perf_counter()
+                articles = sum(len(batch) for batch in scraper.replay(archive))
+                elapsed = time.perf_counter() - started
+            finally:
+                scraper.close()
+            rate = args.pages / elapsed
+            print(f"{workers:>7} {rate:>9,.0f} {articles:>9,} {pages_per_day * 90 / rate / 60:>7.1f} m")
+        archive.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Cold-start time of short-lived scraper invocations, each in a fresh
+interpreter: --help, a `query` against a local index, and a JSON-only
+scrape of one listing page from the local stand-in server (--latency
+simulates the network). The scrape is timed with a cold and a warm matcher cache, for
+the bundled symbol master and for a large synthetic one. Also lists which
+heavy dependencies each invocation imported.
+
+    python scripts/benchmarks/bench_startup.py --runs 10 --aliases 8000
+"""
+
+import argparse
+import atexit
+import csv
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+SCRIPTS_DIR = str(Path(__file__).resolve().parent.parent)
+
+HEAVY_MODULES = ('requests', 'bs4', 'lxml', 'numpy', 'psycopg2')
+
+# Each probe runs one command line through news_scraper.main, with SOURCES pointed at the stand-in
+PROBE = """
+import sys
+sys.argv[0] = 'news_scraper.py'
+import news_scraper
+news_scraper.SOURCES.update({sources!r})
+try:
+    news_scraper.main({argv!r})
+except SystemExit:  # --help
+    pass
+print('\\nIMPORTED', ','.join(m for m in {heavy!r} if m in sys.modules))
+"""
+
+COMMANDS = {
+    'help': ['--help'],
+    'query': ['query', 'INFY', 'TCS', '--limit', '5'],
+    'scrape': ['--no-db', '--no-index', '--output', os.devnull, 'scrape', 'moneycontrol'],
+}
+
+
+def run_probe(argv: List[str], env: Dict[str, str], sources: Optional[dict] = None) -> tuple:
+    """Seconds until the invocation exits, and the heavy modules it imported"""
+    code = PROBE.format(argv=argv, sources=sources or {}, heavy=HEAVY_MODULES)
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', code], cwd=SCRIPTS_DIR, env=env,
+                            capture_output=True, text=True)
+    elapsed = time.perf_counter() - started
+    if result.returncode:
+        raise RuntimeError(f"{' '.join(argv)} failed: {result.stderr[-500:]}")
+    return elapsed, result.stdout.rpartition('IMPORTED ')[2].strip()
+
+
+def probe_env(cache_dir: str, symbol_master: Optional[str] = None) -> Dict[str, str]:
+    env = dict(os.environ, SCRAPER_CACHE_DIR=cache_dir)
+    env.pop('DATABASE_URL', None)
+    if symbol_master:
+        env['SYMBOL_MASTER'] = symbol_master
+    return env
+
+
+def build_index(cache_dir: str, articles: int):
+    """A local article index for the query probe"""
+    from article_index import ArticleIndex
+    from fixtures import make_articles
+    from news_scraper import ARTICLE_INDEX_FILE
+
+    os.makedirs(cache_dir, exist_ok=True)
+    index = ArticleIndex(os.path.join(cache_dir, ARTICLE_INDEX_FILE))
+    index.add(make_articles(articles, seed=3))
+    index.close()
+
+
+def write_symbol_master(path: str, aliases: int):
+    """A symbol master CSV in NSE's layout, padded with made-up companies"""
+    from bench_symbols import synthetic_mapping
+
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['SYMBOL', 'NAME OF COMPANY', 'aliases'])
+        for symbol, names in synthetic_mapping(aliases).items():
+            writer.writerow([symbol, names[0], '|'.join(names[1:])])
+
+
+def one_page(sources: Dict[str, dict]) -> Dict[str, dict]:
+    """Just the first Moneycontrol listing, so the per-host rate limit doesn't dominate"""
+    return {'moneycontrol': dict(sources['moneycontrol'], urls=sources['moneycontrol']['urls'][:1])}
+
+
+def clear_cache(cache_dir: str, matchers: bool = False):
+    """Forget fetched pages, so every scrape parses them again, and optionally the compiled matchers"""
+    for name in os.listdir(cache_dir):
+        if name.startswith('http_cache.sqlite3') or (matchers and name.startswith('symbol_matcher-')):
+            os.remove(os.path.join(cache_dir, name))
+
+
+def measure(name: str, argv: List[str], env: Dict[str, str], runs: int, sources: Optional[dict] = None,
+            before=None) -> Dict[str, object]:
+    """Median and best of `runs` fresh-interpreter invocations; `before` runs ahead of each"""
+    times, imported = [], ''
+    for _ in range(runs):
+        if before:
+            before()
+        elapsed, imported = run_probe(argv, env, sources)
+        times.append(elapsed)
+    return {'name': name, 'median': statistics.median(times), 'best': min(times), 'imported': imported}
+
+
+def bare_interpreter(env: Dict[str, str], runs: int) -> Dict[str, object]:
+    """Startup of the interpreter alone, for reference"""
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, '-c', 'pass'], env=env, check=True)
+        times.append(time.perf_counter() - started)
+    return {'name': 'python -c pass', 'median': statistics.median(times), 'best': min(times), 'imported': ''}
+
+
+def startup_times(runs: int, aliases: int = 0, latency: float = 0.1) -> List[Dict[str, object]]:
+    """Cold-start measurements of every probe"""
+    from standin_server import StandinCluster
+
+    results = []
+    workdir = tempfile.mkdtemp()
+    try:
+        cache_dir = os.path.join(workdir, 'cache')
+        build_index(cache_dir, 20_000)
+        env = probe_env(cache_dir)
+        # Warm the bytecode caches once so every probe starts from the same state
+        run_probe(COMMANDS['help'], env)
+
+        results.append(bare_interpreter(env, runs))
+        results.append(measure('help', COMMANDS['help'], env, runs))
+        results.append(measure('query', COMMANDS['query'], env, runs))
+
+        with StandinCluster(latency) as sources:
+            sources = one_page(sources)
+            scrape = COMMANDS['scrape']
+            results.append(measure('scrape', scrape, env, runs, sources, before=lambda: clear_cache(cache_dir)))
+            results.append(measure('scrape, cold matcher cache', scrape, env, runs, sources,
+                                   before=lambda: clear_cache(cache_dir, matchers=True)))
+            if aliases:
+                master = os.path.join(workdir, 'symbols.csv')
+                write_symbol_master(master, aliases)
+                env = probe_env(cache_dir, master)
+                results.append(measure(f'scrape, {aliases:,} aliases', scrape, env, runs, sources,
+                                       before=lambda: clear_cache(cache_dir)))
+                results.append(measure(f'scrape, {aliases:,} aliases, cold matcher cache', scrape, env, runs,
+                                       sources, before=lambda: clear_cache(cache_dir, matchers=True)))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def cold_start_stages(workdir: str, latency: float = 0.1) -> list:
+    """(name, unit, function) stages for run_benchmarks.py, one fresh-interpreter invocation per call"""
+    from standin_server import StandinCluster
+
+    cache_dir = os.path.join(workdir, 'cold_start')
+    build_index(cache_dir, 20_000)
+    env = probe_env(cache_dir)
+    cluster = StandinCluster(latency)
+    sources = one_page(cluster.start())
+    atexit.register(cluster.stop)
+
+    def stage(argv: List[str], before=None):
+        def run() -> int:
+            if before:
+                before()
+            run_probe(argv, env, sources)
+            return 1
+        return run
+
+    return [(f'cold_start.{name}', 'invocations', stage(argv, lambda: clear_cache(cache_dir)))
+            for name, argv in COMMANDS.items()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=7, help='invocations per probe (median and best are reported)')
+    parser.add_argument('--aliases', type=int, default=8000,
+                        help='aliases in the large synthetic symbol master (0 skips it)')
+    parser.add_argument('--latency', type=float, default=0.1, help='stand-in response latency in seconds')
+    parser.add_argument('--json', action='store_true', help='print the results as JSON')
+    args = parser.parse_args()
+
+    results = startup_times(args.runs, args.aliases, args.latency)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+    print(f"{'invocation':<40} {'median ms':>10} {'best ms':>8}  heavy imports")
+    for result in results:
+        print(f"{result['name']:<40} {result['median'] * 1000:>10.0f} {result['best'] * 1000:>8.0f}  "
+              f"{result['imported'] or '-'}")
+
+
+if __name__ == '__main__':
+    main()
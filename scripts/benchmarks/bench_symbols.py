@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Symbol extraction throughput: naive per-alias substring scan vs the
+precompiled SymbolMatcher, at 20, 500 and 5,000 aliases.
+
+    python scripts/benchmarks/bench_symbols.py
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fixtures import make_headlines  # noqa: E402
+from symbol_matcher import DEFAULT_SYMBOL_MASTER, SymbolMatcher, load_symbol_master  # noqa: E402
+
+SYLLABLES = ['ra', 'jan', 'tek', 'vi', 'sha', 'mo', 'dar', 'pri', 'lak', 'sun', 'indo', 'bha', 'ram', 'nav']
+SUFFIXES = ['Industries', 'Finance', 'Pharma', 'Motors', 'Cement', 'Power', 'Textiles', 'Chemicals', 'Bank']
+
+
+def synthetic_mapping(alias_count: int, seed: int = 7):
+    """The real symbol master padded with made-up companies up to `alias_count` aliases"""
+    rng = random.Random(seed)
+    mapping = load_symbol_master(DEFAULT_SYMBOL_MASTER)
+    total = sum(len(aliases) for aliases in mapping.values())
+    while total < alias_count:
+        stem = ''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 3))).title()
+        symbol = f"{stem.upper()[:8]}{len(mapping)}"
+        aliases = [f"{stem} {rng.choice(SUFFIXES)}", stem][:min(2, alias_count - total)]
+        mapping[symbol] = aliases
+        total += len(aliases)
+    return mapping
+
+
+def naive_extract(mapping, text):
+    found = []
+    text_upper = text.upper()
+    for symbol, names in mapping.items():
+        for name in names:
+            if name.upper() in text_upper:
+                found.append(symbol)
+                break
+    return list(set(found))
+
+
+def throughput(func, texts) -> float:
+    started = time.perf_counter()
+    for text in texts:
+        func(text)
+    return len(texts) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--articles', type=int, default=2000, help='number of synthetic articles to scan')
+    args = parser.parse_args()
+
+    texts = [f"{h}. Analysts weigh the outlook for the sector and broader market." for h in make_headlines(args.articles)]
+    print(f"{'aliases':>8} {'build ms':>9} {'naive art/s':>12} {'matcher art/s':>14} {'speedup':>8}")
+    for alias_count in (20, 500, 5000):
+        mapping = synthetic_mapping(alias_count)
+        started = time.perf_counter()
+        matcher = SymbolMatcher(mapping)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        naive = throughput(lambda text: naive_extract(mapping, text), texts)
+        fast = throughput(matcher.find, texts)
+        print(f"{alias_count:>8} {build_ms:>9.1f} {naive:>12,.0f} {fast:>14,.0f} {fast / naive:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Savings of targeted listing parsing per source: bytes that have to be
+downloaded before the item quota is complete, and parse time with a full
+DOM vs SoupStrainer-restricted parsing of that prefix.
+
+    python scripts/benchmarks/bench_targeted.py
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fixtures import is_recorded, load_listing  # noqa: E402
+from listing_parser import PARSERS, ItemQuotaScanner, ListingParser, parse_listing  # noqa: E402
+from news_scraper import SOURCES  # noqa: E402
+
+CHUNK_SIZE = 16 * 1024
+
+
+def needed_prefix(source_key: str, content: bytes) -> bytes:
+    """The part of `content` read before the scanner stops, in the fetcher's chunk size"""
+    scanner = ItemQuotaScanner.for_source(source_key)
+    if scanner is None:
+        return content
+    for end in range(CHUNK_SIZE, len(content) + CHUNK_SIZE, CHUNK_SIZE):
+        if scanner.feed(content[end - CHUNK_SIZE:end]):
+            return content[:end]
+    return content
+
+
+def best_ms(func, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=5, help='timed runs per measurement (best is kept)')
+    args = parser.parse_args()
+
+    parsers = []
+    for name in PARSERS:
+        try:
+            ListingParser(name)
+            parsers.append(name)
+        except ValueError as e:
+            print(f"{name}: skipped ({e})")
+
+    print(f"{'source':<18} {'page KB':>8} {'read KB':>8} {'saved':>6}  "
+          + ' '.join(f"{name + ' ms':>16} {'targeted':>9}" for name in parsers))
+    for key in SOURCES:
+        content = load_listing(key)
+        prefix = needed_prefix(key, content)
+        base_url = SOURCES[key]['base_url']
+
+        # published_at is relative to now, so compare everything else
+        full_items = [item[:3] for item in parse_listing(key, base_url, content, parsers[0], targeted=False)]
+        targeted_items = [item[:3] for item in parse_listing(key, base_url, prefix, parsers[0])]
+        if targeted_items != full_items:
+            print(f"{key}: targeted parsing returned different items")
+
+        timings = []
+        for name in parsers:
+            full = best_ms(lambda: parse_listing(key, base_url, content, name, targeted=False), args.repeat)
+            targeted = best_ms(lambda: parse_listing(key, base_url, prefix, name), args.repeat)
+            timings.append(f"{full:>16.1f} {targeted:>9.1f}")
+
+        label = key if is_recorded(key) else f"{key}*"
+        print(f"{label:<18} {len(content) / 1024:>8.0f} {len(prefix) / 1024:>8.0f} "
+              f"{1 - len(prefix) / len(content):>6.0%}  " + ' '.join(timings))
+    print("* synthetic fixture")
+
+
+if __name__ == '__main__':
+    main()
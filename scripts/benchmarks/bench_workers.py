@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Throughput of the distributed `worker` mode: N local worker processes
+drain one round of listing-URL jobs from a shared scrape_jobs table, for
+each N in --workers. Pages come from the local stand-in, spread over
+--pages URLs on its three hosts, and articles are written to a throwaway
+`scraper_bench` schema (see bench_db.py).
+
+--kill SIGKILLs one worker halfway through a round, so its leased jobs are
+only finished by the others once --lease has expired.
+
+    DATABASE_URL=postgresql://localhost/news python scripts/benchmarks/bench_workers.py --workers 1 2 4
+"""
+
+import argparse
+import json
+import logging
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import psycopg2  # noqa: E402
+
+from bench_db import BENCH_DDL, SCHEMA, bench_url  # noqa: E402
+from standin_server import StandinCluster  # noqa: E402
+from work_queue import ScrapeJobQueue  # noqa: E402
+
+SCRIPTS_DIR = str(Path(__file__).resolve().parent.parent)
+
+# One worker process: the scraper pointed at the stand-in, stopped by SIGTERM. Its seen-URL index
+# lives in a throwaway cache directory, not the user's
+WORKER = """
+import json, signal, sys, threading
+from news_scraper import IndianStockNewsScraper
+from work_queue import ScrapeJobQueue
+scraper = IndianStockNewsScraper(sources=json.loads(sys.argv[1]), requests_per_second={rate!r}, burst=1,
+                                 http_cache=False, index_articles=False, track_seen=True, db_pool_size=2,
+                                 cache_dir=sys.argv[3])
+queue = ScrapeJobQueue(scraper.database_url, worker_id=sys.argv[2], lease_seconds={lease!r})
+stop_event = threading.Event()
+signal.signal(signal.SIGTERM, lambda *_: stop_event.set())
+try:
+    scraper.run_worker(queue, stop_event, max_idle=1.0)
+finally:
+    queue.close()
+    scraper.close()
+"""
+
+
+def spread(sources: Dict[str, dict], pages: int) -> Dict[str, dict]:
+    """The stand-in sources with `pages` listing URLs between them"""
+    keys = list(sources)
+    return {key: dict(source, urls=[f"{source['base_url']}/markets/page-{i}"
+                                    for i in range(pages) if keys[i % len(keys)] == key])
+            for key, source in sources.items()}
+
+
+def round_trip(conn, database_url: str, sources: Dict[str, dict], workers: int, args: argparse.Namespace,
+               cache_dir: str) -> dict:
+    """Seconds for `workers` processes to run every job once"""
+    cur = conn.cursor()
+    cur.execute("TRUNCATE scrape_jobs, news_stock_relevance, news_articles, news_sentiment_rollups")
+    conn.commit()
+    # One round: nothing is due again within the benchmark
+    queue = ScrapeJobQueue(database_url)
+    total = queue.sync(sources, {key: 3600 for key in sources})
+    queue.close()
+
+    env = dict(os.environ, DATABASE_URL=database_url)
+    code = WORKER.format(rate=args.rate, lease=args.lease)
+    started = time.perf_counter()
+    processes = [subprocess.Popen([sys.executable, '-c', code, json.dumps(sources), f'bench-{i}',
+                                   os.path.join(cache_dir, f'{workers}-{i}')],
+                                  cwd=SCRIPTS_DIR, env=env, stderr=subprocess.DEVNULL)
+                 for i in range(workers)]
+    killed = False
+    try:
+        while True:
+            cur.execute("SELECT COUNT(last_run_at) FROM scrape_jobs")
+            done = cur.fetchone()[0]
+            conn.commit()
+            if done >= total or time.perf_counter() - started > args.timeout:
+                break
+            if args.kill and workers > 1 and not killed and done >= total // 2:
+                processes[0].send_signal(signal.SIGKILL)
+                killed = True
+            time.sleep(0.1)
+        elapsed = time.perf_counter() - started
+    finally:
+        for process in processes:
+            if process.poll() is None:
+                process.send_signal(signal.SIGTERM)
+        for process in processes:
+            process.wait()
+
+    cur.execute("SELECT COUNT(*) FROM scrape_jobs WHERE last_error IS NOT NULL")
+    failed = cur.fetchone()[0]
+    cur.execute("SELECT COUNT(*) FROM news_articles")
+    articles = cur.fetchone()[0]
+    conn.commit()
+    return {'workers': workers, 'seconds': elapsed, 'jobs': total, 'done': done, 'failed': failed,
+            'articles': articles, 'killed': killed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4], help='worker process counts to try')
+    parser.add_argument('--pages', type=int, default=120, help='listing URLs in the job table')
+    parser.add_argument('--latency', type=float, default=0.2, help='stand-in response latency in seconds')
+    parser.add_argument('--rate', type=float, default=2.0, help='requests per second per host, per worker')
+    parser.add_argument('--lease', type=float, default=10.0, help='job lease in seconds')
+    parser.add_argument('--kill', action='store_true', help='SIGKILL one worker halfway through each round')
+    parser.add_argument('--timeout', type=float, default=300.0, help='give up on a round after this many seconds')
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    database_url = os.getenv('DATABASE_URL')
+    if not database_url:
+        sys.exit('DATABASE_URL is required')
+    conn = psycopg2.connect(database_url)
+    conn.cursor().execute(BENCH_DDL)
+    conn.commit()
+
+    results: List[dict] = []
+    try:
+        with StandinCluster(args.latency) as sources, tempfile.TemporaryDirectory() as cache_dir:
+            sources = spread(sources, args.pages)
+            print(f"{'workers':>7} {'seconds':>8} {'pages/s':>8} {'speedup':>8} {'done':>6} {'failed':>7} "
+                  f"{'articles':>9}")
+            for workers in args.workers:
+                result = round_trip(conn, bench_url(database_url), sources, workers, args, cache_dir)
+                results.append(result)
+                rate = result['done'] / result['seconds']
+                speedup = rate / (results[0]['done'] / results[0]['seconds'])
+                print(f"{workers:>7} {result['seconds']:>8.1f} {rate:>8.1f} {speedup:>7.1f}x "
+                      f"{result['done']:>3}/{result['jobs']:<3} {result['failed']:>6} {result['articles']:>9}"
+                      + (' (one worker killed)' if result['killed'] else ''))
+    finally:
+        conn.cursor().execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+        conn.commit()
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Listing page fixtures for offline benchmarks and the stand-in server.
+
+Pages recorded with record_fixtures.py are read from fixtures/<source>.html.
+Without a recording, a deterministic synthetic page shaped like the real
+Moneycontrol, Economic Times or Business Standard markup is used instead.
+"""
+
+import os
+import random
+from datetime import datetime, timedelta
+from typing import List
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+COMPANIES = [
+    'TCS', 'Infosys', 'Reliance Industries', 'HDFC Bank', 'ICICI Bank', 'State Bank of India',
+    'Wipro', 'Maruti Suzuki', 'Sun Pharma', 'Tata Motors', 'Bharti Airtel', 'HCL Tech',
+    'Asian Paints', 'Kotak Mahindra Bank', 'Larsen & Toubro', 'Axis Bank', 'Bajaj Finance',
+    'UltraTech Cement', 'Nestle India', 'Power Grid Corporation',
+]
+
+VERBS = [
+    'shares surge after strong quarterly profit', 'stock falls as margins disappoint',
+    'rallies on record order book', 'slides after regulator announces penalty',
+    'announces dividend and bonus issue', 'reports revenue growth beating estimates',
+    'plunges on weak guidance for the year', 'gains as brokerages turn bullish',
+    'trades flat ahead of board meeting', 'faces investigation over accounting concerns',
+]
+
+# Vocabulary of the synthetic article bodies
+WORDS = ('shares stock index profit revenue margin order board bank rally slide outlook guidance '
+         'merger deal stake results quarter record dividend bonus rating upgrade downgrade probe '
+         'exports tariff inflation rupee crude yields capex launch plant expansion debt funding '
+         'monsoon demand pricing volumes subsidiary buyback promoter pledge block foreign inflows').split()
+
+FILLER = ('<nav class="menu">' + ''.join(f'<a href="/section/{i}">Section {i}</a>' for i in range(60)) + '</nav>'
+          '<div class="ad-slot"><script>var ad = {};</script></div>')
+
+
+def make_headlines(count: int, seed: int = 0) -> List[str]:
+    """Deterministic pseudo-random market headlines"""
+    rng = random.Random(seed)
+    return [f"{rng.choice(COMPANIES)} {rng.choice(VERBS)} in session {rng.randint(1, 10_000)}"
+            for _ in range(count)]
+
+
+def render_listing(source_key: str, items: int = 30, seed: int = 0, padding: int = 20) -> str:
+    """Render a listing page for `source_key` with `items` stories and `padding` blocks of chrome"""
+    headlines = make_headlines(items, seed)
+    stories = []
+    for i, headline in enumerate(headlines):
+        href = f"/news/{source_key}/{seed}-{i}.html"
+        summary = f"{headline}. Analysts weigh the outlook for the sector and broader market."
+        if source_key == 'moneycontrol':
+            stories.append(f'<li class="clearfix"><h2><a href="{href}">{headline}</a></h2>'
+                           f'<p>{summary}</p><span class="ago">{i + 1} hours ago</span></li>')
+        elif source_key == 'economic_times':
+            stories.append(f'<div class="eachStory"><h3><a href="{href}">{headline}</a></h3>'
+                           f'<p>{summary}</p></div>')
+        else:
+            stories.append(f'<div class="listingstyle"><h2><a href="{href}">{headline}</a></h2>'
+                           f'<p>{summary}</p></div>')
+
+    body = ''.join(stories)
+    if source_key == 'moneycontrol':
+        body = f'<ul id="cagetory">{body}</ul>'
+    chrome = FILLER * padding
+    return (f'<!DOCTYPE html><html><head><title>{source_key}</title></head><body>'
+            f'<header>{chrome}</header><main>{body}</main><footer>{chrome}</footer></body></html>')
+
+
+def render_article(story: int, paragraphs: int = 12, padding: int = 5) -> str:
+    """Render an article page. Pages with the same `story` have the same body, like syndicated copies"""
+    rng = random.Random(story)
+    companies = rng.sample(COMPANIES, 3)
+    body = ''.join(f"<p>{companies[i % 3]} {rng.choice(VERBS)} as {' '.join(rng.sample(WORDS, 12))}.</p>"
+                   for i in range(paragraphs))
+    chrome = FILLER * padding
+    return (f'<!DOCTYPE html><html><head><title>Story {story}</title></head><body>'
+            f'<header>{chrome}</header><article><h1>Story {story}</h1><p>By Staff</p>{body}</article>'
+            f'<footer>{chrome}</footer></body></html>')
+
+
+def fixture_path(source_key: str) -> str:
+    return os.path.join(FIXTURES_DIR, f'{source_key}.html')
+
+
+def load_listing(source_key: str) -> bytes:
+    """The recorded listing page of `source_key`, or a synthetic one if none was recorded"""
+    try:
+        with open(fixture_path(source_key), 'rb') as f:
+            return f.read()
+    except FileNotFoundError:
+        return render_listing(source_key).encode('utf-8')
+
+
+def is_recorded(source_key: str) -> bool:
+    return os.path.exists(fixture_path(source_key))
+
+
+def make_articles(count: int, seed: int = 0, run: str = 'bench') -> list:
+    """Synthetic NewsArticle corpus with a realistic mix of sources, sentiment and stocks"""
+    from news_scraper import NewsArticle
+
+    now = datetime.now()
+    stocks = [['TCS', 'INFY'], ['RELIANCE'], [], ['HDFCBANK', 'ICICIBANK', 'SBIN']]
+    sources = ['Moneycontrol', 'Economic Times', 'Business Standard']
+    return [NewsArticle(
+        headline=headline,
+        summary=f"{headline}. Analysts weigh the outlook for the sector and broader market.",
+        source=sources[i % len(sources)],
+        url=f"https://bench.example/{run}/{i}",
+        published_at=now - timedelta(minutes=i),
+        sentiment=('positive', 'negative', 'neutral')[i % 3],
+        relevant_stocks=stocks[i % len(stocks)],
+        impact_score=0.5 + (i % 5) / 10
+    ) for i, headline in enumerate(make_headlines(count, seed=seed))]
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Record the first listing page of each source into fixtures/<source>.html
+so benchmarks run against real markup without touching the network.
+
+    python scripts/benchmarks/record_fixtures.py
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fixtures import FIXTURES_DIR, fixture_path  # noqa: E402
+from news_scraper import IndianStockNewsScraper  # noqa: E402
+
+
+def record(scraper: IndianStockNewsScraper):
+    """Fetch the first listing page of each source into its fixture file"""
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    for key, source in scraper.sources.items():
+        url = source['urls'][0]
+        try:
+            content = scraper._fetch(url, key)
+        except Exception as e:
+            print(f"{key}: failed to fetch {url}: {e}")
+            continue
+        with open(fixture_path(key), 'wb') as f:
+            f.write(content)
+        print(f"{key}: recorded {len(content):,} bytes from {url}")
+
+
+def main():
+    # Whole pages, so targeted and full parsing can both be benchmarked. Nothing is indexed or
+    # cached in the user's cache directory
+    with tempfile.TemporaryDirectory() as cache_dir:
+        scraper = IndianStockNewsScraper(http_cache=False, targeted=False, cache_dir=cache_dir, index_articles=False)
+        try:
+            record(scraper)
+        finally:
+            scraper.close()
+
+
+if __name__ == '__main__':
+    main()
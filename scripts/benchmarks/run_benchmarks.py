@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for the news scraper.
+
+Times each stage of IndianStockNewsScraper on its own (listing page parsing
+per source, symbol extraction, sentiment, duplicate removal, JSON output
+and, when DATABASE_URL is set, the database write) using recorded or
+synthetic fixtures, plus the cold start of short command-line runs
+(bench_startup.py). No network access is needed. Throughput is the best of
+--repeat runs; peak memory comes from a separate tracemalloc run, so
+tracing doesn't skew the timings.
+
+Results are compared with baseline.json, and stages that got slower or
+hungrier than --tolerance are flagged:
+
+    python scripts/benchmarks/run_benchmarks.py                  # compare with the baseline
+    python scripts/benchmarks/run_benchmarks.py --save-baseline  # record a new baseline
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from bench_startup import cold_start_stages  # noqa: E402
+from fixtures import is_recorded, load_listing, make_articles  # noqa: E402
+from listing_parser import DEFAULT_PARSER, PARSERS, parse_listing  # noqa: E402
+from near_duplicates import NearDuplicateIndex  # noqa: E402
+from news_scraper import SOURCES, IndianStockNewsScraper  # noqa: E402
+from rollups import SentimentRollup  # noqa: E402
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# (stage name, unit, function returning the number of units processed)
+Stage = Tuple[str, str, Callable[[], int]]
+
+
+def parse_stage(source_key: str, content: bytes, parser: str, targeted: bool = False) -> Callable[[], int]:
+    base_url = SOURCES[source_key]['base_url']
+
+    def run() -> int:
+        parse_listing(source_key, base_url, content, parser, targeted)
+        return 1
+    return run
+
+
+def build_stages(scraper: IndianStockNewsScraper, corpus_size: int, workdir: str) -> List[Stage]:
+    articles = make_articles(corpus_size, seed=42)
+    texts = [f"{article.headline} {article.summary}" for article in articles]
+
+    stages: List[Stage] = []
+    for key in SOURCES:
+        content = load_listing(key)
+        kind = 'recorded' if is_recorded(key) else 'synthetic'
+        unit = f'pages ({kind}, {len(content) // 1024} KB)'
+        # parse.<source> is the original html.parser path; other parsers get a suffix
+        stages.append((f'parse.{key}', unit, parse_stage(key, content, 'html.parser')))
+        for parser in PARSERS:
+            if parser != 'html.parser':
+                stages.append((f'parse.{key}.{parser}', unit, parse_stage(key, content, parser)))
+        # What the scraper does by default (bench_targeted.py also accounts for the shorter download)
+        stages.append((f'parse.{key}.targeted', unit, parse_stage(key, content, DEFAULT_PARSER, targeted=True)))
+
+    def extract() -> int:
+        for text in texts:
+            scraper._extract_stock_symbols(text)
+        return len(texts)
+
+    def sentiment() -> int:
+        for text in texts:
+            scraper._analyze_sentiment(text)
+        return len(texts)
+
+    def sentiment_batch() -> int:
+        scraper.sentiment_scorer.analyze_batch(texts)
+        return len(texts)
+
+    def dedup() -> int:
+        scraper.dedup_index = NearDuplicateIndex()
+        scraper._remove_duplicates(articles)
+        return len(articles)
+
+    def rollup() -> int:
+        SentimentRollup(articles)
+        return len(articles)
+
+    def json_output() -> int:
+        scraper.save_to_json(articles, os.path.join(workdir, 'bench.json'))
+        return len(articles)
+
+    stages += [
+        ('extract_stock_symbols', 'articles', extract),
+        ('analyze_sentiment', 'articles', sentiment),
+        ('analyze_sentiment.batch', 'articles', sentiment_batch),
+        ('remove_duplicates', 'articles', dedup),
+        ('sentiment_rollup', 'articles', rollup),
+        ('save_to_json', 'articles', json_output),
+    ]
+
+    if scraper.database_url:
+        runs = iter(range(1_000_000))
+
+        def database() -> int:
+            # Fresh URLs every run so each one inserts rather than hitting ON CONFLICT
+            batch = make_articles(corpus_size, seed=42, run=f'suite-{os.getpid()}-{next(runs)}')
+            return scraper.save_to_database(batch)
+
+        stages.append(('save_to_database', 'articles', database))
+
+    # Fresh interpreters: --help, a local query and a one-page scrape of the stand-in server
+    stages += cold_start_stages(workdir)
+    return stages
+
+
+def measure(func: Callable[[], int], repeat: int) -> Dict[str, float]:
+    best = float('inf')
+    units = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        units = func()
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {'seconds': best, 'units': units, 'per_second': units / best if best else 0.0, 'peak_kb': peak / 1024}
+
+
+def environment() -> Dict[str, str]:
+    return {'python': platform.python_version(), 'platform': platform.platform(),
+            'machine': platform.machine(), 'cpus': str(os.cpu_count())}
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], tolerance: float) -> List[str]:
+    """Stages that are slower or use more memory than the baseline allows"""
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get(name)
+        if not old:
+            continue
+        if result['per_second'] < old['per_second'] * (1 - tolerance):
+            regressions.append(f"{name}: throughput {old['per_second']:,.0f} -> {result['per_second']:,.0f}/s")
+        if result['peak_kb'] > old['peak_kb'] * (1 + tolerance) and result['peak_kb'] - old['peak_kb'] > 64:
+            regressions.append(f"{name}: peak memory {old['peak_kb']:,.0f} -> {result['peak_kb']:,.0f} KB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', type=int, default=10_000, help='articles in the synthetic corpus')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per stage (best is kept)')
+    parser.add_argument('--only', action='append', default=[], help='run only stages starting with this prefix')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='baseline results file')
+    parser.add_argument('--save-baseline', action='store_true', help='write these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed relative regression (default: 0.25)')
+    parser.add_argument('--fail-on-regression', action='store_true', help='exit with status 1 on regressions')
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    database_url = os.getenv('DATABASE_URL')
+    if database_url:
+        import psycopg2
+        from bench_db import BENCH_DDL, SCHEMA, bench_url
+
+        conn = psycopg2.connect(database_url)
+        conn.cursor().execute(BENCH_DDL)
+        conn.commit()
+        database_url = bench_url(database_url)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # Without DATABASE_URL the scraper must not fall back to the environment either
+        scraper = IndianStockNewsScraper(database_url=database_url, http_cache=False, cache_dir=workdir,
+                                         use_database=bool(database_url))
+        stages = build_stages(scraper, args.corpus, workdir)
+
+        results = {}
+        try:
+            for name, unit, func in stages:
+                if args.only and not any(name.startswith(prefix) for prefix in args.only):
+                    continue
+                results[name] = dict(measure(func, args.repeat), unit=unit)
+        finally:
+            scraper.close()
+            if database_url:
+                conn.cursor().execute(f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE")
+                conn.commit()
+                conn.close()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            saved = json.load(f)
+        baseline = saved.get('results', {})
+        if saved.get('environment') != environment():
+            print(f"note: baseline was recorded on {saved.get('environment')}, comparisons are approximate")
+
+    print(f"{'stage':<34} {'throughput':>16} {'vs baseline':>12} {'peak KB':>10}  unit")
+    for name, result in results.items():
+        old = baseline.get(name)
+        delta = f"{(result['per_second'] / old['per_second'] - 1) * 100:+.0f}%" if old else '-'
+        rate = f"{result['per_second']:,.1f}" if result['per_second'] < 100 else f"{result['per_second']:,.0f}"
+        print(f"{name:<34} {rate:>14}/s {delta:>12} {result['peak_kb']:>10,.0f}  {result['unit']}")
+
+    if args.save_baseline:
+        # A partial run (--only) updates its stages and keeps the rest of the baseline
+        if args.only:
+            results = dict(baseline, **results)
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'environment': environment(), 'corpus': args.corpus, 'results': results}, f, indent=2)
+            f.write('\n')
+        print(f"baseline written to {args.baseline}")
+        return
+
+    regressions = compare(results, baseline, args.tolerance)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if regressions and args.fail_on_regression:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Local HTTP stand-in for the news sources.
+
+Serves synthetic listing and article pages on 127.0.0.1 so the scraper can be exercised
+without the network. Each source is served from its own port, which makes
+each one a separate "host" for the per-host rate limiter.
+
+Faults can be injected per source: a fraction of requests answered with 503
+or with 429 and Retry-After, a fraction that hang before answering, or a
+source that is down altogether.
+
+    python scripts/benchmarks/standin_server.py --latency 0.5
+    python scripts/benchmarks/standin_server.py --fault moneycontrol=hang:0.5 --fault economic_times=down
+"""
+
+import argparse
+import hashlib
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fixtures import render_article, render_listing  # noqa: E402
+from news_scraper import SOURCES  # noqa: E402
+
+
+class Faults:
+    """Fault injection settings of one source: fractions of requests that fail or hang"""
+
+    def __init__(self, error: float = 0.0, throttle: float = 0.0, hang: float = 0.0,
+                 hang_seconds: float = 30.0, down: bool = False, seed: int = 0):
+        self.error = error
+        self.throttle = throttle
+        self.hang = hang
+        self.hang_seconds = hang_seconds
+        self.down = down
+        self.random = random.Random(seed)
+
+    @classmethod
+    def parse(cls, spec: str) -> 'Faults':
+        """Faults from e.g. 'error:0.3,hang:0.1', 'throttle:0.5' or 'down'"""
+        faults = cls()
+        for part in spec.split(','):
+            kind, _, value = part.partition(':')
+            if kind == 'down':
+                faults.down = True
+            elif kind in ('error', 'throttle', 'hang', 'hang_seconds'):
+                setattr(faults, kind, float(value))
+            else:
+                raise ValueError(f"unknown fault {kind!r}")
+        return faults
+
+    def pick(self) -> Optional[str]:
+        """The fault to inject into the next response, if any"""
+        if self.down:
+            return 'error'
+        roll = self.random.random()
+        for kind in ('error', 'throttle', 'hang'):
+            chance = getattr(self, kind)
+            if roll < chance:
+                return kind
+            roll -= chance
+        return None
+
+
+def make_handler(source_key: str, latency: float, faults: Optional[Faults] = None):
+    class ListingHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            fault = faults.pick() if faults else None
+            if fault == 'hang':
+                time.sleep(faults.hang_seconds)
+            elif fault in ('error', 'throttle'):
+                time.sleep(latency)
+                self.send_response(503 if fault == 'error' else 429)
+                if fault == 'throttle':
+                    self.send_header('Retry-After', '1')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            time.sleep(latency)
+            if self.path.startswith(f'/news/{source_key}/'):
+                # Article pages: a handful of distinct bodies, so copies share a body hash
+                body = render_article(sum(map(ord, self.path)) % 16).encode('utf-8')
+            else:
+                body = render_listing(source_key, seed=sum(map(ord, self.path))).encode('utf-8')
+            etag = '"%s"' % hashlib.md5(body).hexdigest()
+            if self.headers.get('If-None-Match') == etag:
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.end_headers()
+                return
+
+            try:
+                self.send_response(200)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # the client gave up waiting, e.g. on a hanging response
+
+        def log_message(self, format, *args):
+            pass
+
+    return ListingHandler
+
+
+class StandinCluster:
+    """One threaded HTTP server per source, each on an ephemeral port"""
+
+    def __init__(self, latency: float = 0.0, faults: Optional[Dict[str, Faults]] = None):
+        self.latency = latency
+        self.faults = faults or {}
+        self.servers: List[Tuple[str, ThreadingHTTPServer]] = []
+
+    def start(self) -> Dict[str, dict]:
+        """Start the servers and return a SOURCES mapping pointing at them"""
+        sources = {}
+        for key, source in SOURCES.items():
+            server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(key, self.latency, self.faults.get(key)))
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+            self.servers.append((key, server))
+
+            base_url = f"http://127.0.0.1:{server.server_address[1]}"
+            paths = ['/' + url.split('/', 3)[3] if url.count('/') >= 3 else '/' for url in source['urls']]
+            sources[key] = dict(source, base_url=base_url, urls=[base_url + path for path in paths])
+        return sources
+
+    def stop(self):
+        for _, server in self.servers:
+            server.shutdown()
+            server.server_close()
+        self.servers = []
+
+    def __enter__(self) -> Dict[str, dict]:
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds to wait before each response')
+    parser.add_argument('--fault', action='append', default=[], metavar='SOURCE=SPEC',
+                        help="inject faults into a source, e.g. moneycontrol=error:0.3,hang:0.1 or business_standard=down")
+    args = parser.parse_args()
+
+    faults = {}
+    for item in args.fault:
+        key, _, spec = item.partition('=')
+        if key not in SOURCES or not spec:
+            parser.error(f"invalid --fault {item!r}")
+        faults[key] = Faults.parse(spec)
+
+    cluster = StandinCluster(args.latency, faults)
+    for key, source in cluster.start().items():
+        print(f"{key}: {source['base_url']}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        cluster.stop()
+
+
+if __name__ == '__main__':
+    main()
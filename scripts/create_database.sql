@@ -51,6 +51,37 @@ CREATE TABLE IF NOT EXISTS news_stock_relevance (
     relevance_score DECIMAL(3, 2) DEFAULT 0.0
 );
 
+-- Create news_sentiment_rollups table (per symbol, source and hour; maintained by the scraper)
+-- stock_symbol '*' counts every article, for market-wide figures
+CREATE TABLE IF NOT EXISTS news_sentiment_rollups (
+    stock_symbol VARCHAR(20) NOT NULL,
+    source VARCHAR(100) NOT NULL,
+    bucket_start TIMESTAMP NOT NULL,
+    positive_count INTEGER NOT NULL DEFAULT 0,
+    negative_count INTEGER NOT NULL DEFAULT 0,
+    neutral_count INTEGER NOT NULL DEFAULT 0,
+    article_count INTEGER NOT NULL DEFAULT 0,
+    impact_sum DECIMAL(12, 2) NOT NULL DEFAULT 0.0,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (stock_symbol, source, bucket_start)
+);
+
+-- Create scrape_jobs table (one row per listing URL, claimed by `news_scraper.py worker` processes)
+-- Times are TIMESTAMPTZ so workers in different time zones agree on when a job is due or its lease expires
+CREATE TABLE IF NOT EXISTS scrape_jobs (
+    id SERIAL PRIMARY KEY,
+    source_key VARCHAR(50) NOT NULL,
+    url TEXT NOT NULL UNIQUE,
+    interval_seconds INTEGER NOT NULL DEFAULT 300,
+    next_run_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    leased_by TEXT,
+    leased_until TIMESTAMPTZ,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_run_at TIMESTAMPTZ,
+    last_error TEXT,
+    last_article_count INTEGER
+);
+
 -- Create ai_insights table
 CREATE TABLE IF NOT EXISTS ai_insights (
     id SERIAL PRIMARY KEY,
@@ -88,11 +119,38 @@ CREATE INDEX IF NOT EXISTS idx_portfolio_holdings_portfolio_id ON portfolio_hold
 CREATE INDEX IF NOT EXISTS idx_portfolio_holdings_stock_symbol ON portfolio_holdings(stock_symbol);
 CREATE INDEX IF NOT EXISTS idx_news_articles_published_at ON news_articles(published_at);
 CREATE INDEX IF NOT EXISTS idx_news_articles_sentiment ON news_articles(sentiment);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_news_articles_url ON news_articles(url);
 CREATE INDEX IF NOT EXISTS idx_news_stock_relevance_news_id ON news_stock_relevance(news_id);
 CREATE INDEX IF NOT EXISTS idx_news_stock_relevance_stock_symbol ON news_stock_relevance(stock_symbol);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_news_stock_relevance_news_stock ON news_stock_relevance(news_id, stock_symbol);
+CREATE INDEX IF NOT EXISTS idx_news_sentiment_rollups_bucket_start ON news_sentiment_rollups(bucket_start);
+CREATE INDEX IF NOT EXISTS idx_scrape_jobs_next_run_at ON scrape_jobs(next_run_at);
 CREATE INDEX IF NOT EXISTS idx_user_notifications_user_id ON user_notifications(user_id);
 CREATE INDEX IF NOT EXISTS idx_user_notifications_is_read ON user_notifications(is_read);
 
+-- Per-symbol sentiment with mean impact, e.g. WHERE bucket_start >= NOW() - INTERVAL '24 hours'
+CREATE OR REPLACE VIEW news_symbol_sentiment AS
+SELECT stock_symbol, source, bucket_start, positive_count, negative_count, neutral_count, article_count,
+       impact_sum / NULLIF(article_count, 0) AS mean_impact
+FROM news_sentiment_rollups;
+
+-- Backfill rollups from existing articles the first time the table is created
+INSERT INTO news_sentiment_rollups (stock_symbol, source, bucket_start, positive_count, negative_count,
+                                    neutral_count, article_count, impact_sum)
+SELECT s.stock_symbol, n.source, date_trunc('hour', COALESCE(n.published_at, n.scraped_at)),
+       COUNT(*) FILTER (WHERE n.sentiment = 'positive'),
+       COUNT(*) FILTER (WHERE n.sentiment = 'negative'),
+       COUNT(*) FILTER (WHERE n.sentiment NOT IN ('positive', 'negative')),
+       COUNT(*), COALESCE(SUM(n.impact_score), 0)
+FROM news_articles n
+CROSS JOIN LATERAL (
+    SELECT '*' AS stock_symbol
+    UNION ALL
+    SELECT r.stock_symbol FROM news_stock_relevance r WHERE r.news_id = n.id
+) s
+WHERE NOT EXISTS (SELECT 1 FROM news_sentiment_rollups)
+GROUP BY 1, 2, 3;
+
 -- Insert sample data
 INSERT INTO users (email, name) VALUES 
 ('demo@example.com', 'Demo User')
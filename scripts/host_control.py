@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Adaptive per-host request control for the news scraper.
+
+Each host gets:
+- a request deadline derived from its observed latency (smoothed latency
+  plus four deviations, as TCP computes its retransmission timeout), so a
+  host that normally answers in 300 ms isn't given the full timeout when it
+  hangs;
+- AIMD control of its concurrency and request rate: both grow additively
+  while responses are quick and halve on 429/5xx, timeouts or responses much
+  slower than the host's best latency. The configured rate stays the ceiling;
+- retries with capped exponential backoff and full jitter on 429, 5xx,
+  timeouts and connection errors, honouring Retry-After;
+- a circuit breaker: after `failure_threshold` consecutive failures the host
+  is skipped for a cooldown that doubles on each failed probe.
+"""
+
+import logging
+import random
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Dict, Optional, TypeVar
+from urllib.parse import urlparse
+
+from metrics import NULL_METRICS, Metrics
+from rate_limiter import HostRateLimiter, TokenBucket
+
+if TYPE_CHECKING:
+    import requests
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of sending a request to a host whose circuit is open"""
+
+
+def retry_after_seconds(response: Optional['requests.Response']) -> Optional[float]:
+    """The delay a Retry-After header asks for, in seconds"""
+    value = response.headers.get('Retry-After') if response is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def failure_reason(error: Exception) -> Optional[str]:
+    """Why a request failed, when retrying may help ('429', '5xx', 'timeout', 'connection')"""
+    # Already imported by whoever sent the request
+    import requests
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+        if status in RETRY_STATUSES:
+            return '429' if status == 429 else '5xx'
+        return None
+    if isinstance(error, requests.Timeout):
+        return 'timeout'
+    if isinstance(error, requests.ConnectionError):
+        return 'connection'
+    return None
+
+
+class HostState:
+    """Latency estimate, AIMD limits and circuit breaker of one host"""
+
+    def __init__(self, host: str, bucket: TokenBucket, concurrency: float, cooldown: float):
+        self.host = host
+        self.bucket = bucket
+        self.condition = threading.Condition()
+        self.concurrency = concurrency
+        self.active = 0
+        # The configured rate; AIMD only ever lowers the bucket's rate below it
+        self.rate_ceiling = bucket.rate
+        self.srtt: Optional[float] = None
+        self.rttvar = 0.0
+        self.best = float('inf')
+        self.failures = 0
+        self.cooldown = cooldown
+        self.open_until = 0.0
+        self.probing = False
+
+
+class HostController:
+    """Deadlines, AIMD concurrency and rate, retries and circuit breaking per host"""
+
+    def __init__(self, rate_limiter: HostRateLimiter, max_concurrency: int = 4, min_timeout: float = 2.0,
+                 max_timeout: float = 10.0, max_retries: int = 2, backoff_base: float = 0.5,
+                 backoff_cap: float = 8.0, retry_budget: float = 20.0, slow_factor: float = 3.0,
+                 failure_threshold: int = 3, cooldown: float = 30.0, max_cooldown: float = 600.0,
+                 metrics: Metrics = NULL_METRICS):
+        self.rate_limiter = rate_limiter
+        self.max_concurrency = max_concurrency
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.retry_budget = retry_budget
+        self.slow_factor = slow_factor
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.metrics = metrics
+        self.hosts: Dict[str, HostState] = {}
+        self.lock = threading.Lock()
+
+    def state(self, url: str) -> HostState:
+        host = urlparse(url).netloc.lower()
+        with self.lock:
+            state = self.hosts.get(host)
+            if state is None:
+                state = self.hosts[host] = HostState(host, self.rate_limiter.bucket_for(url),
+                                                     float(self.max_concurrency), self.cooldown)
+            return state
+
+    def deadline(self, state: HostState) -> float:
+        """Request timeout for the host: smoothed latency plus four deviations, within bounds"""
+        if state.srtt is None:
+            return self.max_timeout
+        return min(self.max_timeout, max(self.min_timeout, state.srtt + 4 * state.rttvar))
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff before retry number `attempt` (1-based)"""
+        delay = random.uniform(0, min(self.backoff_cap, self.backoff_base * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.backoff_cap))
+        return delay
+
+    def is_open(self, url: str) -> bool:
+        """Whether requests to the host of `url` are currently being skipped"""
+        state = self.state(url)
+        with state.condition:
+            return state.failures >= self.failure_threshold and (
+                time.monotonic() < state.open_until or state.probing)
+
+    def _enter(self, state: HostState) -> bool:
+        """Take a concurrency slot, or raise CircuitOpenError (also if it opens while waiting).
+        Whether this request is the half-open probe"""
+        with state.condition:
+            while True:
+                tripped = state.failures >= self.failure_threshold
+                if tripped and (time.monotonic() < state.open_until or state.probing):
+                    raise CircuitOpenError(f"circuit open for {state.host}")
+                if state.active < int(state.concurrency):
+                    break
+                state.condition.wait()
+            # Half-open: this request is the probe, everyone else keeps skipping the host
+            if tripped:
+                state.probing = True
+            state.active += 1
+            return tripped
+
+    def _exit(self, state: HostState, probe: bool):
+        with state.condition:
+            state.active -= 1
+            # Requests admitted before the circuit opened don't end the probe
+            if probe:
+                state.probing = False
+            state.condition.notify_all()
+
+    def _succeeded(self, state: HostState, latency: float):
+        with state.condition:
+            if state.srtt is None:
+                state.srtt, state.rttvar = latency, latency / 2
+            else:
+                state.rttvar = 0.75 * state.rttvar + 0.25 * abs(state.srtt - latency)
+                state.srtt = 0.875 * state.srtt + 0.125 * latency
+            state.best = min(state.best, latency)
+            if state.failures >= self.failure_threshold:
+                logger.info(f"Circuit closed for {state.host}")
+            state.failures = 0
+            state.cooldown = self.cooldown
+            slow = latency > self.min_timeout / 2 and latency > self.slow_factor * state.best
+        if slow:
+            self._decrease(state, 'slow')
+        else:
+            self._increase(state)
+
+    def _failed(self, state: HostState, reason: str):
+        with state.condition:
+            state.failures += 1
+            if state.failures >= self.failure_threshold:
+                if state.failures > self.failure_threshold:
+                    # A failed half-open probe keeps the circuit open for longer
+                    state.cooldown = min(self.max_cooldown, state.cooldown * 2)
+                state.open_until = time.monotonic() + state.cooldown
+                self.metrics.inc('circuit_open_total', host=state.host)
+                logger.warning(f"Circuit open for {state.host} for {state.cooldown:g}s after "
+                               f"{state.failures} consecutive failures ({reason})")
+        self._decrease(state, reason)
+
+    def _increase(self, state: HostState):
+        with state.condition:
+            state.concurrency = min(self.max_concurrency, state.concurrency + 1 / state.concurrency)
+            state.bucket.rate = min(state.rate_ceiling, state.bucket.rate + state.rate_ceiling / 10)
+            state.condition.notify_all()
+
+    def _decrease(self, state: HostState, reason: str):
+        with state.condition:
+            state.concurrency = max(1.0, state.concurrency / 2)
+            state.bucket.rate = max(state.rate_ceiling / 16, state.bucket.rate / 2)
+        self.metrics.inc('host_backoff_total', host=state.host, reason=reason)
+
+    def call(self, url: str, send: Callable[[float], T]) -> T:
+        """Run `send(timeout)` for `url` under the host's limits, retrying transient failures.
+
+        Each attempt waits for the host's rate limiter first; that wait doesn't
+        count towards the latency the deadline and AIMD are driven by.
+
+        Raises CircuitOpenError without sending anything while the host's circuit is open,
+        and the last error once the retries or the retry budget are used up.
+        """
+        state = self.state(url)
+        started = time.monotonic()
+        attempt = 0
+        timeout = self.deadline(state)
+        while True:
+            probe = self._enter(state)
+            try:
+                self.metrics.observe('rate_limit_wait_seconds', state.bucket.acquire(), host=state.host)
+                sent = time.monotonic()
+                result = send(timeout)
+            except Exception as e:
+                reason = failure_reason(e)
+                if reason is None:
+                    raise
+                self._failed(state, reason)
+                attempt += 1
+                delay = self.backoff(attempt, retry_after_seconds(getattr(e, 'response', None)))
+                if reason == 'timeout':
+                    timeout = min(self.max_timeout, timeout * 2)
+                # Give up unless the retry could complete within the budget
+                if (attempt > self.max_retries or self.is_open(url)
+                        or time.monotonic() - started + delay + timeout > self.retry_budget):
+                    raise
+                self.metrics.inc('fetch_retries_total', host=state.host, reason=reason)
+                logger.info(f"Retrying {url} in {delay:.1f}s after {reason}")
+            else:
+                self._succeeded(state, time.monotonic() - sent)
+                return result
+            finally:
+                self._exit(state, probe)
+            time.sleep(delay)
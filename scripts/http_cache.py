@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Persistent conditional-GET cache for listing pages.
+
+Only validators are stored (ETag, Last-Modified and a SHA-256 of the body),
+keyed by URL in a small SQLite file. That is enough to send
+If-None-Match/If-Modified-Since on the next poll and to recognise an
+unchanged body, so the page doesn't have to be parsed again.
+
+The validators of a changed page are only stored once the caller has
+persisted its articles. A page whose articles were lost, e.g. to a failed
+database write, is therefore fetched and parsed again on the next poll.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Dict, Mapping, NamedTuple, Optional
+
+
+class Validators(NamedTuple):
+    """What a 200 response for `url` leaves to validate the next request with"""
+    url: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    content_hash: str
+    size: int
+
+
+class HttpCache:
+    """URL -> validators store with least-recently-used eviction"""
+
+    def __init__(self, path: str, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS http_cache (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_http_cache_last_used ON http_cache(last_used)")
+        self.conn.commit()
+        self.stats = {'hits': 0, 'misses': 0, 'not_modified': 0, 'unchanged': 0, 'bytes_saved': 0}
+
+    def conditional_headers(self, url: str) -> Dict[str, str]:
+        """Validators to send with the next request for `url`"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT etag, last_modified FROM http_cache WHERE url = ?", (url,)).fetchone()
+        headers = {}
+        if row and row[0]:
+            headers['If-None-Match'] = row[0]
+        if row and row[1]:
+            headers['If-Modified-Since'] = row[1]
+        return headers
+
+    def not_modified(self, url: str):
+        """Record a 304 response: the whole body was saved"""
+        with self.lock:
+            row = self.conn.execute("SELECT size FROM http_cache WHERE url = ?", (url,)).fetchone()
+            self.conn.execute("UPDATE http_cache SET last_used = ? WHERE url = ?", (time.time(), url))
+            self.conn.commit()
+            self.stats['hits'] += 1
+            self.stats['not_modified'] += 1
+            self.stats['bytes_saved'] += row[0] if row else 0
+
+    def check(self, url: str, headers: Mapping[str, str], content: bytes) -> Optional[Validators]:
+        """Compare a 200 response with the body last stored for `url`.
+
+        Returns None if the body is unchanged; its validators are refreshed at
+        once. Otherwise returns the validators to store() once the page's
+        articles are persisted.
+        """
+        validators = Validators(url, headers.get('ETag'), headers.get('Last-Modified'),
+                                hashlib.sha256(content).hexdigest(), len(content))
+        with self.lock:
+            row = self.conn.execute("SELECT content_hash FROM http_cache WHERE url = ?", (url,)).fetchone()
+            if row and row[0] == validators.content_hash:
+                self._store(validators)
+                self.stats['hits'] += 1
+                self.stats['unchanged'] += 1
+                return None
+            self.stats['misses'] += 1
+        return validators
+
+    def store(self, validators: Validators):
+        """Remember the validators of a page whose articles are persisted"""
+        with self.lock:
+            self._store(validators)
+
+    def _store(self, validators: Validators):
+        self.conn.execute("""
+            INSERT INTO http_cache (url, etag, last_modified, content_hash, size, last_used)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (url) DO UPDATE SET
+                etag = excluded.etag, last_modified = excluded.last_modified,
+                content_hash = excluded.content_hash, size = excluded.size, last_used = excluded.last_used
+        """, (*validators, time.time()))
+        self._evict()
+        self.conn.commit()
+
+    def _evict(self):
+        """Drop the least recently used entries beyond `max_entries`"""
+        self.conn.execute("""
+            DELETE FROM http_cache WHERE url IN (
+                SELECT url FROM http_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,))
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Listing page parsing, runnable in a pool of worker processes.
+
+Parsing HTML and walking the item markup is pure CPU work, so under the GIL
+it neither overlaps with itself nor with the fetch threads. The extractors
+here are module-level functions of (source key, base URL, page bytes) that
+return plain (headline, summary, url, published_at) tuples, so pages can be
+shipped to a ProcessPoolExecutor and the results pickled back cheaply.
+
+Only the first few items of a listing page are used, so by default pages are
+parsed in targeted mode: a SoupStrainer builds just the item subtrees, and
+ItemQuotaScanner lets the fetcher stop downloading once the last item it
+needs has been received.
+
+bs4, lxml and multiprocessing are imported by the first parse rather than
+with this module, so commands that never parse a page don't pay for them.
+"""
+
+import importlib.util
+import logging
+import re
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+    from bs4 import BeautifulSoup, SoupStrainer
+
+logger = logging.getLogger(__name__)
+
+# Without lxml, pages go through the slower pure-Python parser, without early termination
+HAVE_LXML = importlib.util.find_spec('lxml') is not None
+DEFAULT_PARSER = 'lxml' if HAVE_LXML else 'html.parser'
+
+PARSERS = ('lxml', 'html.parser')
+
+# Per source: (item tag, item class, number of items used from a page)
+ITEM_SELECTORS = {
+    'moneycontrol': ('li', 'clearfix', 15),
+    'economic_times': ('div', 'eachStory', 10),
+    'business_standard': ('div', 'listingstyle', 10),
+}
+
+# (headline, summary, url, published_at)
+Item = Tuple[str, str, str, datetime]
+
+
+def parse_time_text(time_text: str, now: Optional[datetime] = None) -> datetime:
+    """Parse relative time text such as '3 hours ago' to a datetime, relative to `now` (default: the current time)"""
+    now = now or datetime.now()
+    time_text = time_text.lower()
+    match = re.search(r'\d+', time_text)
+    amount = int(match.group()) if match else 1
+
+    if 'hour' in time_text:
+        return now - timedelta(hours=amount)
+    elif 'minute' in time_text:
+        return now - timedelta(minutes=amount)
+    elif 'day' in time_text:
+        return now - timedelta(days=amount)
+    else:
+        return now
+
+
+def _absolute(url_link: str, base_url: str) -> str:
+    return url_link if url_link.startswith('http') else f"{base_url}{url_link}"
+
+
+def _find_items(soup: 'BeautifulSoup', source_key: str) -> list:
+    tag, class_, quota = ITEM_SELECTORS[source_key]
+    return soup.find_all(tag, class_=class_, limit=quota)
+
+
+def extract_moneycontrol(soup: 'BeautifulSoup', base_url: str, now: Optional[datetime] = None) -> List[Item]:
+    """Extract raw items from a Moneycontrol listing page fetched at `now` (default: just now)"""
+    items = []
+    for item in _find_items(soup, 'moneycontrol'):
+        try:
+            headline_elem = item.find('h2') or item.find('a')
+            if not headline_elem:
+                continue
+
+            headline = headline_elem.get_text(strip=True)
+            link = headline_elem.get('href', '') if headline_elem.name == 'a' else headline_elem.find('a', href=True)
+
+            if isinstance(link, str):
+                url_link = link
+            else:
+                url_link = link.get('href', '') if link else ''
+
+            summary_elem = item.find('p')
+            summary = summary_elem.get_text(strip=True) if summary_elem else headline
+
+            time_elem = item.find('span', class_='ago')
+            published_at = parse_time_text(time_elem.get_text(strip=True) if time_elem else 'recent', now)
+
+            items.append((headline, summary, _absolute(url_link, base_url), published_at))
+
+        except Exception as e:
+            logger.warning(f"Error parsing Moneycontrol article: {e}")
+            continue
+
+    return items
+
+
+def _extract_linked_headlines(soup: 'BeautifulSoup', base_url: str, source_key: str,
+                              heading_tags: Tuple[str, str], label: str,
+                              now: Optional[datetime] = None) -> List[Item]:
+    """Items whose headline is a link inside an <h2>/<h3>, as on Economic Times and Business Standard"""
+    items = []
+    for item in _find_items(soup, source_key):
+        try:
+            headline_elem = item.find(heading_tags[0]) or item.find(heading_tags[1])
+            if not headline_elem:
+                continue
+
+            link_elem = headline_elem.find('a')
+            if not link_elem:
+                continue
+
+            headline = link_elem.get_text(strip=True)
+            url_link = link_elem.get('href', '')
+
+            summary_elem = item.find('p')
+            summary = summary_elem.get_text(strip=True) if summary_elem else headline
+
+            items.append((headline, summary, _absolute(url_link, base_url), now or datetime.now()))
+
+        except Exception as e:
+            logger.warning(f"Error parsing {label} article: {e}")
+            continue
+
+    return items
+
+
+def extract_economic_times(soup: 'BeautifulSoup', base_url: str, now: Optional[datetime] = None) -> List[Item]:
+    """Extract raw items from an Economic Times listing page"""
+    return _extract_linked_headlines(soup, base_url, 'economic_times', ('h3', 'h2'), 'ET', now)
+
+
+def extract_business_standard(soup: 'BeautifulSoup', base_url: str, now: Optional[datetime] = None) -> List[Item]:
+    """Extract raw items from a Business Standard listing page"""
+    return _extract_linked_headlines(soup, base_url, 'business_standard', ('h2', 'h3'), 'BS', now)
+
+
+EXTRACTORS = {
+    'moneycontrol': extract_moneycontrol,
+    'economic_times': extract_economic_times,
+    'business_standard': extract_business_standard,
+}
+
+
+def item_strainer(source_key: str) -> 'SoupStrainer':
+    """Restricts a parse to the item elements of `source_key` and their contents"""
+    from bs4 import SoupStrainer
+    tag, class_, _ = ITEM_SELECTORS[source_key]
+    return SoupStrainer(tag, class_=class_)
+
+
+def parse_listing(source_key: str, base_url: str, content: bytes, parser: str = DEFAULT_PARSER,
+                  targeted: bool = True, now: Optional[datetime] = None) -> List[Item]:
+    """Parse one listing page of `source_key` into raw item tuples.
+
+    In targeted mode only the item subtrees are built; navigation, ads and
+    the rest of the page are tokenised but never become tree nodes. Relative
+    times are resolved against `now`, the time the page was fetched.
+    """
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(content, parser, parse_only=item_strainer(source_key) if targeted else None)
+    return EXTRACTORS[source_key](soup, base_url, now)
+
+
+class ItemQuotaScanner:
+    """Watches a page as it downloads and reports when its item quota is complete.
+
+    Chunks go through lxml's incremental HTML parser, which only reports
+    closing item tags. Once the last item the extractor uses has closed, the
+    rest of the response can be left unread.
+    """
+
+    def __init__(self, source_key: str):
+        from lxml import etree
+        self.tag, self.class_, self.quota = ITEM_SELECTORS[source_key]
+        self.parser = etree.HTMLPullParser(events=('end',), tag=self.tag)
+        self.items = 0
+
+    @classmethod
+    def for_source(cls, source_key: str) -> Optional['ItemQuotaScanner']:
+        """A scanner for `source_key`, or None when early termination isn't possible"""
+        if not HAVE_LXML or source_key not in ITEM_SELECTORS:
+            return None
+        return cls(source_key)
+
+    def feed(self, chunk: bytes) -> bool:
+        """Feed the next chunk; True once every needed item has been received"""
+        self.parser.feed(chunk)
+        for _, element in self.parser.read_events():
+            if self.class_ in (element.get('class') or '').split():
+                self.items += 1
+            # Drop finished elements so the scanner's tree stays small
+            element.clear()
+        return self.items >= self.quota
+
+
+def _parse_job(job: tuple) -> List[Item]:
+    return parse_listing(*job)
+
+
+class ListingParser:
+    """Parses listing pages inline, or in `workers` processes when workers > 0"""
+
+    def __init__(self, parser: Optional[str] = None, workers: int = 0, targeted: bool = True):
+        self.parser = parser or DEFAULT_PARSER
+        if self.parser not in PARSERS:
+            raise ValueError(f"unknown parser {self.parser!r}, expected one of {', '.join(PARSERS)}")
+        if self.parser == 'lxml' and not HAVE_LXML:
+            raise ValueError(f"parser {self.parser!r} is not installed")
+        self.workers = workers
+        self.targeted = targeted
+        self.pool = None
+
+    def prepare(self):
+        """Import bs4 and the tree builder now, e.g. while the first pages download, rather than in the first parse"""
+        if not self.workers:
+            from bs4 import BeautifulSoup
+            BeautifulSoup('', self.parser)
+
+    def _executor(self) -> 'ProcessPoolExecutor':
+        if self.pool is None:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            # spawn rather than fork: the scraper process has fetch threads and open SQLite handles
+            self.pool = ProcessPoolExecutor(max_workers=self.workers,
+                                            mp_context=multiprocessing.get_context('spawn'))
+        return self.pool
+
+    def parse(self, source_key: str, base_url: str, content: bytes) -> List[Item]:
+        """Parse one page; with workers the calling thread just waits for the result"""
+        if not self.workers:
+            return parse_listing(source_key, base_url, content, self.parser, self.targeted)
+        return self._executor().submit(parse_listing, source_key, base_url, content,
+                                       self.parser, self.targeted).result()
+
+    def parse_many(self, pages: Iterable[tuple], chunksize: int = 4) -> Iterator[List[Item]]:
+        """Parse (source_key, base_url, content) pages, yielding item lists in input order.
+
+        A page may carry the time it was fetched as a fourth element, e.g. when replaying archived pages.
+        """
+        jobs = ((page[0], page[1], page[2], self.parser, self.targeted) + tuple(page[3:]) for page in pages)
+        if not self.workers:
+            yield from map(_parse_job, jobs)
+            return
+        # Executor.map submits everything up front, so feed it a window at a time to bound memory
+        executor = self._executor()
+        while True:
+            window = list(islice(jobs, self.workers * chunksize * 4))
+            if not window:
+                return
+            yield from executor.map(_parse_job, window, chunksize=chunksize)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+In-process metrics for the scraper: labelled counters and timers, exported
+as a JSON stats report and in the Prometheus text exposition format (to a
+file for node_exporter's textfile collector, or over a local HTTP endpoint).
+
+Instrumentation is always compiled in. When metrics are disabled the scraper
+holds NULL_METRICS, whose methods do nothing and whose timer is a shared
+nullcontext, so the cost is a method call per stage.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from http.server import ThreadingHTTPServer
+
+# (metric name, sorted label pairs)
+Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+
+def _key(name: str, labels: Dict[str, object]) -> Key:
+    return name, tuple(sorted((label, str(value)) for label, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{label}="{_escape(value)}"' for label, value in labels) + '}'
+
+
+class Metrics:
+    """Thread-safe counters and timers keyed by name and labels"""
+
+    enabled = True
+
+    def __init__(self, prefix: str = 'scraper_', json_path: Optional[str] = None,
+                 prometheus_path: Optional[str] = None):
+        self.prefix = prefix
+        self.json_path = json_path
+        self.prometheus_path = prometheus_path
+        self.lock = threading.Lock()
+        self.counters: Dict[Key, float] = {}
+        # key -> [count, total seconds, max seconds]
+        self.timers: Dict[Key, List[float]] = {}
+        self.started = time.time()
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """Add `value` to a counter"""
+        key = _key(name, labels)
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        """Record one duration of a timer"""
+        key = _key(name, labels)
+        with self.lock:
+            timer = self.timers.get(key)
+            if timer is None:
+                self.timers[key] = [1, seconds, seconds]
+            else:
+                timer[0] += 1
+                timer[1] += seconds
+                timer[2] = max(timer[2], seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Time the body of a with block"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, **labels)
+
+    def total(self, name: str) -> float:
+        """A counter summed over all its labels"""
+        with self.lock:
+            return sum(value for (key_name, _), value in self.counters.items() if key_name == name)
+
+    def total_seconds(self, name: str) -> float:
+        """A timer's recorded time summed over all its labels"""
+        with self.lock:
+            return sum(timer[1] for (key_name, _), timer in self.timers.items() if key_name == name)
+
+    def rate(self, counter: str, timer: str) -> Optional[float]:
+        """`counter` per second of `timer`, e.g. database rows per second spent writing"""
+        seconds = self.total_seconds(timer)
+        return self.total(counter) / seconds if seconds else None
+
+    def snapshot(self, rates: Optional[Dict[str, Tuple[str, str]]] = None) -> dict:
+        """JSON-serialisable stats report. `rates` maps a name to a (counter, timer) pair"""
+        with self.lock:
+            counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value in sorted(self.counters.items())]
+            timers = [{'name': name, 'labels': dict(labels), 'count': int(count), 'seconds': total,
+                       'mean_seconds': total / count, 'max_seconds': longest}
+                      for (name, labels), (count, total, longest) in sorted(self.timers.items())]
+        report = {'started_at': self.started, 'uptime_seconds': time.time() - self.started,
+                  'counters': counters, 'timers': timers}
+        if rates:
+            report['rates'] = {name: self.rate(counter, timer) for name, (counter, timer) in rates.items()}
+        return report
+
+    def render_prometheus(self) -> str:
+        """All metrics in the Prometheus text exposition format. Timers become summaries"""
+        lines = []
+        with self.lock:
+            counters = sorted(self.counters.items())
+            timers = sorted(self.timers.items())
+
+        declared = set()
+        for (name, labels), value in counters:
+            metric = self.prefix + name
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f'# TYPE {metric} counter')
+            lines.append(f'{metric}{_format_labels(labels)} {value:g}')
+        for (name, labels), (count, total, _) in timers:
+            metric = self.prefix + name
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f'# TYPE {metric} summary')
+            lines.append(f'{metric}_count{_format_labels(labels)} {int(count)}')
+            lines.append(f'{metric}_sum{_format_labels(labels)} {total:.6f}')
+        return '\n'.join(lines) + '\n'
+
+    def export(self, rates: Optional[Dict[str, Tuple[str, str]]] = None):
+        """Write the configured JSON and Prometheus files, replacing them atomically"""
+        if self.json_path:
+            _write_atomic(self.json_path, json.dumps(self.snapshot(rates), indent=2) + '\n')
+        if self.prometheus_path:
+            _write_atomic(self.prometheus_path, self.render_prometheus())
+
+    def serve(self, port: int, host: str = '127.0.0.1',
+              rates: Optional[Dict[str, Tuple[str, str]]] = None) -> 'ThreadingHTTPServer':
+        """Serve /metrics (Prometheus) and /stats.json from a background thread"""
+        # http.server pulls in ssl and email; only the endpoint needs it
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        metrics = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == '/metrics':
+                    body = metrics.render_prometheus().encode('utf-8')
+                    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+                elif self.path == '/stats.json':
+                    body = json.dumps(metrics.snapshot(rates)).encode('utf-8')
+                    content_type = 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), MetricsHandler)
+        threading.Thread(target=server.serve_forever, name='metrics-http', daemon=True).start()
+        return server
+
+
+class NullMetrics(Metrics):
+    """Metrics that record nothing, used when instrumentation is disabled"""
+
+    enabled = False
+
+    def inc(self, name: str, value: float = 1, **labels):
+        pass
+
+    def observe(self, name: str, seconds: float, **labels):
+        pass
+
+    def timer(self, name: str, **labels):
+        return _NULL_TIMER
+
+    def export(self, rates: Optional[Dict[str, Tuple[str, str]]] = None):
+        pass
+
+
+_NULL_TIMER = nullcontext()
+NULL_METRICS = NullMetrics()
+
+
+def _write_atomic(path: str, text: str):
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(temporary, path)
@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection for syndicated headlines with MinHash and LSH.
+
+Headlines are reduced to word shingles (single words and pairs of adjacent
+words) and summarised by MinHash signatures. Signatures are split into bands and hashed
+into buckets (locality-sensitive hashing), so finding similar headlines only
+compares an article against the few that share a bucket rather than against
+everything in the window. Two articles are only the same story if they also
+mention the same stocks: templated headlines such as "TCS shares surge
+after Q2 results" and "Infosys shares surge after Q2 results" differ in a
+single word. Headlines naming no stock need to be more similar to match.
+Clusters keep the highest-impact article as representative and
+remember which sources carried the story. Stories whose articles could not
+be saved are withdrawn, so they aren't treated as duplicates when they come
+round again.
+
+NumPy is imported by the first batch of signatures rather than with this
+module, as it takes longer to import than a typical poll takes to dedup.
+"""
+
+import importlib.util
+import random
+import re
+import time
+import zlib
+from collections import deque
+from itertools import chain
+from typing import Dict, List, Optional
+
+# Without NumPy, signatures are computed in pure Python
+HAVE_NUMPY = importlib.util.find_spec('numpy') is not None
+np = None
+
+
+def load_numpy() -> bool:
+    """Import NumPy if it is installed and not loaded yet. Whether it is available"""
+    global np
+    if np is None and HAVE_NUMPY:
+        import numpy
+        np = numpy
+    return np is not None
+
+# Mersenne prime used by the universal hash family; signatures fit in 32 bits
+MERSENNE_PRIME = (1 << 31) - 1
+
+# \w, plus the Indic blocks: vowel signs and viramas are combining marks, which \w doesn't match
+WORD = re.compile(r'[\w\u0900-\u0963\u0966-\u0dff]+')
+
+
+class _Cluster:
+    __slots__ = ('representative', 'sources', 'emitted', 'indexed', 'withdrawn')
+
+    def __init__(self, article):
+        self.representative = article
+        self.sources = [article.source]
+        self.emitted = False
+        self.indexed = 0
+        self.withdrawn = False
+
+
+class NearDuplicateIndex:
+    """Clusters near-duplicate articles within a batch and against a rolling history window"""
+
+    def __init__(self, threshold: float = 0.5, num_perm: int = 64, bands: int = 16,
+                 shingle_size: int = 2, window_size: int = 100_000,
+                 window_seconds: Optional[float] = 2 * 24 * 3600, seed: int = 1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.window_size = window_size
+        self.window_seconds = window_seconds
+        # Articles naming no stock have nothing but the text to match on
+        self.unlinked_threshold = max(threshold, 0.7)
+        # Members this similar to an indexed entry are not indexed themselves
+        self.redundant_similarity = 0.8
+        self.max_indexed_per_cluster = 4
+
+        rng = random.Random(seed)
+        self.coef_a = [rng.randrange(1, MERSENNE_PRIME) for _ in range(num_perm)]
+        self.coef_b = [rng.randrange(0, MERSENNE_PRIME) for _ in range(num_perm)]
+        # NumPy forms of the coefficients, built with the first vectorised batch
+        self._a = self._b = None
+
+        # entry id -> (signature, cluster, stocks); buckets map a band hash to one entry id or a list of them
+        self.entries: Dict[int, tuple] = {}
+        self.buckets: Dict[int, object] = {}
+        self.history = deque()
+        self.next_id = 0
+        # Representative URL -> cluster of every story still indexed, for withdraw()
+        self.clusters: Dict[str, _Cluster] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _words(self, text: str) -> List[str]:
+        return WORD.findall(text.casefold())
+
+    def prepare(self):
+        """Import NumPy now, e.g. while the first pages download, rather than in the first dedup"""
+        load_numpy()
+
+    def _shingles(self, text: str) -> List[int]:
+        """Hashes of every run of 1 to `shingle_size` adjacent words"""
+        words = self._words(text) or ['']
+        grams = [' '.join(words[i:i + n]) for n in range(1, self.shingle_size + 1) for i in range(len(words) - n + 1)]
+        return list({zlib.crc32(gram.encode('utf-8')) % MERSENNE_PRIME for gram in grams})
+
+    def signatures(self, texts: List[str]) -> list:
+        """MinHash signatures for many texts, vectorised with NumPy when available"""
+        shingled = [self._shingles(text) for text in texts]
+        if not load_numpy():
+            return [tuple(min((a * x + b) % MERSENNE_PRIME for x in shingles)
+                          for a, b in zip(self.coef_a, self.coef_b))
+                    for shingles in shingled]
+
+        if self._a is None:
+            self._a = np.array(self.coef_a, dtype=np.uint64)[:, None]
+            self._b = np.array(self.coef_b, dtype=np.uint64)[:, None]
+        signatures = []
+        # Bound the (num_perm x shingles) matrix to keep memory flat on big batches
+        for start in range(0, len(shingled), 512):
+            chunk = shingled[start:start + 512]
+            counts = np.fromiter(map(len, chunk), dtype=np.int64, count=len(chunk))
+            offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+            shingles = np.fromiter(chain.from_iterable(chunk), dtype=np.uint64, count=int(counts.sum()))
+
+            # Hash every shingle of the chunk under every permutation at once, then take each text's minima
+            hashed = (self._a * shingles + self._b) % MERSENNE_PRIME
+            minima = np.minimum.reduceat(hashed, offsets, axis=1).astype(np.uint32)
+            signatures.extend(minima.T.copy())
+        return signatures
+
+    def _band_keys(self, signature) -> List[int]:
+        rows = self.rows
+        if np is not None and not isinstance(signature, tuple):
+            raw = signature.tobytes()
+            width = rows * 4
+            return [hash((band, raw[band * width:(band + 1) * width])) for band in range(self.bands)]
+        return [hash((band,) + signature[band * rows:(band + 1) * rows]) for band in range(self.bands)]
+
+    def _best_match(self, signature, band_keys: List[int], stocks: frozenset) -> tuple:
+        """The cluster of the most similar indexed entry about the same stocks above the threshold,
+        and that similarity"""
+        candidates = set()
+        for key in band_keys:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                continue
+            if isinstance(bucket, list):
+                candidates.update(bucket)
+            else:
+                candidates.add(bucket)
+        # Stories about different companies are never merged; articles naming none only match each other
+        entries = [entry for entry in map(self.entries.__getitem__, candidates)
+                   if not entry[1].withdrawn and (entry[2] & stocks or not (entry[2] or stocks))]
+        if not entries:
+            return None, 0.0
+
+        if np is not None and not isinstance(signature, tuple):
+            # Compare against every candidate at once
+            matches = np.count_nonzero(np.stack([entry[0] for entry in entries]) == signature, axis=1)
+            best = int(matches.argmax())
+            similarity = int(matches[best]) / self.num_perm
+        else:
+            similarities = [sum(x == y for x, y in zip(signature, entry[0])) / self.num_perm for entry in entries]
+            similarity = max(similarities)
+            best = similarities.index(similarity)
+
+        if similarity < (self.threshold if stocks else self.unlinked_threshold):
+            return None, similarity
+        return entries[best][1], similarity
+
+    def _add(self, signature, band_keys: List[int], cluster: _Cluster, stocks: frozenset, seen_at: float):
+        entry_id = self.next_id
+        self.next_id += 1
+        self.entries[entry_id] = (signature, cluster, stocks)
+        cluster.indexed += 1
+        for key in band_keys:
+            bucket = self.buckets.get(key)
+            if bucket is None:
+                self.buckets[key] = entry_id
+            elif isinstance(bucket, list):
+                bucket.append(entry_id)
+            else:
+                self.buckets[key] = [bucket, entry_id]
+        self.history.append((seen_at, entry_id))
+
+    def _evict(self, now: float):
+        """Forget entries that fell out of the window before `now`"""
+        cutoff = now - self.window_seconds if self.window_seconds else None
+        while self.history and (len(self.history) > self.window_size
+                                or (cutoff is not None and self.history[0][0] < cutoff)):
+            _, entry_id = self.history.popleft()
+            signature, cluster, _ = self.entries.pop(entry_id)
+            cluster.indexed -= 1
+            if not cluster.indexed and self.clusters.get(cluster.representative.url) is cluster:
+                del self.clusters[cluster.representative.url]
+            for key in self._band_keys(signature):
+                bucket = self.buckets.get(key)
+                if isinstance(bucket, list):
+                    bucket.remove(entry_id)
+                    if len(bucket) == 1:
+                        self.buckets[key] = bucket[0]
+                elif bucket == entry_id:
+                    del self.buckets[key]
+
+    def deduplicate(self, articles: list, now: Optional[float] = None) -> list:
+        """Collapse near-duplicates, returning one representative per new story.
+
+        Articles matching a story already returned from an earlier batch are
+        dropped, and their source is added to that story's cluster. A match
+        needs similar headlines and at least one stock in common, or no
+        stocks on either side and more similar headlines.
+
+        `now` is when the batch was seen, in epoch seconds (default: the
+        current time). The time window follows it, so a replay of archived
+        pages passes their fetch times.
+        """
+        now = time.time() if now is None else now
+        # Stories that fell out of the window since the last batch don't absorb this one
+        self._evict(now)
+        signatures = self.signatures([article.headline for article in articles])
+        new_clusters: List[_Cluster] = []
+
+        for article, signature in zip(articles, signatures):
+            band_keys = self._band_keys(signature)
+            stocks = frozenset(article.relevant_stocks)
+            cluster, similarity = self._best_match(signature, band_keys, stocks)
+            if cluster is None:
+                cluster = _Cluster(article)
+                new_clusters.append(cluster)
+            else:
+                if article.source not in cluster.sources:
+                    cluster.sources.append(article.source)
+                if not cluster.emitted and article.impact_score > cluster.representative.impact_score:
+                    cluster.representative = article
+                # A near-copy of an indexed entry adds nothing to recall, only to bucket sizes,
+                # and capping members per cluster stops loose chains of stories merging
+                if similarity >= self.redundant_similarity or cluster.indexed >= self.max_indexed_per_cluster:
+                    continue
+            self._add(signature, band_keys, cluster, stocks, now)
+
+        representatives = []
+        for cluster in new_clusters:
+            cluster.emitted = True
+            cluster.representative.cluster_sources = tuple(cluster.sources)
+            representatives.append(cluster.representative)
+            self.clusters[cluster.representative.url] = cluster
+
+        self._evict(now)
+        return representatives
+
+    def withdraw(self, articles: list):
+        """Forget the stories of representatives returned by deduplicate(), e.g. because
+        they could not be saved, so that they count as new the next time they are seen"""
+        for article in articles:
+            cluster = self.clusters.get(article.url)
+            if cluster is not None and cluster.representative is article:
+                cluster.withdrawn = True
+                del self.clusters[article.url]
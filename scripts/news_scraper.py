@@ -2,362 +2,608 @@
 """
 Advanced News Scraper for Indian Stock Market
 Scrapes news from multiple sources and stores in database
+
+requests, bs4, NumPy and psycopg2 are imported by the stage that first
+needs them, so `query`, `--help` and runs without a database start quickly.
 """
 
-import requests
-from bs4 import BeautifulSoup
 import json
-import psycopg2
 from datetime import datetime, timedelta
+import argparse
+import signal
+import sqlite3
+import threading
 import time
-import re
 import logging
-from typing import List, Dict, Optional
+from typing import TYPE_CHECKING, Iterator, List, Dict, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
 import os
-from dataclasses import dataclass
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+
+from article_index import ArticleIndex
+from articles import NewsArticle
+from host_control import CircuitOpenError, HostController
+from http_cache import HttpCache, Validators
+from listing_parser import DEFAULT_PARSER, PARSERS, ItemQuotaScanner, ListingParser, parse_time_text
+from metrics import NULL_METRICS, Metrics
+from near_duplicates import NearDuplicateIndex
+from page_archive import PageArchive
+from rate_limiter import HostRateLimiter
+from rollups import SentimentRollup
+from seen_urls import SeenUrlIndex, url_key
+from sentiment import SentimentScorer
+from streaming import BackgroundWriter, JsonLinesSink, TopN, article_to_dict
+from symbol_matcher import DEFAULT_SYMBOL_MASTER, SymbolMatcher
+from work_queue import ScrapeJob, ScrapeJobQueue
+
+if TYPE_CHECKING:
+    import requests
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-@dataclass
-class NewsArticle:
-    headline: str
-    summary: str
-    source: str
-    url: str
-    published_at: datetime
-    sentiment: str
-    relevant_stocks: List[str]
-    impact_score: float
+# Compiled matchers and other derived data are cached here between runs
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'smart-news-portfolio')
+
+# Local symbol -> article index in the cache directory
+ARTICLE_INDEX_FILE = 'article_index.sqlite3'
+
+# How far back the daemon and workers keep hourly sentiment buckets in memory
+ROLLUP_WINDOW = timedelta(days=2)
+
+# Headers of every listing request (article body requests reuse the User-Agent)
+REQUEST_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Accept-Encoding': 'gzip, deflate',
+    'Connection': 'keep-alive',
+}
+
+# Derived rates in the metrics report: name -> (counter, timer)
+METRIC_RATES = {
+    'fetch_bytes_per_second': ('fetch_bytes_total', 'fetch_seconds'),
+    'parse_items_per_second': ('items_parsed_total', 'parse_seconds'),
+    'db_rows_per_second': ('db_rows_total', 'db_write_seconds'),
+}
+
+# Listing pages scraped for each source. `base_url` resolves relative article links.
+SOURCES = {
+    'moneycontrol': {
+        'name': 'Moneycontrol',
+        'base_url': 'https://www.moneycontrol.com',
+        'urls': [
+            'https://www.moneycontrol.com/news/business/',
+            'https://www.moneycontrol.com/news/business/markets/',
+            'https://www.moneycontrol.com/news/business/earnings/'
+        ],
+    },
+    'economic_times': {
+        'name': 'Economic Times',
+        'base_url': 'https://economictimes.indiatimes.com',
+        'urls': [
+            'https://economictimes.indiatimes.com/markets',
+            'https://economictimes.indiatimes.com/markets/stocks',
+            'https://economictimes.indiatimes.com/markets/earnings'
+        ],
+    },
+    'business_standard': {
+        'name': 'Business Standard',
+        'base_url': 'https://www.business-standard.com',
+        'urls': [
+            'https://www.business-standard.com/markets',
+            'https://www.business-standard.com/companies'
+        ],
+    },
+}
 
 class IndianStockNewsScraper:
-    def __init__(self, database_url: Optional[str] = None):
-        self.database_url = database_url or os.getenv('DATABASE_URL')
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-            'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-            'Accept-Language': 'en-US,en;q=0.5',
-            'Accept-Encoding': 'gzip, deflate',
-            'Connection': 'keep-alive',
-        })
-        
-        # Stock symbol mapping for Indian companies
-        self.stock_mapping = {
-            'TCS': ['TCS', 'Tata Consultancy Services', 'Tata Consultancy'],
-            'RELIANCE': ['Reliance', 'RIL', 'Reliance Industries'],
-            'HDFCBANK': ['HDFC Bank', 'HDFC', 'Housing Development Finance Corporation'],
-            'INFY': ['Infosys', 'INFY'],
-            'ICICIBANK': ['ICICI Bank', 'ICICI'],
-            'SBIN': ['SBI', 'State Bank', 'State Bank of India'],
-            'WIPRO': ['Wipro'],
-            'MARUTI': ['Maruti', 'Maruti Suzuki'],
-            'SUNPHARMA': ['Sun Pharma', 'Sun Pharmaceutical'],
-            'TATAMOTORS': ['Tata Motors'],
-            'BHARTIARTL': ['Bharti Airtel', 'Airtel'],
-            'HCLTECH': ['HCL Technologies', 'HCL Tech', 'HCL'],
-            'ASIANPAINT': ['Asian Paints'],
-            'KOTAKBANK': ['Kotak Mahindra Bank', 'Kotak Bank', 'Kotak'],
-            'LT': ['Larsen & Toubro', 'L&T', 'Larsen and Toubro'],
-            'AXISBANK': ['Axis Bank'],
-            'BAJFINANCE': ['Bajaj Finance'],
-            'ULTRACEMCO': ['UltraTech Cement'],
-            'NESTLEIND': ['Nestle India'],
-            'POWERGRID': ['Power Grid Corporation'],
-        }
-        
-        # Sentiment analysis keywords
-        self.positive_keywords = [
-            'surge', 'rally', 'gain', 'rise', 'up', 'positive', 'strong', 'growth',
-            'bullish', 'optimistic', 'boost', 'soar', 'jump', 'climb', 'advance',
-            'outperform', 'beat', 'exceed', 'record', 'high', 'profit', 'revenue',
-            'expansion', 'acquisition', 'merger', 'dividend', 'bonus', 'split'
-        ]
-        
-        self.negative_keywords = [
-            'fall', 'drop', 'decline', 'down', 'negative', 'weak', 'loss', 'crash',
-            'bearish', 'pessimistic', 'plunge', 'tumble', 'slide', 'slump', 'retreat',
-            'underperform', 'miss', 'disappoint', 'low', 'deficit', 'concern', 'worry',
-            'layoff', 'restructure', 'debt', 'lawsuit', 'investigation', 'penalty'
-        ]
+    def __init__(self, database_url: Optional[str] = None, concurrent: bool = True,
+                 max_workers: int = 8, requests_per_second: float = 0.5, burst: float = 1.0,
+                 timeout: float = 10, sources: Optional[Dict[str, dict]] = None,
+                 symbol_master: Optional[str] = None, cache_dir: Optional[str] = None,
+                 http_cache: bool = True, db_batch_size: int = 1000,
+                 track_seen: bool = False, db_pool_size: int = 0,
+                 parser: Optional[str] = None, parse_workers: int = 0, targeted: bool = True,
+                 metrics: Optional[Metrics] = None, fetch_bodies: bool = False, body_budget: float = 30.0,
+                 index_articles: bool = True, max_retries: int = 2, circuit_cooldown: float = 30.0,
+                 archive_dir: Optional[str] = None, use_database: bool = True,
+                 db_queue_size: int = 5000, db_flush_interval: float = 0.5):
+        # use_database=False ignores DATABASE_URL, e.g. for JSON-only runs
+        self.database_url = (database_url or os.getenv('DATABASE_URL')) if use_database else None
+        self.cache_dir = cache_dir or os.getenv('SCRAPER_CACHE_DIR') or DEFAULT_CACHE_DIR
+        self.sources = sources or SOURCES
+        self.concurrent = concurrent
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.db_batch_size = db_batch_size
 
-    def scrape_moneycontrol(self) -> List[NewsArticle]:
-        """Scrape news from Moneycontrol"""
-        articles = []
+        # Per-stage timings and counters; NULL_METRICS records nothing
+        self.metrics = metrics or NULL_METRICS
+
+        # Politeness is enforced per host: one request every 1/requests_per_second seconds
+        self.rate_limiter = HostRateLimiter(rate=requests_per_second, capacity=burst)
+        # Latency-based deadlines, AIMD rate/concurrency, retries and a circuit breaker per host
+        self.host_control = HostController(self.rate_limiter, max_timeout=timeout, max_retries=max_retries,
+                                           cooldown=circuit_cooldown, metrics=self.metrics)
+
+        # Validators of previously fetched listing pages, for conditional GETs
+        self.http_cache = None
+        if http_cache:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self.http_cache = HttpCache(os.path.join(self.cache_dir, 'http_cache.sqlite3'))
+        # Validators of changed pages by URL, stored once the page's articles are saved
+        self._unsaved_pages: Dict[str, Validators] = {}
+
+        # URLs already stored; articles at these URLs are dropped before scoring
+        self.seen_urls = None
+        if track_seen:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self.seen_urls = SeenUrlIndex(os.path.join(self.cache_dir, 'seen_urls.sqlite3'))
+
+        # Raw copies of fetched listing pages, for replaying history through a changed pipeline
+        self.archive = PageArchive(archive_dir) if archive_dir else None
+
+        # Sentiment per symbol, source and hour of every article scraped by this process
+        self.rollup = SentimentRollup()
+
+        # Local symbol -> article index behind the `query` command
+        self.article_index = None
+        if index_articles:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self.article_index = ArticleIndex(os.path.join(self.cache_dir, ARTICLE_INDEX_FILE))
+
+        # Long-running modes keep database connections open in a pool
+        self.db_pool_size = db_pool_size
+        self.db_pool = None
+
+        # Background writer behind save_in_background, started by the first write. Micro-batches of up
+        # to db_batch_size articles go out every db_flush_interval seconds; at most db_queue_size
+        # articles wait for it before scraping blocks
+        self.db_queue_size = db_queue_size
+        self.db_flush_interval = db_flush_interval
+        self.db_writer = None
+
+        # HTML parsing runs in worker processes when parse_workers > 0. Targeted mode only
+        # downloads and builds the item markup of each listing page
+        self.targeted = targeted
+        self.listing_parser = ListingParser(parser, workers=parse_workers, targeted=targeted)
+
+        # HTTP session for listing pages, created by the first fetch (replays never need one)
+        self._session = None
+        self._session_lock = threading.Lock()
+
+        # Stock symbol matcher for Indian companies, built from a JSON/CSV symbol master. The compiled
+        # matcher is cached per master file, so the master is only read after it changes
+        self.symbol_master = symbol_master or os.getenv('SYMBOL_MASTER') or DEFAULT_SYMBOL_MASTER
+        self.symbol_matcher = SymbolMatcher.from_master(self.symbol_master, self.cache_dir)
+
+        # Sentiment analysis lexicon
+        self.sentiment_scorer = SentimentScorer()
+
+        # MinHash/LSH index of recent headlines; in daemon mode it spans polls
+        self.dedup_index = NearDuplicateIndex()
+
+        # Optional full-body enrichment, on its own session, pool and rate limiter so it can't
+        # hold up listing fetches. Each cycle waits at most body_budget seconds for bodies.
+        self.body_budget = body_budget
+        self.body_fetcher = None
+        if fetch_bodies:
+            # Imports requests and bs4 itself, so only load it when bodies are wanted
+            from article_bodies import ArticleBodyFetcher, BodyCache
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self.body_fetcher = ArticleBodyFetcher(
+                self.symbol_matcher, self.sentiment_scorer,
+                cache=BodyCache(os.path.join(self.cache_dir, 'article_bodies.sqlite3')),
+                timeout=timeout, parser=self.listing_parser.parser,
+                headers={'User-Agent': REQUEST_HEADERS['User-Agent']}, metrics=self.metrics)
+
+        # Imports and compilation that parsing, scoring and dedup would do on first use run
+        # alongside the first downloads instead
+        threading.Thread(target=self._prepare_stages, name='prepare-stages', daemon=True).start()
+
+    def _prepare_stages(self):
         try:
-            logger.info("Scraping Moneycontrol...")
-            
-            # Multiple pages for better coverage
-            urls = [
-                'https://www.moneycontrol.com/news/business/',
-                'https://www.moneycontrol.com/news/business/markets/',
-                'https://www.moneycontrol.com/news/business/earnings/'
-            ]
-            
-            for url in urls:
-                try:
-                    response = self.session.get(url, timeout=10)
-                    response.raise_for_status()
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    
-                    # Find news articles
-                    news_items = soup.find_all('li', class_='clearfix')[:15]
-                    
-                    for item in news_items:
-                        try:
-                            headline_elem = item.find('h2') or item.find('a')
-                            if not headline_elem:
-                                continue
-                                
-                            headline = headline_elem.get_text(strip=True)
-                            link = headline_elem.get('href', '') if headline_elem.name == 'a' else headline_elem.find('a', href=True)
-                            
-                            if isinstance(link, str):
-                                url_link = link
-                            else:
-                                url_link = link.get('href', '') if link else ''
-                            
-                            if not url_link.startswith('http'):
-                                url_link = f"https://www.moneycontrol.com{url_link}"
-                            
-                            # Get summary
-                            summary_elem = item.find('p')
-                            summary = summary_elem.get_text(strip=True) if summary_elem else headline
-                            
-                            # Get timestamp
-                            time_elem = item.find('span', class_='ago')
-                            published_at = self._parse_time_text(time_elem.get_text(strip=True) if time_elem else 'recent')
-                            
-                            # Extract relevant stocks and analyze sentiment
-                            relevant_stocks = self._extract_stock_symbols(headline + ' ' + summary)
-                            sentiment = self._analyze_sentiment(headline + ' ' + summary)
-                            impact_score = self._calculate_impact_score(sentiment, len(relevant_stocks))
-                            
-                            if headline and len(headline) > 10:  # Filter out very short headlines
-                                articles.append(NewsArticle(
-                                    headline=headline,
-                                    summary=summary,
-                                    source='Moneycontrol',
-                                    url=url_link,
-                                    published_at=published_at,
-                                    sentiment=sentiment,
-                                    relevant_stocks=relevant_stocks,
-                                    impact_score=impact_score
-                                ))
-                                
-                        except Exception as e:
-                            logger.warning(f"Error parsing Moneycontrol article: {e}")
-                            continue
-                    
-                    time.sleep(2)  # Be respectful to the server
-                    
-                except Exception as e:
-                    logger.error(f"Error scraping Moneycontrol URL {url}: {e}")
-                    continue
-                    
+            self.listing_parser.prepare()
+            self.symbol_matcher.prepare()
+            self.dedup_index.prepare()
         except Exception as e:
-            logger.error(f"Error scraping Moneycontrol: {e}")
-            
-        logger.info(f"Scraped {len(articles)} articles from Moneycontrol")
+            # The stage hits the same problem again on first use and reports it there
+            logger.debug(f"Preparing stages failed: {e}")
+
+    @property
+    def session(self) -> 'requests.Session':
+        """The listing session, created (and requests imported) on first use"""
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=len(self.sources), pool_maxsize=self.max_workers)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                session.headers.update(REQUEST_HEADERS)
+                self._session = session
+            return self._session
+
+    def _fetch(self, url: str, source_key: Optional[str] = None) -> Optional[bytes]:
+        """Fetch a listing page under its host's adaptive limits, retrying transient failures.
+
+        Returns None when the HTTP cache shows the page hasn't changed since the last poll.
+        Raises CircuitOpenError while the host is being skipped.
+        """
+        headers = self.http_cache.conditional_headers(url) if self.http_cache else None
+        return self.host_control.call(url, lambda timeout: self._fetch_once(url, source_key, headers, timeout))
+
+    def _fetch_once(self, url: str, source_key: Optional[str], headers: Optional[Dict[str, str]],
+                    timeout: float) -> Optional[bytes]:
+        """One attempt at fetching a listing page (host_control has already waited for the rate limiter)"""
+        started = time.perf_counter()
+        response = self.session.get(url, timeout=timeout, headers=headers, stream=True)
+        self.metrics.inc('fetch_responses_total', source=source_key, url=url,
+                         status=response.status_code)
+
+        if self.http_cache and response.status_code == 304:
+            response.close()
+            self.metrics.observe('fetch_seconds', time.perf_counter() - started, source=source_key, url=url)
+            self.http_cache.not_modified(url)
+            logger.info(f"Not modified since last poll: {url}")
+            return None
+        import requests
+        try:
+            response.raise_for_status()
+        except requests.HTTPError:
+            response.close()
+            raise
+
+        content = self._read_listing(response, source_key)
+        self.metrics.observe('fetch_seconds', time.perf_counter() - started, source=source_key, url=url)
+        self.metrics.inc('fetch_bytes_total', len(content), source=source_key, url=url)
+        if self.http_cache:
+            validators = self.http_cache.check(url, response.headers, content)
+            if validators is None:
+                logger.info(f"Unchanged since last poll: {url}")
+                return None
+            self._unsaved_pages[url] = validators
+        if self.archive is not None:
+            self.archive.append(url, source_key, response.status_code, response.headers, content)
+        return content
+
+    def _read_listing(self, response: 'requests.Response', source_key: Optional[str]) -> bytes:
+        """Read a listing response, stopping once the items the parser uses have arrived.
+
+        Pages are read to the end while archiving, so that replays through
+        changed selectors or quotas see the whole page.
+        """
+        scanner = ItemQuotaScanner.for_source(source_key) if self.targeted and source_key else None
+        if scanner is None or self.archive is not None:
+            return response.content
+
+        chunks = []
+        for chunk in response.iter_content(16 * 1024):
+            chunks.append(chunk)
+            if scanner.feed(chunk):
+                # Drops the connection rather than draining the rest of the page
+                response.close()
+                logger.debug(f"Stopped reading {response.url} after {sum(map(len, chunks)):,} bytes")
+                break
+        return b''.join(chunks)
+
+    def _parse_page(self, source_key: str, content: bytes) -> List[NewsArticle]:
+        """Parse a fetched listing page of `source_key` into articles"""
+        source = self.sources[source_key]
+        with self.metrics.timer('parse_seconds', source=source_key):
+            items = self.listing_parser.parse(source_key, source['base_url'], content)
+        with self.metrics.timer('score_seconds', source=source_key):
+            articles = self._build_articles(source['name'], items)
+        self.metrics.inc('items_parsed_total', len(items), source=source_key)
+        self.metrics.inc('items_kept_total', len(articles), source=source_key)
         return articles
 
-    def scrape_economic_times(self) -> List[NewsArticle]:
-        """Scrape news from Economic Times"""
-        articles = []
+    def _fetch_and_parse(self, source_key: str, url: str) -> List[NewsArticle]:
+        """Fetch and parse a single listing page, skipping parsing when it is unchanged"""
         try:
-            logger.info("Scraping Economic Times...")
-            
-            urls = [
-                'https://economictimes.indiatimes.com/markets',
-                'https://economictimes.indiatimes.com/markets/stocks',
-                'https://economictimes.indiatimes.com/markets/earnings'
-            ]
-            
-            for url in urls:
-                try:
-                    response = self.session.get(url, timeout=10)
-                    response.raise_for_status()
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    
-                    # Find news articles
-                    news_items = soup.find_all('div', class_='eachStory')[:10]
-                    
-                    for item in news_items:
-                        try:
-                            headline_elem = item.find('h3') or item.find('h2')
-                            if not headline_elem:
-                                continue
-                                
-                            link_elem = headline_elem.find('a')
-                            if not link_elem:
-                                continue
-                                
-                            headline = link_elem.get_text(strip=True)
-                            url_link = link_elem.get('href', '')
-                            
-                            if not url_link.startswith('http'):
-                                url_link = f"https://economictimes.indiatimes.com{url_link}"
-                            
-                            # Get summary
-                            summary_elem = item.find('p')
-                            summary = summary_elem.get_text(strip=True) if summary_elem else headline
-                            
-                            # Extract relevant stocks and analyze sentiment
-                            relevant_stocks = self._extract_stock_symbols(headline + ' ' + summary)
-                            sentiment = self._analyze_sentiment(headline + ' ' + summary)
-                            impact_score = self._calculate_impact_score(sentiment, len(relevant_stocks))
-                            
-                            if headline and len(headline) > 10:
-                                articles.append(NewsArticle(
-                                    headline=headline,
-                                    summary=summary,
-                                    source='Economic Times',
-                                    url=url_link,
-                                    published_at=datetime.now(),
-                                    sentiment=sentiment,
-                                    relevant_stocks=relevant_stocks,
-                                    impact_score=impact_score
-                                ))
-                                
-                        except Exception as e:
-                            logger.warning(f"Error parsing ET article: {e}")
-                            continue
-                    
-                    time.sleep(2)
-                    
-                except Exception as e:
-                    logger.error(f"Error scraping ET URL {url}: {e}")
+            content = self._fetch(url, source_key)
+        except CircuitOpenError:
+            self.metrics.inc('fetch_skipped_total', source=source_key)
+            logger.info(f"Skipping {url} while its host is failing")
+            return []
+        except Exception:
+            self.metrics.inc('fetch_errors_total', source=source_key)
+            raise
+        if content is None:
+            return []
+        try:
+            return self._parse_page(source_key, content)
+        except Exception:
+            # Nothing from the page will be saved, so it must not count as seen by the HTTP cache
+            self._unsaved_pages.pop(url, None)
+            raise
+
+    def _build_articles(self, source_name: str, items: List[tuple]) -> List[NewsArticle]:
+        """Turn raw (headline, summary, url, published_at) items into scored articles"""
+        # Filter out very short headlines
+        items = [item for item in items if item[0] and len(item[0]) > 10]
+
+        # Skip scoring entirely for articles that were stored on an earlier poll
+        if self.seen_urls is not None and items:
+            unseen = self.seen_urls.unseen(item[2] for item in items)
+            items = [item for item in items if item[2] in unseen]
+        scores = self.sentiment_scorer.analyze_batch(headline + ' ' + summary for headline, summary, _, _ in items)
+
+        articles = []
+        for (headline, summary, url_link, published_at), score in zip(items, scores):
+            # Extract relevant stocks and score impact
+            relevant_stocks = self._extract_stock_symbols(headline + ' ' + summary)
+            impact_score = self._calculate_impact_score(score, len(relevant_stocks))
+
+            articles.append(NewsArticle(
+                headline=headline,
+                summary=summary,
+                source=source_name,
+                url=url_link,
+                published_at=published_at,
+                sentiment=self.sentiment_scorer.label(score),
+                relevant_stocks=relevant_stocks,
+                impact_score=impact_score
+            ))
+        return articles
+
+    def _enrich_with_bodies(self, articles: List[NewsArticle], budget: Optional[float] = None) -> List[NewsArticle]:
+        """Re-run symbol extraction and scoring with each article's body text, where it could be fetched
+        within `budget` seconds (default: body_budget)"""
+        if self.body_fetcher is None or not articles:
+            return articles
+        budget = self.body_budget if budget is None else budget
+        with self.metrics.timer('enrich_seconds'):
+            bodies = self.body_fetcher.fetch_many([article.url for article in articles], budget)
+            for article in articles:
+                body = bodies.get(article.url)
+                if body is None:
                     continue
-                    
-        except Exception as e:
-            logger.error(f"Error scraping Economic Times: {e}")
-            
-        logger.info(f"Scraped {len(articles)} articles from Economic Times")
+                body_symbols, body_score = body
+                # The body adds its mean paragraph score, so a long article doesn't swamp the headline
+                score = self.sentiment_scorer.score(article.headline + ' ' + article.summary) + body_score
+                article.relevant_stocks = tuple(dict.fromkeys(article.relevant_stocks + body_symbols))
+                article.sentiment = self.sentiment_scorer.label(score)
+                article.impact_score = self._calculate_impact_score(score, len(article.relevant_stocks))
+        self.metrics.inc('bodies_enriched_total', len(bodies))
         return articles
 
-    def scrape_business_standard(self) -> List[NewsArticle]:
-        """Scrape news from Business Standard"""
+    def _scrape_source(self, source_key: str) -> List[NewsArticle]:
+        """Scrape every listing URL of a source one after another"""
+        source = self.sources[source_key]
         articles = []
-        try:
-            logger.info("Scraping Business Standard...")
-            
-            urls = [
-                'https://www.business-standard.com/markets',
-                'https://www.business-standard.com/companies'
-            ]
-            
-            for url in urls:
-                try:
-                    response = self.session.get(url, timeout=10)
-                    response.raise_for_status()
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    
-                    # Find news articles
-                    news_items = soup.find_all('div', class_='listingstyle')[:10]
-                    
-                    for item in news_items:
-                        try:
-                            headline_elem = item.find('h2') or item.find('h3')
-                            if not headline_elem:
-                                continue
-                                
-                            link_elem = headline_elem.find('a')
-                            if not link_elem:
-                                continue
-                                
-                            headline = link_elem.get_text(strip=True)
-                            url_link = link_elem.get('href', '')
-                            
-                            if not url_link.startswith('http'):
-                                url_link = f"https://www.business-standard.com{url_link}"
-                            
-                            # Get summary
-                            summary_elem = item.find('p')
-                            summary = summary_elem.get_text(strip=True) if summary_elem else headline
-                            
-                            # Extract relevant stocks and analyze sentiment
-                            relevant_stocks = self._extract_stock_symbols(headline + ' ' + summary)
-                            sentiment = self._analyze_sentiment(headline + ' ' + summary)
-                            impact_score = self._calculate_impact_score(sentiment, len(relevant_stocks))
-                            
-                            if headline and len(headline) > 10:
-                                articles.append(NewsArticle(
-                                    headline=headline,
-                                    summary=summary,
-                                    source='Business Standard',
-                                    url=url_link,
-                                    published_at=datetime.now(),
-                                    sentiment=sentiment,
-                                    relevant_stocks=relevant_stocks,
-                                    impact_score=impact_score
-                                ))
-                                
-                        except Exception as e:
-                            logger.warning(f"Error parsing BS article: {e}")
-                            continue
-                    
-                    time.sleep(2)
-                    
-                except Exception as e:
-                    logger.error(f"Error scraping BS URL {url}: {e}")
-                    continue
-                    
-        except Exception as e:
-            logger.error(f"Error scraping Business Standard: {e}")
-            
-        logger.info(f"Scraped {len(articles)} articles from Business Standard")
+        logger.info(f"Scraping {source['name']}...")
+
+        for url in source['urls']:
+            try:
+                articles.extend(self._fetch_and_parse(source_key, url))
+            except Exception as e:
+                logger.error(f"Error scraping {source['name']} URL {url}: {e}")
+                continue
+
+        logger.info(f"Scraped {len(articles)} articles from {source['name']}")
         return articles
 
+    def scrape_moneycontrol(self) -> List[NewsArticle]:
+        """Scrape news from Moneycontrol"""
+        return self._scrape_source('moneycontrol')
+
+    def scrape_economic_times(self) -> List[NewsArticle]:
+        """Scrape news from Economic Times"""
+        return self._scrape_source('economic_times')
+
+    def scrape_business_standard(self) -> List[NewsArticle]:
+        """Scrape news from Business Standard"""
+        return self._scrape_source('business_standard')
+
     def _extract_stock_symbols(self, text: str) -> List[str]:
         """Extract stock symbols from text"""
-        found_stocks = []
-        text_upper = text.upper()
-        
-        for symbol, names in self.stock_mapping.items():
-            for name in names:
-                if name.upper() in text_upper:
-                    found_stocks.append(symbol)
-                    break
-        
-        return list(set(found_stocks))
+        return self.symbol_matcher.find(text)
 
     def _analyze_sentiment(self, text: str) -> str:
         """Analyze sentiment of the text"""
-        text_lower = text.lower()
-        
-        positive_count = sum(1 for word in self.positive_keywords if word in text_lower)
-        negative_count = sum(1 for word in self.negative_keywords if word in text_lower)
-        
-        if positive_count > negative_count:
-            return 'positive'
-        elif negative_count > positive_count:
-            return 'negative'
-        else:
-            return 'neutral'
+        return self.sentiment_scorer.label(self.sentiment_scorer.score(text))
 
-    def _calculate_impact_score(self, sentiment: str, stock_count: int) -> float:
-        """Calculate impact score based on sentiment and stock relevance"""
-        base_score = {'positive': 0.7, 'negative': 0.6, 'neutral': 0.5}[sentiment]
+    def _calculate_impact_score(self, sentiment_score: float, stock_count: int) -> float:
+        """Calculate impact score based on sentiment strength and stock relevance"""
+        # Two or more net lexicon hits saturate the sentiment component
+        strength = min(abs(sentiment_score) / 2.0, 1.0)
+        base_score = 0.5 + (0.2 if sentiment_score > 0 else 0.1) * strength
         stock_bonus = min(stock_count * 0.1, 0.3)
-        return min(base_score + stock_bonus, 1.0)
+        return round(min(base_score + stock_bonus, 1.0), 2)
 
     def _parse_time_text(self, time_text: str) -> datetime:
         """Parse time text to datetime"""
-        now = datetime.now()
-        time_text = time_text.lower()
-        
-        if 'hour' in time_text:
-            hours = int(re.search(r'\d+', time_text).group()) if re.search(r'\d+', time_text) else 1
-            return now - timedelta(hours=hours)
-        elif 'minute' in time_text:
-            minutes = int(re.search(r'\d+', time_text).group()) if re.search(r'\d+', time_text) else 1
-            return now - timedelta(minutes=minutes)
-        elif 'day' in time_text:
-            days = int(re.search(r'\d+', time_text).group()) if re.search(r'\d+', time_text) else 1
-            return now - timedelta(days=days)
+        return parse_time_text(time_text)
+
+    def _validate_for_database(self, articles: List[NewsArticle]) -> List[NewsArticle]:
+        """Drop articles that would make a bulk insert fail, and repeated URLs"""
+        valid = []
+        seen_urls = set()
+        for article in articles:
+            problem = None
+            if not article.headline:
+                problem = 'empty headline'
+            elif not article.url:
+                problem = 'empty url'
+            elif not article.source or len(article.source) > 100:
+                problem = 'invalid source'
+            elif article.sentiment not in ('positive', 'negative', 'neutral'):
+                problem = f'invalid sentiment {article.sentiment!r}'
+            elif not 0 <= article.impact_score < 10:  # DECIMAL(3, 2)
+                problem = f'impact score {article.impact_score} out of range'
+            elif not isinstance(article.published_at, datetime):
+                problem = 'missing published_at'
+            elif any(len(stock) > 20 for stock in article.relevant_stocks):  # VARCHAR(20)
+                problem = 'stock symbol too long'
+
+            if problem:
+                logger.warning(f"Skipping article {article.url or article.headline!r}: {problem}")
+            elif article.url not in seen_urls:
+                seen_urls.add(article.url)
+                valid.append(article)
+        return valid
+
+    def _insert_articles(self, cur, articles: List[NewsArticle]) -> List[tuple]:
+        """Insert one chunk of articles and their stock relevance rows set-wise.
+
+        Returns (news_id, article) pairs for the articles that were new.
+        """
+        from psycopg2.extras import execute_values
+        rows = execute_values(cur, """
+            INSERT INTO news_articles (headline, summary, source, url, published_at, sentiment, impact_score)
+            VALUES %s
+            ON CONFLICT (url) DO NOTHING
+            RETURNING id, url
+        """, [(
+            article.headline,
+            article.summary,
+            article.source,
+            article.url,
+            article.published_at,
+            article.sentiment,
+            article.impact_score
+        ) for article in articles], page_size=len(articles), fetch=True)
+
+        by_url = {article.url: article for article in articles}
+        inserted = [(article_id, by_url[url]) for article_id, url in rows]
+
+        relevance_rows = [(article_id, stock, 0.8)
+                          for article_id, article in inserted
+                          for stock in article.relevant_stocks]
+        if relevance_rows:
+            execute_values(cur, """
+                INSERT INTO news_stock_relevance (news_id, stock_symbol, relevance_score)
+                VALUES %s
+                ON CONFLICT DO NOTHING
+            """, relevance_rows, page_size=len(relevance_rows))
+        return inserted
+
+    def _update_rollups(self, cur, inserted: List[tuple]):
+        """Add newly inserted articles to news_sentiment_rollups, in the same transaction.
+
+        A database without the rollup table (schema not migrated yet) still gets the articles.
+        """
+        import psycopg2
+        from psycopg2.extras import execute_values
+        rows = SentimentRollup(article for _, article in inserted).rows()
+        if not rows:
+            return
+        cur.execute("SAVEPOINT sentiment_rollups")
+        try:
+            execute_values(cur, """
+                INSERT INTO news_sentiment_rollups (stock_symbol, source, bucket_start, positive_count,
+                                                    negative_count, neutral_count, article_count, impact_sum)
+                VALUES %s
+                ON CONFLICT (stock_symbol, source, bucket_start) DO UPDATE SET
+                    positive_count = news_sentiment_rollups.positive_count + EXCLUDED.positive_count,
+                    negative_count = news_sentiment_rollups.negative_count + EXCLUDED.negative_count,
+                    neutral_count = news_sentiment_rollups.neutral_count + EXCLUDED.neutral_count,
+                    article_count = news_sentiment_rollups.article_count + EXCLUDED.article_count,
+                    impact_sum = news_sentiment_rollups.impact_sum + EXCLUDED.impact_sum,
+                    updated_at = CURRENT_TIMESTAMP
+            """, rows, page_size=len(rows))
+            cur.execute("RELEASE SAVEPOINT sentiment_rollups")
+        except psycopg2.Error as e:
+            cur.execute("ROLLBACK TO SAVEPOINT sentiment_rollups")
+            self.metrics.inc('db_errors_total', stage='rollups')
+            logger.warning(f"Could not update news_sentiment_rollups: {e}")
+
+    def _write_articles(self, cur, articles: List[NewsArticle],
+                        failed: Optional[List[NewsArticle]] = None) -> List[tuple]:
+        """Write articles in chunks, isolating failures with savepoints.
+
+        A chunk that fails as a whole is retried row by row, so one bad
+        article only loses itself instead of the rest of the batch. Articles
+        that could not be written are appended to `failed`.
+        """
+        inserted = []
+        for start in range(0, len(articles), self.db_batch_size):
+            chunk = articles[start:start + self.db_batch_size]
+            cur.execute("SAVEPOINT article_chunk")
+            try:
+                inserted.extend(self._insert_articles(cur, chunk))
+                cur.execute("RELEASE SAVEPOINT article_chunk")
+                continue
+            except Exception as e:
+                cur.execute("ROLLBACK TO SAVEPOINT article_chunk")
+                logger.warning(f"Bulk insert of {len(chunk)} articles failed, retrying one by one: {e}")
+
+            for article in chunk:
+                cur.execute("SAVEPOINT article_row")
+                try:
+                    inserted.extend(self._insert_articles(cur, [article]))
+                    cur.execute("RELEASE SAVEPOINT article_row")
+                except Exception as e:
+                    cur.execute("ROLLBACK TO SAVEPOINT article_row")
+                    logger.error(f"Error saving article {article.url} to database: {e}")
+                    if failed is not None:
+                        failed.append(article)
+        return inserted
+
+    def _get_connection(self):
+        """A database connection, from the pool when one is configured"""
+        import psycopg2
+        from psycopg2.pool import ThreadedConnectionPool
+        if not self.db_pool_size:
+            return psycopg2.connect(self.database_url)
+        if self.db_pool is None:
+            self.db_pool = ThreadedConnectionPool(1, self.db_pool_size, self.database_url)
+        return self.db_pool.getconn()
+
+    def _release_connection(self, conn):
+        if self.db_pool is None:
+            conn.close()
         else:
-            return now
+            self.db_pool.putconn(conn, close=bool(conn.closed))
+
+    def close(self):
+        """Write out queued articles, then release pooled connections and local index files"""
+        if self.db_writer is not None:
+            self.db_writer.close()
+        if self.db_pool is not None:
+            self.db_pool.closeall()
+            self.db_pool = None
+        for index in (self.http_cache, self.seen_urls, self.article_index, self.archive):
+            if index is not None:
+                index.close()
+        if self.body_fetcher is not None:
+            self.body_fetcher.close()
+        self.listing_parser.close()
+        if self._session is not None:
+            self._session.close()
+
+    def _save_articles(self, articles: List[NewsArticle]) -> List[tuple]:
+        """Write articles in one transaction, returning (news_id, article) for new rows. Raises on failure"""
+        started = time.perf_counter()
+        valid = self._validate_for_database(articles)
+        failed = []
+        conn = self._get_connection()
+        try:
+            with conn.cursor() as cur:
+                inserted = self._write_articles(cur, valid, failed)
+                self._update_rollups(cur, inserted)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            self.metrics.inc('db_errors_total')
+            raise
+        finally:
+            self._release_connection(conn)
+        self.metrics.observe('db_write_seconds', time.perf_counter() - started)
+        self.metrics.inc('db_articles_total', len(articles))
+        self.metrics.inc('db_rows_total', len(inserted))
+
+        # Only URLs now in the table (new or already there) are skipped from now on; invalid
+        # articles and rows that failed are scored and tried again when they next turn up
+        if self.seen_urls is not None:
+            failed_urls = {article.url for article in failed}
+            self.seen_urls.add(article.url for article in valid if article.url not in failed_urls)
+        return inserted
 
     def save_to_database(self, articles: List[NewsArticle]) -> int:
         """Save articles to database"""
@@ -367,115 +613,434 @@ class IndianStockNewsScraper:
             
         saved_count = 0
         try:
-            conn = psycopg2.connect(self.database_url)
-            cur = conn.cursor()
-            
-            for article in articles:
-                try:
-                    # Insert article
-                    cur.execute("""
-                        INSERT INTO news_articles (headline, summary, source, url, published_at, sentiment, impact_score)
-                        VALUES (%s, %s, %s, %s, %s, %s, %s)
-                        ON CONFLICT (url) DO NOTHING
-                        RETURNING id
-                    """, (
-                        article.headline,
-                        article.summary,
-                        article.source,
-                        article.url,
-                        article.published_at,
-                        article.sentiment,
-                        article.impact_score
-                    ))
-                    
-                    result = cur.fetchone()
-                    if result:
-                        article_id = result[0]
-                        
-                        # Insert stock relevance
-                        for stock in article.relevant_stocks:
-                            cur.execute("""
-                                INSERT INTO news_stock_relevance (news_id, stock_symbol, relevance_score)
-                                VALUES (%s, %s, %s)
-                                ON CONFLICT DO NOTHING
-                            """, (article_id, stock, 0.8))
-                        
-                        saved_count += 1
-                        
-                except Exception as e:
-                    logger.error(f"Error saving article to database: {e}")
-                    conn.rollback()
-                    continue
-            
-            conn.commit()
-            cur.close()
-            conn.close()
-            
+            inserted = self._save_articles(articles)
+            saved_count = len(inserted)
+            # The caller recorded the articles when it scraped them
+            if self.article_index is not None:
+                self.article_index.set_news_ids(inserted)
         except Exception as e:
             logger.error(f"Database error: {e}")
             
         logger.info(f"Saved {saved_count} articles to database")
         return saved_count
 
-    def scrape_all_sources(self) -> List[NewsArticle]:
-        """Scrape news from all sources"""
+    def _write_batch(self, articles: List[NewsArticle]) -> List[tuple]:
+        """One background writer batch, returning (news_id, article) for new rows.
+        Raises on failure; the writer logs and drops the batch"""
+        inserted = self._save_articles(articles)
+        # Links articles indexed before they were queued, as in a replay; pages saved by
+        # iter_unique_pages are only indexed afterwards and linked by _page_done
+        if self.article_index is not None:
+            self.article_index.set_news_ids(inserted)
+        return inserted
+
+    def save_in_background(self, articles: List[NewsArticle]) -> Future:
+        """Queue articles for the background database writer. Returns at once unless its queue is full.
+
+        The returned future's result is a list of the (news_id, article) lists of
+        the batches that held the articles; it fails if they could not be written.
+        """
+        if not self.database_url or not articles:
+            future = Future()
+            future.set_result([])
+            return future
+        if self.db_writer is None:
+            self.db_writer = BackgroundWriter(self._write_batch, batch_size=self.db_batch_size,
+                                              max_delay=self.db_flush_interval, max_pending=self.db_queue_size,
+                                              metrics=self.metrics)
+        return self.db_writer.write_many(articles)
+
+    def flush_writes(self) -> int:
+        """Wait until every queued article is written. Returns the rows written in the background so far"""
+        if self.db_writer is None:
+            return 0
+        self.db_writer.flush()
+        return self.db_writer.written
+
+    def scrape_all_sources(self, concurrent: Optional[bool] = None,
+                           source_keys: Optional[List[str]] = None) -> List[NewsArticle]:
+        """Scrape news from all sources (or just `source_keys`)"""
+        concurrent = self.concurrent if concurrent is None else concurrent
+        source_keys = source_keys or list(self.sources)
+        started = time.perf_counter()
         all_articles = []
-        
-        # Scrape from all sources
-        sources = [
-            self.scrape_moneycontrol,
-            self.scrape_economic_times,
-            self.scrape_business_standard
-        ]
-        
-        for scrape_func in sources:
-            try:
-                articles = scrape_func()
-                all_articles.extend(articles)
-            except Exception as e:
-                logger.error(f"Error in {scrape_func.__name__}: {e}")
-                continue
+
+        if concurrent:
+            all_articles = self._scrape_concurrently(source_keys)
+        else:
+            for source_key in source_keys:
+                try:
+                    all_articles.extend(self._scrape_source(source_key))
+                except Exception as e:
+                    logger.error(f"Error scraping {source_key}: {e}")
+                    continue
         
         # Remove duplicates based on headline similarity
         unique_articles = self._remove_duplicates(all_articles)
+        self._enrich_with_bodies(unique_articles)
+
+        self._mark_dropped(all_articles, unique_articles)
         
         # Sort by impact score and recency
         unique_articles.sort(key=lambda x: (x.impact_score, x.published_at), reverse=True)
+        self._record(unique_articles)
+        # The caller saves the returned batch itself
+        for url in list(self._unsaved_pages):
+            self._page_done(url, saved=True)
         
+        self.metrics.observe('cycle_seconds', time.perf_counter() - started)
         logger.info(f"Total unique articles scraped: {len(unique_articles)}")
         return unique_articles
 
-    def _remove_duplicates(self, articles: List[NewsArticle]) -> List[NewsArticle]:
-        """Remove duplicate articles based on headline similarity"""
-        seen_headlines = set()
-        unique_articles = []
-        
-        for article in articles:
-            # Create a normalized version of the headline for comparison
-            normalized = re.sub(r'[^a-zA-Z0-9\s]', '', article.headline.lower())
-            normalized = ' '.join(normalized.split()[:10])  # First 10 words
-            
-            if normalized not in seen_headlines:
-                seen_headlines.add(normalized)
-                unique_articles.append(article)
-        
-        return unique_articles
+    def _scrape_concurrently(self, source_keys: List[str]) -> List[NewsArticle]:
+        """Fetch every listing URL of the given sources at once, rate limited per host"""
+        jobs = [(key, url) for key in source_keys for url in self.sources[key]['urls']]
+        logger.info(f"Scraping {len(jobs)} listing pages from {len(source_keys)} sources concurrently...")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._fetch_and_parse, key, url) for key, url in jobs]
+
+            # Collect in submission order so output stays deterministic
+            all_articles = []
+            per_source: Dict[str, int] = {}
+            for (key, url), future in zip(jobs, futures):
+                name = self.sources[key]['name']
+                try:
+                    articles = future.result()
+                except Exception as e:
+                    logger.error(f"Error scraping {name} URL {url}: {e}")
+                    continue
+                all_articles.extend(articles)
+                per_source[name] = per_source.get(name, 0) + len(articles)
+
+        for name, count in per_source.items():
+            logger.info(f"Scraped {count} articles from {name}")
+        return all_articles
+
+    def _iter_pages(self, source_keys: Optional[List[str]] = None) -> Iterator[Tuple[str, List[NewsArticle]]]:
+        """(url, articles) of each listing page as soon as that page is parsed"""
+        source_keys = source_keys or list(self.sources)
+        jobs = [(key, url) for key in source_keys for url in self.sources[key]['urls']]
+        if not self.concurrent:
+            for key, url in jobs:
+                try:
+                    articles = self._fetch_and_parse(key, url)
+                except Exception as e:
+                    logger.error(f"Error scraping {self.sources[key]['name']} URL {url}: {e}")
+                    continue
+                yield url, articles
+            return
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {executor.submit(self._fetch_and_parse, key, url): (key, url) for key, url in jobs}
+            for future in as_completed(futures):
+                key, url = futures[future]
+                try:
+                    articles = future.result()
+                except Exception as e:
+                    logger.error(f"Error scraping {self.sources[key]['name']} URL {url}: {e}")
+                    continue
+                yield url, articles
+
+    def iter_unique_pages(self, source_keys: Optional[List[str]] = None,
+                          save: bool = False) -> Iterator[List[NewsArticle]]:
+        """Yield the unique articles of each listing page as pages arrive.
+
+        Each page is deduplicated against everything yielded before it, so
+        the first copy of a story to arrive is the one kept. Body enrichment
+        shares one body_budget across all pages of the call. With `save` each
+        page is also queued for the background database writer, and its HTTP
+        cache validators are only stored once it has been written; otherwise
+        they are stored when the caller asks for the next page.
+        """
+        writes: Dict[str, Tuple[Future, List[NewsArticle]]] = {}
+        body_deadline = time.monotonic() + self.body_budget
+        for url, page in self._iter_pages(source_keys):
+            articles = self._remove_duplicates(page)
+            self._mark_dropped(page, articles)
+            self._enrich_with_bodies(articles, max(0.0, body_deadline - time.monotonic()))
+            if save:
+                writes[url] = (self.save_in_background(articles), articles)
+            else:
+                self._record(articles)
+            yield articles
+            if not save:
+                self._page_done(url, saved=True)
+            for written in [key for key, (future, _) in writes.items() if future.done()]:
+                self._settle_write(written, *writes.pop(written))
+        if writes:
+            self.flush_writes()
+            for url, (future, articles) in writes.items():
+                self._settle_write(url, future, articles)
+
+    def _save_cycle(self, source_keys: Optional[List[str]] = None) -> List[NewsArticle]:
+        """Scrape all sources (or just `source_keys`), deduplicate the whole cycle at once so that each
+        story keeps its highest-impact copy, then save each page's unique articles in the background.
+        Returns once everything is written"""
+        pages = list(self._iter_pages(source_keys))
+        everything = [article for _, page in pages for article in page]
+        unique = self._remove_duplicates(everything)
+        self._mark_dropped(everything, unique)
+        self._enrich_with_bodies(unique)
+
+        kept = {id(article) for article in unique}
+        writes = {}
+        for url, page in pages:
+            articles = [article for article in page if id(article) in kept]
+            writes[url] = (self.save_in_background(articles), articles)
+        self.flush_writes()
+        for url, (future, articles) in writes.items():
+            self._settle_write(url, future, articles)
+        return unique
+
+    def _mark_dropped(self, articles: List[NewsArticle], unique: List[NewsArticle]):
+        """Dropped duplicates are covered by the article that was kept, so don't score them again"""
+        if self.seen_urls is not None and len(unique) < len(articles):
+            kept_urls = {article.url for article in unique}
+            self.seen_urls.add(article.url for article in articles if article.url not in kept_urls)
+
+    def _settle_write(self, url: str, future: Future, articles: List[NewsArticle]):
+        """Settle a page queued by save_in_background once its write is done"""
+        if future.exception() is not None:
+            self._page_done(url, False, articles)
+            return
+        inserted = [pair for batch in future.result() for pair in batch]
+        self._page_done(url, True, articles, inserted)
+
+    def _page_done(self, url: str, saved: bool, articles: Optional[List[NewsArticle]] = None,
+                   inserted: Sequence[tuple] = ()):
+        """Settle a page once its unique `articles` are saved or have failed to save.
+
+        A saved page's articles are recorded, linked to their database ids
+        from the (news_id, article) pairs in `inserted`, and its HTTP cache
+        validators stored. Otherwise its stories are withdrawn from the dedup
+        index and its validators dropped, so the page is fetched, parsed and
+        kept again on the next poll or retry.
+        """
+        validators = self._unsaved_pages.pop(url, None)
+        if saved:
+            if articles is not None:
+                self._record(articles)
+                if self.article_index is not None and inserted:
+                    urls = {article.url for article in articles}
+                    self.article_index.set_news_ids(pair for pair in inserted if pair[1].url in urls)
+            if validators is not None:
+                self.http_cache.store(validators)
+            return
+        if articles:
+            self.dedup_index.withdraw(articles)
+        if articles or validators is not None:
+            logger.warning(f"Articles from {url} were not saved; the page is scraped again")
+
+    def scrape_and_save(self, source_keys: Optional[List[str]] = None, pipelined: bool = True) -> List[NewsArticle]:
+        """Scrape all sources (or just `source_keys`) and save their unique articles.
+
+        Pipelined, each page's unique articles are saved in the background
+        while later pages are still being fetched and parsed. Pages are then
+        deduplicated as they arrive, as in iter_unique_pages, so the first copy
+        of a story is kept. Otherwise the cycle is deduplicated as a whole
+        before anything is written, and each story keeps its highest-impact copy.
+
+        Returns once everything is written, with the articles sorted by impact
+        score and recency.
+        """
+        started = time.perf_counter()
+        written = self.flush_writes()
+        if pipelined:
+            articles = [article for page in self.iter_unique_pages(source_keys, save=True) for article in page]
+        else:
+            articles = self._save_cycle(source_keys)
+        saved = self.flush_writes() - written
+
+        articles.sort(key=lambda x: (x.impact_score, x.published_at), reverse=True)
+        self.metrics.observe('cycle_seconds', time.perf_counter() - started)
+        logger.info(f"Total unique articles scraped: {len(articles)}")
+        if self.database_url:
+            logger.info(f"Saved {saved} new articles to database")
+        return articles
+
+    def replay(self, archive: PageArchive, since: Optional[datetime] = None, until: Optional[datetime] = None,
+               source_keys: Optional[List[str]] = None, batch_size: int = 1000) -> Iterator[List[NewsArticle]]:
+        """Re-run archived listing pages through parsing, scoring and dedup, without the network.
+
+        Pages are parsed in the parse workers when there are any, with relative
+        times resolved against the time each page was fetched. Every article URL
+        is scored once, from its earliest capture, and the dedup window follows
+        the fetch times rather than the clock. Yields batches of unique articles.
+        """
+        source_keys = [key for key in source_keys or self.sources if key in self.sources]
+        keys = deque()
+
+        def jobs():
+            for page in archive.pages(since, until, source_keys):
+                parts = urlsplit(page.url)
+                keys.append((page.source_key, page.fetched_at.timestamp()))
+                self.metrics.inc('replay_pages_total', source=page.source_key)
+                self.metrics.inc('replay_bytes_total', len(page.content), source=page.source_key)
+                yield page.source_key, f"{parts.scheme}://{parts.netloc}", page.content, page.fetched_at
+
+        seen = set()
+        batch = []
+        for items in self.listing_parser.parse_many(jobs()):
+            source_key, fetched_at = keys.popleft()
+            fresh = []
+            for item in items:
+                key = url_key(item[2])
+                if key not in seen:
+                    seen.add(key)
+                    fresh.append(item)
+            self.metrics.inc('items_parsed_total', len(items), source=source_key)
+            with self.metrics.timer('score_seconds', source=source_key):
+                batch.extend(self._build_articles(self.sources[source_key]['name'], fresh))
+            if len(batch) >= batch_size:
+                unique = self._remove_duplicates(batch, now=fetched_at)
+                self._record(unique)
+                yield unique
+                batch = []
+        if batch:
+            unique = self._remove_duplicates(batch, now=fetched_at)
+            self._record(unique)
+            yield unique
+
+    def run_daemon(self, intervals: Dict[str, float], stop_event: Optional[threading.Event] = None):
+        """Poll each source on its own interval (seconds) until `stop_event` is set.
+
+        Each poll's pages are written as they arrive (see scrape_and_save).
+        Only articles at URLs not seen before are scored and written, so the
+        steady-state cost of a poll scales with the number of new articles.
+        """
+        stop_event = stop_event or threading.Event()
+        next_run = {key: 0.0 for key in intervals}
+        logger.info(f"Daemon started, polling {', '.join(f'{key} every {intervals[key]:g}s' for key in intervals)}")
+
+        while not stop_event.is_set():
+            now = time.monotonic()
+            due = [key for key, at in next_run.items() if at <= now]
+            if due:
+                for key in due:
+                    next_run[key] = now + intervals[key]
+
+                # Pages are written while the rest of the poll is still downloading
+                articles = self.scrape_and_save(source_keys=due)
+                if articles and not self.database_url and self.seen_urls is not None:
+                    self.seen_urls.add(article.url for article in articles)
+
+                self.rollup.prune(datetime.now() - ROLLUP_WINDOW)
+                self.export_metrics()
+
+            stop_event.wait(max(0.0, min(next_run.values()) - time.monotonic()))
+
+        logger.info("Daemon stopped")
+
+    def run_worker(self, queue: ScrapeJobQueue, stop_event: Optional[threading.Event] = None,
+                   max_idle: float = 30.0):
+        """Scrape listing URLs claimed from the shared scrape_jobs queue until `stop_event` is set.
+
+        Up to max_workers jobs of this scraper's sources run at a time; a slot
+        is refilled from the queue as soon as its job finishes. A job is only
+        marked done once its page's articles are committed; until then they
+        count neither in the rollups nor as seen by dedup and the HTTP cache,
+        so a job whose save failed is retried in full. A job whose worker
+        died runs again once its lease expires. Jobs already claimed are
+        finished before the worker stops.
+        """
+        stop_event = stop_event or threading.Event()
+        source_keys = list(self.sources)
+        in_flight: Dict[Future, ScrapeJob] = {}
+        next_claim = 0.0
+        logger.info(f"Worker {queue.worker_id} started for {', '.join(source_keys)}")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while in_flight or not stop_event.is_set():
+                claiming = not stop_event.is_set() and len(in_flight) < self.max_workers
+                if claiming and time.monotonic() >= next_claim:
+                    try:
+                        jobs = queue.claim(source_keys, self.max_workers - len(in_flight))
+                        if not jobs:
+                            due = queue.seconds_until_due(source_keys)
+                            next_claim = time.monotonic() + min(max_idle, max(0.5, max_idle if due is None else due))
+                    except Exception as e:
+                        logger.error(f"Job queue error: {e}")
+                        jobs, next_claim = [], time.monotonic() + min(max_idle, 5.0)
+                    for job in jobs:
+                        in_flight[executor.submit(self._fetch_and_parse, job.source_key, job.url)] = job
+                    self.metrics.inc('scrape_jobs_claimed_total', len(jobs))
+
+                if not in_flight:
+                    stop_event.wait(max(0.0, next_claim - time.monotonic()))
+                    continue
+                # Wake up for the next claim while slots are free; otherwise for a finished job
+                timeout = max(0.0, next_claim - time.monotonic()) if claiming else None
+                done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                # The jobs finished in one round share one body budget, so enrichment can't hold up
+                # claiming for longer than that, nor outlast the leases
+                body_deadline = time.monotonic() + self.body_budget
+                for future in done:
+                    self._finish_job(queue, in_flight.pop(future), future,
+                                     max(0.0, body_deadline - time.monotonic()))
+                if done:
+                    self.rollup.prune(datetime.now() - ROLLUP_WINDOW)
+                    self.export_metrics()
+
+        logger.info(f"Worker {queue.worker_id} stopped")
+
+    def _finish_job(self, queue: ScrapeJobQueue, job: ScrapeJob, future: Future,
+                    body_budget: Optional[float] = None):
+        """Dedup, save and record a claimed page, then release its job (for a retry if anything failed).
+        Article bodies are waited for at most `body_budget` seconds (default: body_budget)"""
+        name = self.sources[job.source_key]['name']
+        error = None
+        articles, inserted = [], []
+        try:
+            articles = self._remove_duplicates(future.result())
+            self._enrich_with_bodies(articles, body_budget)
+            if articles:
+                inserted = self._save_articles(articles)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+            logger.error(f"Error scraping {name} URL {job.url}: {error}")
+        saved = len(inserted)
+        self._page_done(job.url, error is None, articles, inserted)
+        self.metrics.inc('scrape_jobs_total', source=job.source_key, status='error' if error else 'ok')
+
+        try:
+            released = queue.fail(job, error) if error else queue.complete(job, saved)
+        except Exception as e:
+            logger.error(f"Could not release job {job.url}, it runs again once its lease expires: {e}")
+            return
+        if not released:
+            logger.warning(f"Lease on {job.url} expired before the job finished; another worker has it")
+        elif not error:
+            logger.info(f"Saved {saved} new articles from {job.url}")
+
+    def _record(self, articles: List[NewsArticle]):
+        """Add articles to the sentiment rollup and the local symbol index"""
+        self.rollup.extend(articles)
+        if self.article_index is not None and articles:
+            with self.metrics.timer('index_seconds'):
+                self.article_index.add(articles)
+
+    def metrics_report(self) -> dict:
+        """Structured stats of everything instrumented so far"""
+        return self.metrics.snapshot(METRIC_RATES)
+
+    def export_metrics(self):
+        """Write the metrics files configured on `self.metrics`, if any"""
+        self.metrics.export(METRIC_RATES)
+
+    def _remove_duplicates(self, articles: List[NewsArticle], now: Optional[float] = None) -> List[NewsArticle]:
+        """Remove near-duplicate articles, keeping the highest-impact copy of each story.
+        `now` is when they were seen, in epoch seconds, if not just now"""
+        with self.metrics.timer('dedup_seconds'):
+            unique = self.dedup_index.deduplicate(articles, now)
+        self.metrics.inc('dedup_input_total', len(articles))
+        self.metrics.inc('dedup_dropped_total', len(articles) - len(unique))
+        return unique
 
     def save_to_json(self, articles: List[NewsArticle], filename: str = 'scraped_news.json'):
         """Save articles to JSON file"""
         try:
-            data = []
-            for article in articles:
-                data.append({
-                    'headline': article.headline,
-                    'summary': article.summary,
-                    'source': article.source,
-                    'url': article.url,
-                    'published_at': article.published_at.isoformat(),
-                    'sentiment': article.sentiment,
-                    'relevant_stocks': article.relevant_stocks,
-                    'impact_score': article.impact_score
-                })
+            data = [article_to_dict(article) for article in articles]
             
             with open(filename, 'w', encoding='utf-8') as f:
                 json.dump(data, f, indent=2, ensure_ascii=False)
@@ -485,48 +1050,380 @@ class IndianStockNewsScraper:
         except Exception as e:
             logger.error(f"Error saving to JSON: {e}")
 
-def main():
-    """Main function to run the scraper"""
-    scraper = IndianStockNewsScraper()
-    
-    logger.info("Starting news scraping process...")
+def print_cache_stats(scraper: IndianStockNewsScraper):
+    """Print this run's HTTP cache statistics"""
+    if scraper.http_cache:
+        stats = scraper.http_cache.stats
+        print(f"HTTP cache: {stats['hits']} hits ({stats['not_modified']} not modified, "
+              f"{stats['unchanged']} unchanged), {stats['misses']} misses, "
+              f"{stats['bytes_saved'] / 1024:.1f} KB saved")
+
+def print_rollup_summary(rollup: SentimentRollup):
+    """Sentiment breakdown and most mentioned stocks, read from the rollup totals"""
+    market = rollup.summary()
+    print(f"Sentiment breakdown: {market['positive']} positive, {market['negative']} negative, "
+          f"{market['neutral']} neutral (mean impact {market['mean_impact']:.2f})")
+    top_stocks = rollup.top_symbols(5)
+    if top_stocks:
+        print(f"Top mentioned stocks: {', '.join(f'{stock}({count})' for stock, count in top_stocks)}")
+
+def print_stage_timings(scraper: IndianStockNewsScraper):
+    """Print where this run's time went, when metrics are enabled"""
+    metrics = scraper.metrics
+    if not metrics.enabled:
+        return
+    seconds = {stage: metrics.total_seconds(f'{stage}_seconds')
+               for stage in ('rate_limit_wait', 'fetch', 'parse', 'score', 'dedup', 'db_write', 'db_backpressure')}
+    print(f"Stage seconds: {', '.join(f'{stage} {value:.2f}' for stage, value in seconds.items())}")
+    print(f"Fetched {metrics.total('fetch_bytes_total') / 1024:.1f} KB, parsed {metrics.total('items_parsed_total'):g} items, "
+          f"kept {metrics.total('items_kept_total'):g}, dropped {metrics.total('dedup_dropped_total'):g} duplicates, "
+          f"wrote {metrics.total('db_rows_total'):g} rows")
+
+def parse_time_bound(text: str) -> datetime:
+    """An age such as 45m, 24h, 7d or 2w before now, or an ISO 8601 date/time"""
+    units = {'m': 60, 'h': 3600, 'd': 86400, 'w': 604800}
+    unit = text[-1:].lower()
+    if unit in units and text[:-1].replace('.', '', 1).isdigit():
+        return datetime.fromtimestamp(time.time() - float(text[:-1]) * units[unit])
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected an age like 24h or an ISO date, got {text!r}")
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Command line options. Without a COMMAND the scraper runs `scrape` (or `daemon`/`stream` with those flags)"""
+    parser = argparse.ArgumentParser(description='Scrape Indian stock market news')
+    parser.add_argument('--daemon', action='store_true',
+                        help='keep running and poll each source on its own interval (same as the daemon command)')
+    parser.add_argument('--interval', type=float, default=300,
+                        help='default seconds between polls of a source in daemon mode (default: 300)')
+    parser.add_argument('--source-interval', action='append', default=[], metavar='SOURCE=SECONDS',
+                        help=f"poll interval for one source, e.g. moneycontrol=120 ({', '.join(SOURCES)})")
+    parser.add_argument('--stream', action='store_true',
+                        help='stream articles to a JSON Lines file and the database as pages arrive '
+                             '(same as the stream command)')
+    parser.add_argument('--output', help='output file (default: scraped_news.json, or scraped_news.jsonl with --stream '
+                                         'or --format jsonl)')
+    parser.add_argument('--gzip', action='store_true', help='gzip JSON Lines output')
+    parser.add_argument('--no-db', action='store_true',
+                        help='do not write to the database even when DATABASE_URL is set')
+    parser.add_argument('--db-queue-size', type=int, default=5000, metavar='N',
+                        help='articles that may wait for the background database writer before scraping pauses '
+                             '(default: 5000)')
+    parser.add_argument('--db-flush-interval', type=float, default=0.5, metavar='SECONDS',
+                        help='longest an article waits before the writer commits a partial batch (default: 0.5)')
+    parser.add_argument('--top', type=int, default=10, help='number of top-impact articles to print in --stream mode')
+    parser.add_argument('--parser', choices=PARSERS, default=DEFAULT_PARSER,
+                        help=f'HTML parser for listing pages (default: {DEFAULT_PARSER})')
+    parser.add_argument('--parse-workers', type=int, metavar='N',
+                        help='parse listing pages in N worker processes (default: 0, parse in the fetch threads; '
+                             'replay uses one per CPU)')
+    parser.add_argument('--full-parse', action='store_true',
+                        help='download and parse whole listing pages instead of just their items')
+    parser.add_argument('--fetch-bodies', action='store_true',
+                        help='also fetch article pages and re-score articles with their body text')
+    parser.add_argument('--body-budget', type=float, default=30.0, metavar='SECONDS',
+                        help='longest a cycle waits for article bodies with --fetch-bodies (default: 30)')
+    parser.add_argument('--metrics-json', metavar='PATH',
+                        help='write a JSON report of per-stage timings and counters (after every poll in --daemon mode)')
+    parser.add_argument('--metrics-file', metavar='PATH',
+                        help='write metrics in the Prometheus text format, e.g. for the node_exporter textfile collector')
+    parser.add_argument('--metrics-port', type=int, metavar='PORT',
+                        help='serve /metrics and /stats.json on 127.0.0.1:PORT')
+    parser.add_argument('--max-retries', type=int, default=2, metavar='N',
+                        help='retries of a listing fetch after a 429, 5xx, timeout or connection error (default: 2)')
+    parser.add_argument('--circuit-cooldown', type=float, default=30.0, metavar='SECONDS',
+                        help='how long a host is skipped after repeated failures, doubling while it keeps failing '
+                             '(default: 30)')
+    parser.add_argument('--archive', action='store_true',
+                        help='archive every changed listing page, read in full and compressed, for later `replay` runs')
+    parser.add_argument('--archive-dir', metavar='DIR',
+                        help='page archive location (default: archive/ in the cache directory); implies --archive')
+    parser.add_argument('--no-index', action='store_true',
+                        help='do not add scraped articles to the local symbol index used by `query`')
+
+    parser.set_defaults(sources=[], output_format='json')
+
+    commands = parser.add_subparsers(dest='command', metavar='COMMAND')
+    # scrape, stream, daemon and worker can be limited to some sources, e.g. for a cron job per source
+    selection = argparse.ArgumentParser(add_help=False)
+    selection.add_argument('sources', nargs='*', metavar='SOURCE',
+                           help=f"sources to scrape (default: all of {', '.join(SOURCES)})")
+    scrape = commands.add_parser('scrape', parents=[selection],
+                                 help='scrape once, write the articles to a file and save them (the default)')
+    scrape.add_argument('--format', choices=('json', 'jsonl'), default='json', dest='output_format',
+                        help='json writes one array (default); jsonl appends one article per line')
+    commands.add_parser('stream', parents=[selection], help='same as --stream')
+    commands.add_parser('daemon', parents=[selection], help='same as --daemon')
+    worker = commands.add_parser('worker', parents=[selection],
+                                 help='scrape listing URLs claimed from the shared scrape_jobs table, alongside '
+                                      'other workers (polls at --interval/--source-interval)')
+    worker.add_argument('--lease', type=float, default=300.0, metavar='SECONDS',
+                        help='how long a claimed job is reserved; jobs of a worker that died are picked up '
+                             'again after this (default: 300)')
+    worker.add_argument('--worker-id', help='name recorded on claimed jobs (default: HOSTNAME:PID)')
+
+    query = commands.add_parser('query', help='latest indexed articles for stock symbols or headline terms')
+    query.add_argument('symbols', nargs='*', metavar='SYMBOL', help='stock symbols, e.g. INFY TCS')
+    query.add_argument('--text', help='headline full-text search, e.g. "results OR profit"')
+    query.add_argument('--since', type=parse_time_bound, metavar='WHEN',
+                       help='only articles published after WHEN: an age like 30m, 24h or 7d, or an ISO date')
+    query.add_argument('--until', type=parse_time_bound, metavar='WHEN',
+                       help='only articles published before WHEN (same format as --since)')
+    query.add_argument('--limit', type=int, default=20, help='number of articles to show (default: 20)')
+    query.add_argument('--all', action='store_true', dest='match_all',
+                       help='only articles that mention every symbol (default: any of them)')
+    query.add_argument('--json', action='store_true', help='print the results as JSON')
+
+    replay = commands.add_parser('replay', help='re-run archived listing pages through parsing, scoring and saving, '
+                                                'without the network')
+    replay.add_argument('--since', type=parse_time_bound, metavar='WHEN',
+                        help='only pages fetched after WHEN: an age like 30d, or an ISO date')
+    replay.add_argument('--until', type=parse_time_bound, metavar='WHEN',
+                        help='only pages fetched before WHEN (same format as --since)')
+    replay.add_argument('--source', action='append', choices=list(SOURCES), dest='replay_sources',
+                        help='only pages of this source (repeatable)')
+    replay.add_argument('--batch-size', type=int, default=1000,
+                        help='articles per dedup and database batch (default: 1000)')
+    args = parser.parse_args(argv)
+    if args.command is None:
+        args.command = 'daemon' if args.daemon else 'stream' if args.stream else 'scrape'
+    if args.command == 'query' and not args.symbols and not args.text:
+        parser.error('query needs at least one SYMBOL or --text')
+    for key in args.sources:
+        if key not in SOURCES:
+            parser.error(f"unknown source {key!r}, expected one of {', '.join(SOURCES)}")
+
+    args.intervals = {key: args.interval for key in args.sources or SOURCES}
+    for item in args.source_interval:
+        key, _, seconds = item.partition('=')
+        if key not in SOURCES or not seconds:
+            parser.error(f"invalid --source-interval {item!r}")
+        if key in args.intervals:
+            args.intervals[key] = float(seconds)
+    return args
+
+def archive_path(args: argparse.Namespace) -> Optional[str]:
+    """The page archive directory selected on the command line, if archiving is on"""
+    if args.archive_dir:
+        return args.archive_dir
+    if args.archive or args.command == 'replay':
+        return os.path.join(os.getenv('SCRAPER_CACHE_DIR') or DEFAULT_CACHE_DIR, 'archive')
+    return None
+
+def build_scraper(args: argparse.Namespace, **options) -> IndianStockNewsScraper:
+    """A scraper configured from the command line, with metrics when any metrics output is requested.
+
+    `options` override the settings taken from `args`.
+    """
+    metrics = None
+    # Replays always collect metrics; their summary reports pages per second
+    if args.metrics_json or args.metrics_file or args.metrics_port or args.command == 'replay':
+        metrics = Metrics(json_path=args.metrics_json, prometheus_path=args.metrics_file)
+        if args.metrics_port:
+            metrics.serve(args.metrics_port, rates=METRIC_RATES)
+            logger.info(f"Serving metrics on http://127.0.0.1:{args.metrics_port}/metrics")
+    settings = dict(parser=args.parser, parse_workers=args.parse_workers or 0,
+                    targeted=not args.full_parse, metrics=metrics,
+                    fetch_bodies=args.fetch_bodies, body_budget=args.body_budget,
+                    index_articles=not args.no_index, max_retries=args.max_retries,
+                    circuit_cooldown=args.circuit_cooldown, archive_dir=archive_path(args),
+                    use_database=not args.no_db, db_queue_size=args.db_queue_size,
+                    db_flush_interval=args.db_flush_interval)
+    if args.sources:
+        settings['sources'] = {key: SOURCES[key] for key in args.sources}
+    settings.update(options)
+    return IndianStockNewsScraper(**settings)
+
+def run_query(args: argparse.Namespace):
+    """Print the latest indexed articles for symbols and/or headline terms"""
+    cache_dir = os.getenv('SCRAPER_CACHE_DIR') or DEFAULT_CACHE_DIR
+    path = os.path.join(cache_dir, ARTICLE_INDEX_FILE)
+    if not os.path.exists(path):
+        print(f"No article index at {path} yet; run a scrape first")
+        return
+    index = ArticleIndex(path)
+    try:
+        started = time.perf_counter()
+        try:
+            results = index.query(args.symbols, text=args.text, since=args.since, until=args.until,
+                                  limit=args.limit, match_all=args.match_all)
+        except (ValueError, sqlite3.OperationalError) as e:
+            print(f"Invalid query: {e}")
+            return
+        elapsed = time.perf_counter() - started
+    finally:
+        index.close()
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return
+    for article in results:
+        stocks = ','.join(article['relevant_stocks'])
+        print(f"{article['published_at'][:16]}  {article['sentiment']:<8} {article['impact_score']:.2f}  "
+              f"[{article['source']}] {article['headline']}" + (f"  ({stocks})" if stocks else ''))
+        print(f"    {article['url']}")
+    print(f"{len(results)} articles in {elapsed * 1000:.1f} ms")
+
+def run_stream(args: argparse.Namespace):
+    """Scrape in streaming mode: articles flow to JSON Lines and the database page by page"""
+    scraper = build_scraper(args)
+    output = args.output or ('scraped_news.jsonl.gz' if args.gzip else 'scraped_news.jsonl')
+    top = TopN(args.top, key=lambda a: (a.impact_score, a.published_at))
+
+    logger.info(f"Streaming articles to {output}...")
+    try:
+        with JsonLinesSink(output, compress=args.gzip) as sink:
+            for page in scraper.iter_unique_pages(save=True):
+                for article in page:
+                    sink.write(article)
+                    top.push(article)
+    finally:
+        # Waits for the database writer to drain
+        scraper.close()
+        scraper.export_metrics()
+
+    print("\n=== SCRAPING SUMMARY ===")
+    print(f"Total articles streamed: {scraper.rollup.summary()['articles']} (appended to {output})")
+    print_rollup_summary(scraper.rollup)
+    for article in top.items():
+        print(f"  {article.impact_score:.2f}  [{article.source}] {article.headline}")
+    print_cache_stats(scraper)
+    print_stage_timings(scraper)
+    print("=== END SUMMARY ===\n")
+
+def run_replay(args: argparse.Namespace):
+    """Re-process archived pages: JSON Lines output, and the database when one is configured"""
+    path = archive_path(args)
+    if not os.path.exists(os.path.join(path, 'index.sqlite3')):
+        print(f"No page archive at {path}; scrape with --archive first")
+        return
+    workers = args.parse_workers
+    if workers is None:
+        workers = os.cpu_count() if (os.cpu_count() or 1) > 1 else 0
+    # Replays read the archive; they don't write to it or fetch article bodies
+    scraper = build_scraper(args, parse_workers=workers, archive_dir=None, fetch_bodies=False, http_cache=False)
+    archive = PageArchive(path)
+    output = args.output or ('replayed_news.jsonl.gz' if args.gzip else 'replayed_news.jsonl')
+    top = TopN(args.top, key=lambda a: (a.impact_score, a.published_at))
+
+    started = time.perf_counter()
+    logger.info(f"Replaying {len(archive)} archived pages to {output} with {workers} parse workers...")
+    try:
+        with JsonLinesSink(output, compress=args.gzip) as sink:
+            for batch in scraper.replay(archive, args.since, args.until, args.replay_sources, args.batch_size):
+                # Written while the next batch is parsed
+                scraper.save_in_background(batch)
+                for article in batch:
+                    sink.write(article)
+                    top.push(article)
+        saved = scraper.flush_writes()
+    finally:
+        archive.close()
+        scraper.close()
+        scraper.export_metrics()
+    elapsed = time.perf_counter() - started
+
+    pages = scraper.metrics.total('replay_pages_total')
+    print("\n=== REPLAY SUMMARY ===")
+    print(f"Replayed {scraper.rollup.summary()['articles']} unique articles in {elapsed:.1f}s"
+          + (f" from {pages:,.0f} pages ({pages / elapsed:,.0f} pages/s)" if pages else '')
+          + f" (appended to {output})")
+    if scraper.database_url:
+        print(f"New articles saved to the database: {saved}")
+    print_rollup_summary(scraper.rollup)
+    for article in top.items():
+        print(f"  {article.impact_score:.2f}  [{article.source}] {article.headline}")
+    print("=== END SUMMARY ===\n")
+
+def run_daemon(args: argparse.Namespace):
+    """Run the scraper as a long-lived poller until SIGINT/SIGTERM"""
+    scraper = build_scraper(args, track_seen=True, db_pool_size=2)
+    stop_event = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop_event.set())
+    try:
+        scraper.run_daemon(args.intervals, stop_event)
+    finally:
+        scraper.close()
+
+def run_scrape(args: argparse.Namespace):
+    """Scrape once; pages are saved to the database (when configured) as they arrive, then to a file"""
+    scraper = build_scraper(args)
+    try:
+        logger.info("Starting news scraping process...")
     
-    # Scrape all sources
-    articles = scraper.scrape_all_sources()
+        # Scrape all sources; the cycle is deduplicated as a whole, so each story keeps its best copy
+        articles = scraper.scrape_and_save(pipelined=False)
     
-    if articles:
-        # Save to JSON file
-        scraper.save_to_json(articles)
+        if articles:
+            # Save to a JSON (or JSON Lines) file
+            if args.output_format == 'jsonl':
+                output = args.output or ('scraped_news.jsonl.gz' if args.gzip else 'scraped_news.jsonl')
+                with JsonLinesSink(output, compress=args.gzip) as sink:
+                    for article in articles:
+                        sink.write(article)
+                logger.info(f"Appended {len(articles)} articles to {output}")
+            else:
+                scraper.save_to_json(articles, args.output or 'scraped_news.json')
         
-        # Save to database if URL is provided
-        scraper.save_to_database(articles)
+            # Print summary
+            print("\n=== SCRAPING SUMMARY ===")
+            print(f"Total articles scraped: {len(articles)}")
+            print(f"Sources: {', '.join(source['name'] for source in scraper.sources.values())}")
         
-        # Print summary
-        print(f"\n=== SCRAPING SUMMARY ===")
-        print(f"Total articles scraped: {len(articles)}")
-        print(f"Sources: Moneycontrol, Economic Times, Business Standard")
-        
-        # Sentiment breakdown
-        positive = len([a for a in articles if a.sentiment == 'positive'])
-        negative = len([a for a in articles if a.sentiment == 'negative'])
-        neutral = len([a for a in articles if a.sentiment == 'neutral'])
-        
-        print(f"Sentiment breakdown: {positive} positive, {negative} negative, {neutral} neutral")
-        
-        # Top stocks mentioned
-        stock_mentions = {}
-        for article in articles:
-            for stock in article.relevant_stocks:
-                stock_mentions[stock] = stock_mentions.get(stock, 0) + 1
+            print_rollup_summary(scraper.rollup)
+            print_cache_stats(scraper)
+            print_stage_timings(scraper)
+            print("=== END SUMMARY ===\n")
         
-        if stock_mentions:
-            top_stocks = sorted(stock_mentions.items(), key=lambda x: x[1], reverse=True)[:5]
-            print(f"Top mentioned stocks: {', '.join([f'{stock}({count})' for stock, count in top_stocks])}")
-        
-        print("=== END SUMMARY ===\n")
-        
-    else:
-        logger.warning("No articles were scraped")
+        else:
+            logger.warning("No articles were scraped")
+            print_cache_stats(scraper)
+    finally:
+        # Waits for the database writer to drain
+        scraper.close()
+    scraper.export_metrics()
+
+def run_worker(args: argparse.Namespace):
+    """Run one worker of the shared job queue until SIGINT/SIGTERM"""
+    scraper = build_scraper(args, track_seen=True, db_pool_size=2)
+    if not scraper.database_url:
+        scraper.close()
+        print("The worker needs the job queue database: set DATABASE_URL (without --no-db)")
+        return
+    queue = ScrapeJobQueue(scraper.database_url, worker_id=args.worker_id, lease_seconds=args.lease)
+    stop_event = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: stop_event.set())
+    try:
+        # Every worker registers its sources' URLs; intervals from the command line win
+        queue.sync(scraper.sources, args.intervals)
+        scraper.run_worker(queue, stop_event)
+    finally:
+        queue.close()
+        scraper.close()
+
+def main(argv: Optional[List[str]] = None):
+    """Main function to run the scraper"""
+    args = parse_args(argv)
+    if args.command == 'query':
+        run_query(args)
+        return
+    if args.command == 'replay':
+        run_replay(args)
+        return
+    if args.command == 'daemon':
+        run_daemon(args)
+        return
+    if args.command == 'stream':
+        run_stream(args)
+        return
+    if args.command == 'worker':
+        run_worker(args)
+        return
+
+    run_scrape(args)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Append-only archive of fetched listing pages, for replaying history.
+
+Pages are appended to segment files (`segment-000001.pages`, ...) as
+length-prefixed, CRC-checked, zlib-compressed records. Each record holds a
+small JSON header (URL, source, fetch time, status, selected response
+headers) followed by the body. Segments are rolled over at
+`segment_bytes` and never rewritten. An SQLite offset index
+(`index.sqlite3`) maps every page to its segment, offset and length, so a
+replay can pick a time range or a source without scanning the segments.
+
+Segments are self-describing. A crash between writing a record and indexing
+it is repaired on open: records past the indexed end of the last segment
+are indexed, and a torn trailing record is cut off.
+
+Replays memory-map the segments and decompress records straight out of the
+mapping.
+"""
+
+import json
+import logging
+import mmap
+import os
+import re
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Dict, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Payload length and CRC32 of the compressed payload
+RECORD_HEADER = struct.Struct('<II')
+
+SEGMENT_NAME = 'segment-{:06d}.pages'
+SEGMENT_PATTERN = re.compile(r'segment-(\d{6})\.pages$')
+
+# Response headers worth keeping with a page
+KEPT_HEADERS = ('Content-Type', 'Date', 'ETag', 'Last-Modified')
+
+
+class ArchivedPage(NamedTuple):
+    url: str
+    source_key: str
+    fetched_at: datetime
+    status: int
+    headers: Dict[str, str]
+    content: bytes
+
+
+def encode_record(url: str, source_key: str, fetched_at: float, status: int,
+                  headers: Mapping[str, str], content: bytes, level: int = 6) -> bytes:
+    meta = {'url': url, 'source': source_key, 'fetched_at': fetched_at, 'status': status,
+            'headers': {name: headers[name] for name in KEPT_HEADERS if name in headers}}
+    payload = zlib.compress(json.dumps(meta, separators=(',', ':')).encode('utf-8') + b'\n' + content, level)
+    return RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+
+def decode_record(payload) -> ArchivedPage:
+    """An ArchivedPage from a compressed record payload (bytes or a memoryview into a segment)"""
+    raw = zlib.decompress(payload)
+    meta_end = raw.index(b'\n')
+    meta = json.loads(raw[:meta_end])
+    return ArchivedPage(meta['url'], meta['source'], datetime.fromtimestamp(meta['fetched_at']),
+                        meta['status'], meta['headers'], raw[meta_end + 1:])
+
+
+class PageArchive:
+    """Compressed append-only page segments plus an SQLite offset index"""
+
+    def __init__(self, directory: str, segment_bytes: int = 64 * 1024 * 1024, level: int = 6):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.level = level
+        self.lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self.conn = sqlite3.connect(os.path.join(directory, 'index.sqlite3'), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                id INTEGER PRIMARY KEY,
+                segment INTEGER NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                fetched_at REAL NOT NULL,
+                source TEXT NOT NULL,
+                url TEXT NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_fetched_at ON pages(fetched_at)")
+        self.conn.commit()
+
+        segments = self.segments()
+        self.segment = segments[-1] if segments else 1
+        self._recover(self.segment)
+        self.file = None
+
+    def segments(self) -> List[int]:
+        """Numbers of the segment files on disk, in order"""
+        numbers = (SEGMENT_PATTERN.match(name) for name in os.listdir(self.directory))
+        return sorted(int(match.group(1)) for match in numbers if match)
+
+    def segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, SEGMENT_NAME.format(segment))
+
+    def _recover(self, segment: int):
+        """Index records written after the last indexed one, and cut off a torn trailing record"""
+        path = self.segment_path(segment)
+        if not os.path.exists(path):
+            return
+        row = self.conn.execute("SELECT MAX(offset + length) FROM pages WHERE segment = ?", (segment,)).fetchone()
+        offset = row[0] or 0
+        size = os.path.getsize(path)
+        if size <= offset:
+            return
+
+        recovered = 0
+        with open(path, 'r+b') as f:
+            f.seek(offset)
+            while offset < size:
+                header = f.read(RECORD_HEADER.size)
+                if len(header) < RECORD_HEADER.size:
+                    break
+                length, crc = RECORD_HEADER.unpack(header)
+                payload = f.read(length)
+                if len(payload) < length or zlib.crc32(payload) != crc:
+                    break
+                page = decode_record(payload)
+                self.conn.execute(
+                    "INSERT INTO pages (segment, offset, length, fetched_at, source, url) VALUES (?, ?, ?, ?, ?, ?)",
+                    (segment, offset, RECORD_HEADER.size + length, page.fetched_at.timestamp(),
+                     page.source_key, page.url))
+                offset += RECORD_HEADER.size + length
+                recovered += 1
+            if offset < size:
+                logger.warning(f"Truncating torn record at {path}:{offset}")
+                f.truncate(offset)
+        self.conn.commit()
+        if recovered:
+            logger.info(f"Indexed {recovered} unindexed archive records in {path}")
+
+    def append(self, url: str, source_key: str, status: int, headers: Mapping[str, str], content: bytes,
+               fetched_at: Optional[float] = None):
+        """Archive one fetched page"""
+        fetched_at = fetched_at or time.time()
+        record = encode_record(url, source_key, fetched_at, status, headers, content, self.level)
+        with self.lock:
+            if self.file is None:
+                self.file = open(self.segment_path(self.segment), 'ab')
+            if self.file.tell() and self.file.tell() + len(record) > self.segment_bytes:
+                self.file.close()
+                self.segment += 1
+                self.file = open(self.segment_path(self.segment), 'ab')
+            offset = self.file.tell()
+            self.file.write(record)
+            self.file.flush()
+            self.conn.execute(
+                "INSERT INTO pages (segment, offset, length, fetched_at, source, url) VALUES (?, ?, ?, ?, ?, ?)",
+                (self.segment, offset, len(record), fetched_at, source_key, url))
+            self.conn.commit()
+
+    def _locations(self, since: Optional[datetime], until: Optional[datetime],
+                   source_keys: Optional[Sequence[str]]) -> List[Tuple[int, int, int]]:
+        """(segment, offset, length) of the matching pages, in archive order"""
+        conditions, parameters = [], []
+        if since:
+            conditions.append("fetched_at >= ?")
+            parameters.append(since.timestamp())
+        if until:
+            conditions.append("fetched_at <= ?")
+            parameters.append(until.timestamp())
+        if source_keys:
+            conditions.append(f"source IN ({','.join('?' * len(source_keys))})")
+            parameters.extend(source_keys)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        with self.lock:
+            return self.conn.execute(
+                f"SELECT segment, offset, length FROM pages {where} ORDER BY segment, offset", parameters).fetchall()
+
+    def pages(self, since: Optional[datetime] = None, until: Optional[datetime] = None,
+              source_keys: Optional[Sequence[str]] = None) -> Iterator[ArchivedPage]:
+        """Archived pages fetched within [since, until] from `source_keys` (default: all), oldest first"""
+        locations = self._locations(since, until, source_keys)
+        with self.lock:
+            if self.file is not None:
+                self.file.flush()
+
+        mapped = view = None
+        current = None
+        try:
+            for segment, offset, length in locations:
+                if segment != current:
+                    if mapped is not None:
+                        view.release()
+                        mapped.close()
+                    with open(self.segment_path(segment), 'rb') as f:
+                        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                    view = memoryview(mapped)
+                    current = segment
+                with view[offset + RECORD_HEADER.size:offset + length] as payload:
+                    page = decode_record(payload)
+                yield page
+        finally:
+            if mapped is not None:
+                view.release()
+                mapped.close()
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def stats(self) -> Dict[str, float]:
+        """Page count, bytes on disk and the time range covered"""
+        with self.lock:
+            count, first, last = self.conn.execute(
+                "SELECT COUNT(*), MIN(fetched_at), MAX(fetched_at) FROM pages").fetchone()
+        size = sum(os.path.getsize(self.segment_path(segment)) for segment in self.segments())
+        return {'pages': count, 'bytes': size, 'first': first, 'last': last}
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            self.conn.close()
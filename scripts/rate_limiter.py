@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Per-host token bucket rate limiting for the news scraper
+"""
+
+import threading
+import time
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+
+class TokenBucket:
+    """Token bucket refilling at `rate` tokens per second up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens from the bucket, sleeping until they are available. Returns seconds waited"""
+        if self.rate <= 0:
+            return 0.0
+
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            # Reserve the tokens up front so concurrent callers queue up behind each other
+            self.tokens -= tokens
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+class HostRateLimiter:
+    """Keeps one token bucket per host so politeness is enforced per site, not globally"""
+
+    def __init__(self, rate: float = 0.5, capacity: float = 1.0,
+                 overrides: Optional[Dict[str, float]] = None):
+        self.rate = rate
+        self.capacity = capacity
+        self.overrides = overrides or {}
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+
+    def bucket_for(self, url: str) -> TokenBucket:
+        """Get (or create) the bucket for the host of `url`"""
+        host = urlparse(url).netloc.lower()
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.overrides.get(host, self.rate), self.capacity)
+                self.buckets[host] = bucket
+            return bucket
+
+    def acquire(self, url: str) -> float:
+        """Wait for a request slot on the host of `url`"""
+        return self.bucket_for(url).acquire()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Rolling sentiment aggregates per stock symbol, source and hour.
+
+Each article adds one to the positive, negative or neutral count, and its
+impact score to the impact sum, of every (symbol, source, hour) bucket it
+falls in. Articles are also counted under ALL_SYMBOLS, which gives the
+market-wide figures. Per-symbol totals are kept next to the buckets, so a
+summary reads one entry per symbol rather than every article.
+
+The scraper upserts the same buckets into the news_sentiment_rollups table
+for newly inserted articles. Dashboards then read rollups instead of
+aggregating news_articles and news_stock_relevance on each request.
+"""
+
+import heapq
+from datetime import datetime
+from typing import Dict, Iterable, List, Tuple
+
+from articles import SENTIMENTS
+
+# Symbol under which every article is counted
+ALL_SYMBOLS = '*'
+
+# (symbol, source, bucket start)
+BucketKey = Tuple[str, str, datetime]
+
+
+def bucket_start(published_at: datetime) -> datetime:
+    """Start of the hour `published_at` falls in, as date_trunc('hour', ...) in PostgreSQL"""
+    return published_at.replace(minute=0, second=0, microsecond=0)
+
+
+class SentimentRollup:
+    """Sentiment counts and impact sums per (symbol, source, hour), updated article by article"""
+
+    def __init__(self, articles: Iterable = ()):
+        # key -> [positive, negative, neutral, impact sum]
+        self.buckets: Dict[BucketKey, List[float]] = {}
+        self.totals: Dict[str, List[float]] = {}
+        self.extend(articles)
+
+    def add(self, article):
+        """Count one article in its buckets"""
+        column = SENTIMENTS.index(article.sentiment)
+        start = bucket_start(article.published_at)
+        for symbol in (ALL_SYMBOLS,) + tuple(article.relevant_stocks):
+            for counts in (self.buckets.setdefault((symbol, article.source, start), [0, 0, 0, 0.0]),
+                           self.totals.setdefault(symbol, [0, 0, 0, 0.0])):
+                counts[column] += 1
+                counts[3] += article.impact_score
+
+    def extend(self, articles: Iterable):
+        for article in articles:
+            self.add(article)
+
+    def prune(self, before: datetime):
+        """Drop buckets that start before `before`, and their share of the totals"""
+        for key in [key for key in self.buckets if key[2] < before]:
+            counts = self.buckets.pop(key)
+            totals = self.totals[key[0]]
+            for column, value in enumerate(counts):
+                totals[column] -= value
+            if not any(totals[:3]):
+                del self.totals[key[0]]
+
+    def summary(self, symbol: str = ALL_SYMBOLS) -> Dict[str, float]:
+        """Sentiment counts, article count and mean impact of one symbol (market-wide by default)"""
+        positive, negative, neutral, impact = self.totals.get(symbol, (0, 0, 0, 0.0))
+        articles = positive + negative + neutral
+        return {'positive': positive, 'negative': negative, 'neutral': neutral, 'articles': articles,
+                'mean_impact': impact / articles if articles else 0.0}
+
+    def top_symbols(self, n: int) -> List[Tuple[str, int]]:
+        """The `n` most mentioned symbols with their article counts"""
+        counts = ((symbol, int(sum(totals[:3]))) for symbol, totals in self.totals.items()
+                  if symbol != ALL_SYMBOLS)
+        return heapq.nlargest(n, counts, key=lambda item: item[1])
+
+    def rows(self) -> List[tuple]:
+        """(symbol, source, bucket start, positive, negative, neutral, articles, impact sum) per bucket"""
+        return [(symbol, source, start, int(positive), int(negative), int(neutral),
+                 int(positive + negative + neutral), round(impact, 2))
+                for (symbol, source, start), (positive, negative, neutral, impact) in self.buckets.items()]
+
+    def __len__(self) -> int:
+        return len(self.buckets)
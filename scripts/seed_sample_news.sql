@@ -122,6 +122,23 @@ BEGIN
     
 END $$;
 
+-- Roll the sample articles up into news_sentiment_rollups (the scraper keeps them current afterwards)
+INSERT INTO news_sentiment_rollups (stock_symbol, source, bucket_start, positive_count, negative_count,
+                                    neutral_count, article_count, impact_sum)
+SELECT s.stock_symbol, n.source, date_trunc('hour', COALESCE(n.published_at, n.scraped_at)),
+       COUNT(*) FILTER (WHERE n.sentiment = 'positive'),
+       COUNT(*) FILTER (WHERE n.sentiment = 'negative'),
+       COUNT(*) FILTER (WHERE n.sentiment NOT IN ('positive', 'negative')),
+       COUNT(*), COALESCE(SUM(n.impact_score), 0)
+FROM news_articles n
+CROSS JOIN LATERAL (
+    SELECT '*' AS stock_symbol
+    UNION ALL
+    SELECT r.stock_symbol FROM news_stock_relevance r WHERE r.news_id = n.id
+) s
+WHERE NOT EXISTS (SELECT 1 FROM news_sentiment_rollups)
+GROUP BY 1, 2, 3;
+
 -- Insert sample notifications
 INSERT INTO user_notifications (user_id, title, message, type) 
 SELECT u.id, 'Portfolio Alert', 'TCS stock surged 3% following strong Q3 results', 'positive'
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Persistent index of article URLs that have already been stored.
+
+URLs are kept as 64-bit BLAKE2 hashes in the rowid of a SQLite table, so the
+file stays small even with millions of entries and a lookup is a single
+B-tree probe. The daemon checks it before scoring an article so repeats cost
+neither CPU nor a database round trip.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Set
+
+# SQLite limits the number of bound parameters per statement
+LOOKUP_CHUNK = 500
+
+
+def url_key(url: str) -> int:
+    """Signed 64-bit hash of a URL, used as the rowid"""
+    return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'big', signed=True)
+
+
+class SeenUrlIndex:
+    """Set of URL hashes backed by a SQLite file"""
+
+    def __init__(self, path: str):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS seen_urls (key INTEGER PRIMARY KEY, first_seen REAL NOT NULL)")
+        self.conn.commit()
+
+    def unseen(self, urls: Iterable[str]) -> Set[str]:
+        """The subset of `urls` that is not in the index yet"""
+        by_key = {url_key(url): url for url in urls}
+        keys = list(by_key)
+        with self.lock:
+            for start in range(0, len(keys), LOOKUP_CHUNK):
+                chunk = keys[start:start + LOOKUP_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                for (key,) in self.conn.execute(f"SELECT key FROM seen_urls WHERE key IN ({placeholders})", chunk):
+                    del by_key[key]
+        return set(by_key.values())
+
+    def add(self, urls: Iterable[str]):
+        """Mark URLs as stored"""
+        now = time.time()
+        rows: List[tuple] = [(url_key(url), now) for url in urls]
+        with self.lock:
+            self.conn.executemany("INSERT OR IGNORE INTO seen_urls (key, first_seen) VALUES (?, ?)", rows)
+            self.conn.commit()
+
+    def __len__(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM seen_urls").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Lexicon-based sentiment scoring for news headlines and summaries.
+
+Each text is tokenized once and every token is looked up in a frozen map of
+weighted terms (including common inflections, so "surges" and "rallied"
+count while "supply" no longer matches "up"). A negator such as "not" or
+"didn't" flips the sign of lexicon terms in the next few tokens.
+"""
+
+import importlib.util
+import re
+from types import MappingProxyType
+from typing import Dict, Iterable, List, Mapping
+
+# NumPy only speeds up analyze_batch, and is imported by its first call
+HAVE_NUMPY = importlib.util.find_spec('numpy') is not None
+
+POSITIVE_TERMS = {
+    'surge': 1.5, 'rally': 1.5, 'gain': 1.0, 'rise': 1.0, 'up': 0.5, 'positive': 1.0, 'strong': 1.0,
+    'growth': 1.0, 'bullish': 1.5, 'optimistic': 1.0, 'boost': 1.0, 'soar': 1.5, 'jump': 1.0,
+    'climb': 1.0, 'advance': 1.0, 'outperform': 1.5, 'beat': 1.0, 'exceed': 1.0, 'record': 0.5,
+    'high': 0.5, 'profit': 1.0, 'revenue': 0.5, 'expansion': 1.0, 'acquisition': 0.5, 'merger': 0.5,
+    'dividend': 1.0, 'bonus': 1.0, 'split': 0.5,
+}
+
+NEGATIVE_TERMS = {
+    'fall': 1.0, 'drop': 1.0, 'decline': 1.0, 'down': 0.5, 'negative': 1.0, 'weak': 1.0, 'loss': 1.0,
+    'crash': 1.5, 'bearish': 1.5, 'pessimistic': 1.0, 'plunge': 1.5, 'tumble': 1.5, 'slide': 1.0,
+    'slump': 1.5, 'retreat': 1.0, 'underperform': 1.5, 'miss': 1.0, 'disappoint': 1.0, 'low': 0.5,
+    'deficit': 1.0, 'concern': 1.0, 'worry': 1.0, 'layoff': 1.5, 'restructure': 0.5, 'debt': 0.5,
+    'lawsuit': 1.0, 'investigation': 1.0, 'penalty': 1.0,
+}
+
+NEGATORS = frozenset({'not', 'no', 'never', 'without', 'nor', 'neither', 'hardly', 'barely'})
+
+# Contractions like "didn't" stay one token so they can act as negators
+TOKEN_RE = re.compile(r"[a-z]+n't|[a-z0-9]+")
+
+# How many tokens after a negator have their polarity flipped
+NEGATION_WINDOW = 3
+
+# Irregular inflections that the suffix rules below don't produce
+IRREGULAR_FORMS = {
+    'rise': ['rose', 'risen'], 'fall': ['fell', 'fallen'], 'beat': ['beaten'], 'slide': ['slid'],
+    'weak': ['weaker', 'weakest', 'weakening', 'weakens'], 'strong': ['stronger', 'strongest'],
+    'high': ['higher', 'highest'], 'low': ['lower', 'lowest'], 'loss': ['losses'],
+    'worry': ['worries', 'worried'],
+}
+
+
+def _inflections(word: str) -> List[str]:
+    """The word plus its regular plural/verb forms"""
+    forms = [word, word + 's', word + 'es', word + 'ed', word + 'ing']
+    if word.endswith('e'):
+        forms += [word + 'd', word[:-1] + 'ing']
+    if word.endswith('y') and word[-2:-1] not in 'aeiou':
+        forms += [word[:-1] + 'ies', word[:-1] + 'ied']
+    if len(word) > 2 and word[-1] not in 'aeiouwxy' and word[-2] in 'aeiou' and word[-3] not in 'aeiou':
+        forms += [word + word[-1] + 'ed', word + word[-1] + 'ing']
+    return forms + IRREGULAR_FORMS.get(word, [])
+
+
+def build_lexicon(positive: Mapping[str, float], negative: Mapping[str, float]) -> Mapping[str, float]:
+    """Expand the term weights over inflections into a read-only token -> weight map"""
+    lexicon: Dict[str, float] = {}
+    for terms, sign in ((positive, 1.0), (negative, -1.0)):
+        for term, weight in terms.items():
+            for form in _inflections(term):
+                lexicon.setdefault(form, sign * weight)
+    return MappingProxyType(lexicon)
+
+
+def _is_negator(token: str) -> bool:
+    return token in NEGATORS or token.endswith("n't")
+
+
+class SentimentScorer:
+    """Scores text as a signed float: > 0 positive, < 0 negative, 0 neutral"""
+
+    def __init__(self, positive: Mapping[str, float] = POSITIVE_TERMS,
+                 negative: Mapping[str, float] = NEGATIVE_TERMS, negation: bool = True):
+        self.lexicon = build_lexicon(positive, negative)
+        self.negation = negation
+
+    def _score_tokens(self, tokens: List[str]) -> float:
+        score = 0.0
+        negated_until = -1
+        for i, token in enumerate(tokens):
+            if self.negation and _is_negator(token):
+                negated_until = i + NEGATION_WINDOW
+                continue
+            weight = self.lexicon.get(token)
+            if weight:
+                score += -weight if i <= negated_until else weight
+        return score
+
+    def score(self, text: str) -> float:
+        """Sentiment score of a single text"""
+        return self._score_tokens(TOKEN_RE.findall(text.lower()))
+
+    def analyze_batch(self, texts: Iterable[str]) -> List[float]:
+        """Sentiment scores for many texts at once"""
+        lowered = [text.lower() for text in texts]
+        token_lists = [TOKEN_RE.findall(text) for text in lowered]
+        if not HAVE_NUMPY or not token_lists:
+            return [self._score_tokens(tokens) for tokens in token_lists]
+        import numpy as np
+
+        # Sum term weights for every text with one reduceat over a flat weight array
+        lexicon_get = self.lexicon.get
+        lengths = np.fromiter(map(len, token_lists), dtype=np.int64, count=len(token_lists))
+        weights = np.fromiter((lexicon_get(token, 0.0) for tokens in token_lists for token in tokens),
+                              dtype=np.float64, count=int(lengths.sum()))
+        scores = np.zeros(len(token_lists))
+        non_empty = lengths > 0
+        if non_empty.any():
+            offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+            scores[non_empty] = np.add.reduceat(weights, offsets[non_empty])
+
+        # Texts containing a negator need the sequential pass to flip polarity
+        if self.negation:
+            for i, tokens in enumerate(token_lists):
+                if "n't" in lowered[i] or not NEGATORS.isdisjoint(tokens):
+                    scores[i] = self._score_tokens(tokens)
+        return scores.tolist()
+
+    @staticmethod
+    def label(score: float) -> str:
+        """Three-way label stored alongside the numeric score"""
+        if score > 0:
+            return 'positive'
+        elif score < 0:
+            return 'negative'
+        return 'neutral'
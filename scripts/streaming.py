@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Building blocks for the streaming scrape pipeline: an append-only JSON Lines
+sink, a micro-batching database writer on a background thread behind a
+bounded queue, and a bounded top-N heap.
+"""
+
+import gzip
+import heapq
+import itertools
+import json
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from metrics import NULL_METRICS, Metrics
+
+logger = logging.getLogger(__name__)
+
+
+def article_to_dict(article) -> Dict[str, Any]:
+    """JSON-serialisable form of a NewsArticle"""
+    return {
+        'headline': article.headline,
+        'summary': article.summary,
+        'source': article.source,
+        'url': article.url,
+        'published_at': article.published_at.isoformat(),
+        'sentiment': article.sentiment,
+        'relevant_stocks': list(article.relevant_stocks),
+        'impact_score': article.impact_score,
+        'cluster_sources': list(article.cluster_sources)
+    }
+
+
+class JsonLinesSink:
+    """Appends one JSON object per article to a .jsonl (or gzip-compressed .jsonl.gz) file"""
+
+    def __init__(self, path: str, compress: bool = False):
+        self.path = path
+        self.count = 0
+        if compress:
+            self.file = gzip.open(path, 'at', encoding='utf-8')
+        else:
+            self.file = open(path, 'a', encoding='utf-8')
+
+    def write(self, article):
+        self.file.write(json.dumps(article_to_dict(article), ensure_ascii=False))
+        self.file.write('\n')
+        self.count += 1
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self) -> 'JsonLinesSink':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class BackgroundWriter:
+    """Hands articles to `flush_batch` in micro-batches on a writer thread, so
+    writes overlap with fetching and parsing.
+
+    A batch is flushed once `batch_size` articles are pending or the oldest of
+    them has waited `max_delay` seconds. At most `max_pending` articles are
+    queued: beyond that write() blocks until the writer catches up, so a slow
+    database slows the scrape down instead of growing the queue. Results of
+    `flush_batch` are summed in `written` (a list counts its length); a batch
+    whose flush raises is logged and dropped. write_many() returns a future
+    that tells the caller whether its articles made it. close() writes out
+    everything still pending.
+    """
+
+    def __init__(self, flush_batch: Callable[[list], Any], batch_size: int = 500, max_delay: float = 0.5,
+                 max_pending: int = 5000, metrics: Metrics = NULL_METRICS, name: str = 'db-writer'):
+        self.flush_batch = flush_batch
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self.max_pending = max(max_pending, batch_size)
+        self.metrics = metrics
+        self.name = name
+        self.condition = threading.Condition()
+        self.pending: deque = deque()
+        # When the oldest pending article was queued
+        self.oldest: Optional[float] = None
+        # Articles handed to flush_batch and not yet done
+        self.in_flight = 0
+        # flush() callers waiting; the writer doesn't hold back partial batches for them
+        self.flushing = 0
+        # Articles queued and taken into batches so far, and [start, end, future, error, results]
+        # per write_many() call not yet resolved, in queue order
+        self.queued = 0
+        self.taken = 0
+        self.tickets: deque = deque()
+        self.written = 0
+        self.closed = False
+        self.thread: Optional[threading.Thread] = None
+
+    def write(self, article):
+        self.write_many([article])
+
+    def write_many(self, articles: Iterable) -> Future:
+        """Queue articles, blocking while the queue is full.
+
+        The returned future completes once all of them have been handed to
+        flush_batch, with the results of the batches that held them, or the
+        exception of the first of those batches that raised.
+        """
+        articles = list(articles)
+        future = Future()
+        if not articles:
+            future.set_result([])
+            return future
+        with self.condition:
+            if self.closed:
+                raise RuntimeError(f"{self.name} is closed")
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self.thread.start()
+            if self.pending and len(self.pending) + len(articles) > self.max_pending:
+                started = time.perf_counter()
+                # An oversized group is still accepted once the queue has drained
+                while self.pending and len(self.pending) + len(articles) > self.max_pending:
+                    self.condition.wait()
+                self.metrics.inc('db_backpressure_total')
+                self.metrics.observe('db_backpressure_seconds', time.perf_counter() - started)
+            if not self.pending:
+                self.oldest = time.monotonic()
+            self.pending.extend(articles)
+            self.tickets.append([self.queued, self.queued + len(articles), future, None, []])
+            self.queued += len(articles)
+            self.condition.notify_all()
+        return future
+
+    def _next_batch(self) -> Optional[list]:
+        """Wait until a batch is due and take it; None once closed and drained"""
+        with self.condition:
+            while True:
+                if self.pending:
+                    if self.closed or self.flushing or len(self.pending) >= self.batch_size:
+                        break
+                    due = self.oldest + self.max_delay - time.monotonic()
+                    if due <= 0:
+                        break
+                    self.condition.wait(due)
+                elif self.closed:
+                    return None
+                else:
+                    self.condition.wait()
+            count = min(self.batch_size, len(self.pending))
+            batch = [self.pending.popleft() for _ in range(count)]
+            # Whatever is left is no younger than this batch was, so self.oldest stands
+            if not self.pending:
+                self.oldest = None
+            self.in_flight = count
+            self.taken += count
+            self.condition.notify_all()
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            result = error = None
+            try:
+                result = self.flush_batch(batch)
+            except Exception as e:
+                error = e
+                logger.error(f"{self.name}: dropped a batch of {len(batch)} articles: {e}")
+            self.metrics.inc('db_batches_total')
+            with self.condition:
+                self.in_flight = 0
+                if isinstance(result, int):
+                    self.written += result
+                elif isinstance(result, list):
+                    self.written += len(result)
+                self._resolve(self.taken, result, error)
+                self.condition.notify_all()
+
+    def _resolve(self, end: int, result: Any, error: Optional[Exception]):
+        """Settle the write_many() futures after the batch of queued articles up to `end`"""
+        # Every unresolved call that started before the batch's end had articles in it
+        for ticket in self.tickets:
+            if ticket[0] >= end:
+                break
+            if error is not None:
+                if ticket[3] is None:
+                    ticket[3] = error
+            elif result is not None:
+                ticket[4].append(result)
+        while self.tickets and self.tickets[0][1] <= end:
+            _, _, future, ticket_error, results = self.tickets.popleft()
+            if ticket_error is None:
+                future.set_result(results)
+            else:
+                future.set_exception(ticket_error)
+
+    def flush(self):
+        """Block until every article queued so far has been handed to flush_batch"""
+        with self.condition:
+            if self.thread is None:
+                return
+            self.flushing += 1
+            self.condition.notify_all()
+            try:
+                while self.pending or self.in_flight:
+                    self.condition.wait()
+            finally:
+                self.flushing -= 1
+
+    def close(self):
+        """Write out everything pending and stop the writer thread"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join()
+
+    def __enter__(self) -> 'BackgroundWriter':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class TopN:
+    """Keeps the `n` largest items by `key` in a min-heap of size n"""
+
+    def __init__(self, n: int, key: Callable[[Any], Any]):
+        self.n = n
+        self.key = key
+        self.heap: List[tuple] = []
+        # Tie-breaker so items themselves are never compared
+        self.counter = itertools.count()
+
+    def push(self, item):
+        entry = (self.key(item), next(self.counter), item)
+        if len(self.heap) < self.n:
+            heapq.heappush(self.heap, entry)
+        elif entry[0] > self.heap[0][0]:
+            heapq.heapreplace(self.heap, entry)
+
+    def items(self) -> list:
+        """Largest first"""
+        return [item for _, _, item in sorted(self.heap, key=lambda entry: (entry[0], -entry[1]), reverse=True)]
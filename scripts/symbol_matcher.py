@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Stock symbol extraction with a single precompiled multi-pattern matcher.
+
+All aliases from the symbol master are folded into a character trie and
+emitted as one regular expression, so an article is scanned once no matter
+how many companies are tracked. Matches must sit on word boundaries, and
+short all-caps aliases such as "SBI" or "HCL" only match in upper case so
+they don't fire inside ordinary words.
+
+Built matchers are pickled to a cache directory, keyed by a format version
+and either the mapping itself or the symbol master file's path, size and
+modification time. The latter lets a run skip reading the master at all.
+A compiled regex can't be pickled, and compiling a pattern for thousands of
+aliases takes a noticeable share of a short run, so the pattern is compiled
+on first use, or ahead of time by prepare().
+"""
+
+import csv
+import hashlib
+import json
+import logging
+import os
+import pickle
+import re
+import threading
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Bump when the pattern layout changes so stale disk caches are ignored
+MATCHER_VERSION = 1
+
+DEFAULT_SYMBOL_MASTER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'symbols.json')
+
+# Company-name suffixes dropped to derive an extra alias from names like "Infosys Limited"
+NAME_SUFFIXES = re.compile(r'\s+(limited|ltd\.?|pvt\.?|private)$', re.IGNORECASE)
+
+WORD_CHAR = 'A-Za-z0-9'
+
+
+def load_symbol_master(path: str) -> Dict[str, List[str]]:
+    """Load a symbol -> aliases mapping from a JSON or CSV symbol master.
+
+    JSON files map each symbol to a list of aliases. CSV files need a
+    `symbol` column plus a `name` (or NSE's `NAME OF COMPANY`) column and/or
+    an `aliases` column with `|`-separated values.
+    """
+    if path.lower().endswith('.json'):
+        with open(path, encoding='utf-8') as f:
+            return {symbol.upper(): list(aliases) for symbol, aliases in json.load(f).items()}
+
+    mapping: Dict[str, List[str]] = {}
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for row in csv.DictReader(f):
+            row = {(key or '').strip().lower(): (value or '').strip() for key, value in row.items()}
+            symbol = row.get('symbol', '').upper()
+            if not symbol:
+                continue
+
+            aliases = mapping.setdefault(symbol, [])
+            name = row.get('name') or row.get('name of company') or ''
+            if name:
+                aliases.append(name)
+                short_name = NAME_SUFFIXES.sub('', name)
+                if short_name != name:
+                    aliases.append(short_name)
+            aliases.extend(alias.strip() for alias in row.get('aliases', '').split('|') if alias.strip())
+    return mapping
+
+
+def _normalize(alias: str) -> str:
+    return ' '.join(alias.split()).lower()
+
+
+def _is_acronym(alias: str) -> bool:
+    """Short all-caps aliases ("SBI", "L&T") are matched case-sensitively"""
+    return len(alias) <= 5 and ' ' not in alias and alias.isupper()
+
+
+def _escape(char: str) -> str:
+    return r'\s+' if char == ' ' else re.escape(char)
+
+
+def _trie_pattern(node: dict) -> Optional[str]:
+    """Turn a character trie into an equivalent, backtracking-friendly regex"""
+    if len(node) == 1 and '' in node:
+        return None
+
+    alternatives = []
+    char_class = []
+    optional = False
+    for char in sorted(node):
+        if char == '':
+            optional = True
+            continue
+        sub_pattern = _trie_pattern(node[char])
+        if sub_pattern is None and char != ' ':
+            char_class.append(re.escape(char))
+        else:
+            alternatives.append(_escape(char) + (sub_pattern or ''))
+
+    only_chars = not alternatives
+    if char_class:
+        alternatives.append(char_class[0] if len(char_class) == 1 else '[' + ''.join(char_class) + ']')
+
+    pattern = alternatives[0] if len(alternatives) == 1 else '(?:' + '|'.join(alternatives) + ')'
+    if optional:
+        pattern = pattern + '?' if only_chars else '(?:' + pattern + ')?'
+    return pattern
+
+
+def _build_trie(aliases) -> dict:
+    trie: dict = {}
+    for alias in aliases:
+        node = trie
+        for char in alias:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    return trie
+
+
+class SymbolMatcher:
+    """Finds every tracked stock symbol in a text with one regex pass"""
+
+    def __init__(self, stock_mapping: Dict[str, List[str]]):
+        self.names: Dict[str, List[str]] = {}
+        self.acronyms: Dict[str, List[str]] = {}
+        for symbol, aliases in stock_mapping.items():
+            for alias in aliases:
+                alias = alias.strip()
+                if not alias:
+                    continue
+                if _is_acronym(alias):
+                    self.acronyms.setdefault(alias, []).append(symbol)
+                else:
+                    self.names.setdefault(_normalize(alias), []).append(symbol)
+
+        branches = []
+        names_pattern = _trie_pattern(_build_trie(self.names))
+        acronyms_pattern = _trie_pattern(_build_trie(self.acronyms))
+        if names_pattern:
+            branches.append(names_pattern)
+        if acronyms_pattern:
+            branches.append(f'(?-i:{acronyms_pattern})')
+
+        self.pattern = (f'(?<![{WORD_CHAR}])(?:{"|".join(branches)})(?![{WORD_CHAR}])'
+                        if branches else r'(?!x)x')
+        self._init_regex()
+
+    def _init_regex(self):
+        self._regex = None
+        self._compile_lock = threading.Lock()
+
+    @property
+    def regex(self):
+        """The compiled pattern, compiled by the first caller"""
+        if self._regex is None:
+            with self._compile_lock:
+                if self._regex is None:
+                    self._regex = re.compile(self.pattern, re.IGNORECASE)
+        return self._regex
+
+    def prepare(self):
+        """Compile the pattern now, e.g. while the first pages download, rather than in the first find"""
+        self.regex
+
+    def find(self, text: str) -> List[str]:
+        """Return the symbols mentioned in `text`, in order of first mention"""
+        found: Dict[str, None] = {}
+        for match in self.regex.finditer(text):
+            matched = match.group()
+            symbols = self.acronyms.get(matched) or self.names.get(_normalize(matched), ())
+            for symbol in symbols:
+                found[symbol] = None
+        return list(found)
+
+    def __getstate__(self):
+        return {'pattern': self.pattern, 'names': self.names, 'acronyms': self.acronyms}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._init_regex()
+
+    @classmethod
+    def cached(cls, stock_mapping: Dict[str, List[str]], cache_dir: Optional[str] = None) -> 'SymbolMatcher':
+        """Build a matcher, reusing a pickled copy from `cache_dir` when the mapping is unchanged"""
+        if not cache_dir:
+            return cls(stock_mapping)
+
+        fingerprint = hashlib.sha256(
+            json.dumps(stock_mapping, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+        cache_path = os.path.join(cache_dir, f'symbol_matcher-v{MATCHER_VERSION}-{fingerprint}.pickle')
+        matcher = _load_cached(cache_path)
+        if matcher is None:
+            matcher = _store_cached(cls(stock_mapping), cache_path)
+        return matcher
+
+    @classmethod
+    def from_master(cls, path: str, cache_dir: Optional[str] = None) -> 'SymbolMatcher':
+        """A matcher for the symbol master at `path`, without reading it while the cached copy is current"""
+        if not cache_dir:
+            return cls(load_symbol_master(path))
+
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        fingerprint = hashlib.sha256(
+            f'{path}:{stat.st_size}:{stat.st_mtime_ns}'.encode('utf-8')).hexdigest()[:16]
+        cache_path = os.path.join(cache_dir, f'symbol_matcher-v{MATCHER_VERSION}-master-{fingerprint}.pickle')
+        matcher = _load_cached(cache_path)
+        if matcher is None:
+            # An edited master with the same contents still reuses the mapping-keyed copy
+            matcher = _store_cached(cls.cached(load_symbol_master(path), cache_dir), cache_path)
+        return matcher
+
+
+def _load_cached(cache_path: str) -> Optional[SymbolMatcher]:
+    try:
+        with open(cache_path, 'rb') as f:
+            return pickle.load(f)
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable symbol matcher cache {cache_path}: {e}")
+    return None
+
+
+def _store_cached(matcher: SymbolMatcher, cache_path: str) -> SymbolMatcher:
+    cache_dir = os.path.dirname(cache_path)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(matcher, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Could not write symbol matcher cache {cache_path}: {e}")
+    return matcher
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Shared queue of listing URLs in the `scrape_jobs` table, for running the
+scraper as any number of worker processes on one or more machines.
+
+Each listing URL is one job with its poll interval and the time of its next
+run. Workers claim due jobs with SELECT ... FOR UPDATE SKIP LOCKED, so two
+workers never claim the same job and never wait on each other's row locks.
+A claim is a lease: the job is the worker's until `lease_seconds` have
+passed. Finishing a job schedules its next run one interval later, or
+sooner, with exponential backoff, after a failure. A job whose worker died
+is claimed again by another worker once its lease has expired.
+"""
+
+import logging
+import os
+import socket
+from typing import TYPE_CHECKING, Dict, Iterable, List, NamedTuple, Optional
+
+if TYPE_CHECKING:
+    import psycopg2.extensions
+
+logger = logging.getLogger(__name__)
+
+CLAIM_SQL = """
+    WITH due AS (
+        SELECT id FROM scrape_jobs
+        WHERE next_run_at <= NOW()
+          AND (leased_until IS NULL OR leased_until < NOW())
+          AND source_key = ANY(%(sources)s)
+        ORDER BY next_run_at
+        LIMIT %(limit)s
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE scrape_jobs j
+    SET leased_by = %(worker)s,
+        leased_until = NOW() + make_interval(secs => %(lease)s),
+        attempts = j.attempts + 1
+    FROM due
+    WHERE j.id = due.id
+    RETURNING j.id, j.source_key, j.url, j.interval_seconds, j.attempts
+"""
+
+# Both only apply while the lease is still ours; after a reclaim the new holder owns the job
+COMPLETE_SQL = """
+    UPDATE scrape_jobs
+    SET next_run_at = NOW() + make_interval(secs => interval_seconds),
+        leased_by = NULL, leased_until = NULL, attempts = 0,
+        last_run_at = NOW(), last_error = NULL, last_article_count = %(articles)s
+    WHERE id = %(id)s AND leased_by = %(worker)s
+"""
+
+FAIL_SQL = """
+    UPDATE scrape_jobs
+    SET next_run_at = NOW() + make_interval(
+            secs => LEAST(interval_seconds, %(retry)s * 2 ^ LEAST(attempts - 1, 10))),
+        leased_by = NULL, leased_until = NULL,
+        last_run_at = NOW(), last_error = %(error)s
+    WHERE id = %(id)s AND leased_by = %(worker)s
+"""
+
+SYNC_SQL = """
+    INSERT INTO scrape_jobs (source_key, url, interval_seconds) VALUES %s
+    ON CONFLICT (url) DO UPDATE
+    SET source_key = EXCLUDED.source_key, interval_seconds = EXCLUDED.interval_seconds
+"""
+
+
+class ScrapeJob(NamedTuple):
+    id: int
+    source_key: str
+    url: str
+    interval_seconds: int
+    # Claims since the job last succeeded, this one included
+    attempts: int
+
+
+def default_worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class ScrapeJobQueue:
+    """Claims, completes and schedules scrape_jobs rows over one database connection"""
+
+    def __init__(self, database_url: str, worker_id: Optional[str] = None, lease_seconds: float = 300.0,
+                 retry_seconds: float = 30.0):
+        self.database_url = database_url
+        self.worker_id = worker_id or default_worker_id()
+        self.lease_seconds = lease_seconds
+        self.retry_seconds = retry_seconds
+        self.conn: Optional['psycopg2.extensions.connection'] = None
+
+    def _connection(self) -> 'psycopg2.extensions.connection':
+        """The queue's connection, reconnecting if the last one broke"""
+        import psycopg2
+        if self.conn is None or self.conn.closed:
+            self.conn = psycopg2.connect(self.database_url)
+        return self.conn
+
+    def _execute(self, sql: str, params, fetch: bool = False):
+        """Run one statement in its own transaction"""
+        import psycopg2
+        conn = self._connection()
+        try:
+            with conn, conn.cursor() as cur:
+                cur.execute(sql, params)
+                return cur.fetchall() if fetch else cur.rowcount
+        except psycopg2.OperationalError:
+            conn.close()
+            raise
+
+    def sync(self, sources: Dict[str, dict], intervals: Dict[str, float]) -> int:
+        """Register the listing URLs of the sources in `intervals`, updating their poll intervals.
+
+        New URLs are due at once; the schedule of existing ones is kept.
+        """
+        from psycopg2.extras import execute_values
+        rows = [(key, url, max(1, int(intervals[key]))) for key in intervals for url in sources[key]['urls']]
+        conn = self._connection()
+        with conn, conn.cursor() as cur:
+            execute_values(cur, SYNC_SQL, rows)
+        logger.info(f"Registered {len(rows)} listing URLs from {', '.join(intervals)}")
+        return len(rows)
+
+    def claim(self, source_keys: Iterable[str], limit: int) -> List[ScrapeJob]:
+        """Lease up to `limit` due jobs of the given sources, most overdue first"""
+        rows = self._execute(CLAIM_SQL, {'sources': list(source_keys), 'limit': limit, 'worker': self.worker_id,
+                                         'lease': float(self.lease_seconds)}, fetch=True)
+        return [ScrapeJob(*row) for row in rows]
+
+    def complete(self, job: ScrapeJob, articles: int) -> bool:
+        """Release a finished job and schedule its next run. False if the lease had already expired"""
+        return self._execute(COMPLETE_SQL, {'id': job.id, 'worker': self.worker_id, 'articles': articles}) == 1
+
+    def fail(self, job: ScrapeJob, error: str) -> bool:
+        """Release a failed job for a retry after retry_seconds, doubled per failure in a row up to its interval.
+        False if the lease had already expired"""
+        return self._execute(FAIL_SQL, {'id': job.id, 'worker': self.worker_id, 'error': error[:1000],
+                                        'retry': float(self.retry_seconds)}) == 1
+
+    def seconds_until_due(self, source_keys: Iterable[str]) -> Optional[float]:
+        """How long until a job of the given sources can next be claimed; None if there are none"""
+        rows = self._execute("""
+            SELECT EXTRACT(EPOCH FROM MIN(GREATEST(next_run_at, COALESCE(leased_until, next_run_at))) - NOW())
+            FROM scrape_jobs WHERE source_key = ANY(%(sources)s)
+        """, {'sources': list(source_keys)}, fetch=True)
+        value = rows[0][0]
+        return None if value is None else float(value)
+
+    def stats(self) -> Dict[str, int]:
+        """Job counts: all, due now, leased, and failing (last run failed)"""
+        rows = self._execute("""
+            SELECT COUNT(*),
+                   COUNT(*) FILTER (WHERE next_run_at <= NOW() AND (leased_until IS NULL OR leased_until < NOW())),
+                   COUNT(*) FILTER (WHERE leased_until >= NOW()),
+                   COUNT(*) FILTER (WHERE last_error IS NOT NULL)
+            FROM scrape_jobs
+        """, None, fetch=True)
+        return dict(zip(('jobs', 'due', 'leased', 'failing'), rows[0]))
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None